@@ -4,6 +4,7 @@ import pandas as pd
 import re
 import json
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from io import BytesIO
 
@@ -379,47 +380,59 @@ def build_url(country, app_id, page=1):
     return f"https://itunes.apple.com/{country}/rss/customerreviews/page={page}/id={app_id}/sortBy=mostRecent/json"
 
 
+# iTunes lookups change rarely; Streamlit reruns the script on every widget change.
+# Errors propagate out of the cached helpers so failures are never cached.
+@st.cache_data(ttl=3600, show_spinner=False)
+def _lookup_app_name_cached(app_id, country):
+    resp = requests.get(
+        f"https://itunes.apple.com/lookup?id={app_id}&country={country}",
+        timeout=10,
+    )
+    data = resp.json()
+    results = data.get("results", [])
+    if not results:
+        raise LookupError(app_id)
+    return results[0].get("trackName", f"App {app_id}")
+
+
 def lookup_app_name(app_id, country="us"):
     try:
-        resp = requests.get(
-            f"https://itunes.apple.com/lookup?id={app_id}&country={country}",
-            timeout=10,
-        )
-        data = resp.json()
-        results = data.get("results", [])
-        if results:
-            return results[0].get("trackName", f"App {app_id}")
+        return _lookup_app_name_cached(app_id, country)
     except Exception:
-        pass
-    return f"App {app_id}"
+        return f"App {app_id}"
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _search_apps_cached(query, country, limit):
+    resp = requests.get(
+        "https://itunes.apple.com/search",
+        params={
+            "term": query,
+            "entity": "software",
+            "country": country,
+            "limit": limit,
+        },
+        timeout=10,
+    )
+    data = resp.json()
+    results = []
+    for r in data.get("results", []):
+        results.append({
+            "id": str(r.get("trackId", "")),
+            "name": r.get("trackName", ""),
+            "developer": r.get("artistName", ""),
+            "icon": r.get("artworkUrl60", ""),
+            "bundle": r.get("bundleId", ""),
+            "price": r.get("formattedPrice", "Free"),
+            "rating": r.get("averageUserRating", 0),
+            "ratings_count": r.get("userRatingCount", 0),
+        })
+    return results
 
 
 def search_apps(query, country="us", limit=10):
     try:
-        resp = requests.get(
-            "https://itunes.apple.com/search",
-            params={
-                "term": query,
-                "entity": "software",
-                "country": country,
-                "limit": limit,
-            },
-            timeout=10,
-        )
-        data = resp.json()
-        results = []
-        for r in data.get("results", []):
-            results.append({
-                "id": str(r.get("trackId", "")),
-                "name": r.get("trackName", ""),
-                "developer": r.get("artistName", ""),
-                "icon": r.get("artworkUrl60", ""),
-                "bundle": r.get("bundleId", ""),
-                "price": r.get("formattedPrice", "Free"),
-                "rating": r.get("averageUserRating", 0),
-                "ratings_count": r.get("userRatingCount", 0),
-            })
-        return results
+        return _search_apps_cached(query, country, limit)
     except Exception:
         return []
 
@@ -596,6 +609,9 @@ def fetch_trustpilot_reviews(domain, max_pages, cutoff_date, progress_bar=None,
     return all_reviews, business_info
 
 
+COMPARE_CONCURRENCY = 6  # apps fetched at once in the compare tab
+
+
 def fetch_reviews_simple(app_id, country, max_pages, cutoff_date):
     all_reviews = []
     for page in range(1, max_pages + 1):
@@ -1726,27 +1742,37 @@ elif active == "Comparison":
     if compare_button and len(valid_ids) >= 2:
         cutoff = datetime.now(timezone.utc) - timedelta(days=comp_days)
         comp_data = {}
-        app_names = {}
 
         progress = st.progress(0, text="Starting comparison...")
         status = st.empty()
 
-        for i, aid in enumerate(valid_ids):
-            progress.progress((i) / len(valid_ids), text=f"Looking up app {aid}...")
-            name = lookup_app_name(aid, comp_country)
-            app_names[aid] = name
-            status.text(f"Fetching reviews for {name} ({aid})...")
-            progress.progress((i + 0.3) / len(valid_ids), text=f"Fetching {name}...")
-
-            reviews = fetch_reviews_simple(aid, comp_country, comp_pages, cutoff)
-            if reviews:
-                comp_df = pd.DataFrame(reviews)
-                comp_df = comp_df.sort_values("date", ascending=False).reset_index(drop=True)
-                comp_data[aid] = comp_df
-            else:
-                comp_data[aid] = pd.DataFrame(columns=["date", "rating", "title", "review", "author", "version"])
+        # Names first, on this thread: lookup_app_name goes through st.cache_data, which
+        # needs the script's context; the pool threads only run the uncached fetch
+        app_names = {aid: lookup_app_name(aid, comp_country) for aid in valid_ids}
+
+        # All apps at once; Streamlit calls stay on this thread, fed by as_completed
+        progress.progress(0.0, text=f"Fetching {len(valid_ids)} apps...")
+        with ThreadPoolExecutor(max_workers=min(COMPARE_CONCURRENCY, len(valid_ids))) as pool:
+            futures = {
+                pool.submit(fetch_reviews_simple, aid, comp_country, comp_pages, cutoff): aid
+                for aid in valid_ids
+            }
+            for i, future in enumerate(as_completed(futures), 1):
+                aid = futures[future]
+                name = app_names[aid]
+                reviews = future.result()
+                if reviews:
+                    comp_df = pd.DataFrame(reviews)
+                    comp_df = comp_df.sort_values("date", ascending=False).reset_index(drop=True)
+                    comp_data[aid] = comp_df
+                else:
+                    comp_data[aid] = pd.DataFrame(columns=["date", "rating", "title", "review", "author", "version"])
+
+                status.text(f"{name}: {len(reviews)} reviews found")
+                progress.progress(i / len(valid_ids), text=f"Fetched {i}/{len(valid_ids)} apps")
 
-            status.text(f"{name}: {len(reviews)} reviews found")
+        # Keep the sidebar order rather than completion order
+        comp_data = {aid: comp_data[aid] for aid in valid_ids}
 
         progress.progress(1.0, text="Done!")
         st.session_state.comp_data = comp_data
@@ -142,3 +142,111 @@ CATEGORY_LABELS = {
     "policy": "Policy & Terms",
     "external": "Branches & Staff",
 }
+
+# Local problem classifier (services/local_classifier.py); mirrors frontend/src/lib/classifier.ts.
+# Lists, not sets: order and repeats affect scoring exactly as in the frontend.
+# Phrases are substring matches (+3), keywords are stem/fuzzy token matches (+1).
+PROBLEM_PHRASES = {
+    "BUGS_TECNICI": [
+        "si blocca", "non funziona", "non va", "non parte", "non si apre", "non carica",
+        "chiusura improvvisa", "errore di sistema", "crash continui", "schermata nera",
+        "schermata bianca", "schermo nero", "caricamento infinito",
+        "non riesco ad accedere", "non mi fa entrare", "login fallito",
+        "password non accettata", "non sincronizza", "dati non aggiornati",
+        "non si aggiorna", "aggiornamento fallito", "troppo lento", "lentissimo",
+        "molto lento", "non funzion", "non si connett", "errore di connession",
+        "ha smesso di funzion", "continua a chiudersi", "si blocca continuamente",
+        "perdita di dati", "dati persi",
+    ],
+    "ONBOARDING_SETUP": [
+        "primo accesso", "prima volta", "creazione account", "nuovo account",
+        "apertura conto", "verifica identita", "riconoscimento facciale",
+        "carta identita", "difficile da configurare", "complicato da usare",
+        "non intuitivo all inizio", "setup iniziale", "registrazione complicata",
+        "processo di registrazione", "configurazione iniziale", "attivazione account",
+        "non so come iniziare", "non capisco come funziona", "non riesco a registr",
+        "non riesco ad acceder", "configurazion difficil", "difficile da configurar",
+        "difficile da installar", "non riesco ad entrar", "non riesco a far partir",
+        "codice di verific", "verifica email", "verifica telefon",
+        "account non verific",
+    ],
+    "UX_USABILITA": [
+        "interfaccia confusa", "difficile da navigare", "non trovo", "dove si trova",
+        "troppi passaggi", "troppo complicato", "poco intuitivo", "mal organizzato",
+        "disordinato", "testo troppo piccolo", "difficile da leggere", "grafica brutta",
+        "design vecchio", "interfaccia antiquata", "menu confusionario",
+        "facile da usare", "molto intuitivo", "interfaccia chiara", "ben organizzato",
+        "design moderno", "difficile da usar", "difficile da navigar", "non intuitiv",
+        "non user friendly", "difficile da capir", "difficile trovare", "non si trova",
+        "grafica brutta", "design brutto", "layout confuso", "troppo complicat",
+        "poco chiaro",
+    ],
+    "FEATURES_FUNZIONALITA": [
+        "manca la funzione", "non c e", "vorrei che", "sarebbe utile",
+        "aggiungete per favore", "quando arriva", "implementate", "funzione assente",
+        "apple pay non disponibile", "google pay mancante", "bonifico istantaneo",
+        "notifiche push", "widget mancante", "face id non funziona", "touch id",
+        "impronta digitale", "non posso fare", "non permette di", "funzione limitata",
+        "ha tutto quello", "ricco di funzioni", "funzionalita mancante",
+        "funzione mancante", "non c e la funzione", "non ha la funzione",
+        "manca la possibilita", "manca l opzione", "vorrei che ci fosse",
+        "sarebbe utile avere", "non si puo", "impossibile fare", "feature mancante",
+    ],
+    "CUSTOMER_SUPPORT": [
+        "assistenza clienti", "servizio clienti", "customer care", "nessuna risposta",
+        "non rispondono", "mai risposto", "problema risolto", "hanno risolto",
+        "hanno aiutato", "assistenza veloce", "assistenza lenta", "tempo di attesa",
+        "operatore scortese", "operatore gentile", "supporto inutile",
+        "supporto efficiente", "chat lenta", "risposta immediata", "attesa infinita",
+        "non rispondono", "non mi hanno risposto", "supporto inutile",
+        "assistenza pessima", "supporto lento", "rimborso negato", "non rimborsano",
+        "non vogliono rimborsare", "account sospeso", "account bannato",
+        "account bloccato", "account cancellat",
+    ],
+}
+
+PROBLEM_KEYWORDS = {
+    "BUGS_TECNICI": [
+        "crash", "crashato", "crashat", "bloccat", "blocc", "errore", "errat", "bug",
+        "glitch", "freezat", "congelat", "rott", "guast", "instabil", "difett", "lento",
+        "lagga", "lag", "scatta",
+    ],
+    "ONBOARDING_SETUP": [
+        "registrazion", "onboard", "configurazion", "installazion", "account",
+        "accessibil", "acceder", "autenticazion", "setup", "configurar", "attivar",
+        "iscrizione", "spid", "cie", "documento", "selfie",
+    ],
+    "UX_USABILITA": [
+        "interfaccia", "usabilita", "naviga", "grafic", "design", "layout", "intuitiv",
+        "semplicita", "complicat", "confus", "disorientant", "accessibil",
+        "leggibilita", "menu", "brutto", "bello", "moderno", "obsoleto", "disordinato",
+    ],
+    "FEATURES_FUNZIONALITA": [
+        "mancant", "assent", "funzionalita", "funzion", "opzion", "possibilita",
+        "aggiunger", "miglior", "aggiornament", "sviluppar", "implementar", "richiesta",
+        "necessari", "manca", "bonifico", "pagamento", "ricarica", "carta", "prelievo",
+        "versamento", "notifiche", "widget", "cashback", "contactless",
+    ],
+    "CUSTOMER_SUPPORT": [
+        "assistenza", "support", "rimborso", "risposta", "contatto", "operatore",
+        "lamentela", "reclamo", "segnalazion", "ignor", "abbandono", "chat", "telefono",
+        "email", "ticket", "gentile", "scortese",
+    ],
+}
+
+PROBLEM_POSITIVE_MODIFIERS = [
+    "finalmente", "ottimo", "bene", "benissimo", "migliorato", "perfetto", "eccellente",
+    "fantastico", "ora funziona", "adesso va", "risolto", "sistemato", "funziona bene",
+    "funziona perfettamente", "ora va", "adesso funziona",
+]
+
+PROBLEM_NEGATIVE_MODIFIERS = [
+    "purtroppo", "ancora", "sempre", "peggio", "peggiorato", "inutile", "pessimo",
+    "terribile", "continua a", "non funziona piu", "sempre peggio",
+]
+
+PROBLEM_STEM_SUFFIXES = [
+    "azione", "azioni", "mente", "abile", "ibile", "ando", "endo", "ato", "ata", "ati",
+    "ate", "oso", "osa", "osi", "ose", "are", "ere", "ire", "ico", "ica", "ici", "iche",
+    "ale", "ali", "ivo", "iva", "ivi", "ive",
+]
@@ -1,9 +1,20 @@
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.routers import apps, reviews, analysis, export, jobs, feedback
+from app.services import http_client
+from app.services.datasets import DatasetError
 
-app = FastAPI(title="App Store Reviewer API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await http_client.aclose()
+
+
+app = FastAPI(title="App Store Reviewer API", version="1.0.0", lifespan=lifespan)
 
 # Explicit origins from env (comma-separated), e.g. custom domains
 allowed_origins = os.environ.get(
@@ -27,6 +38,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(DatasetError)
+async def dataset_error_handler(request: Request, exc: DatasetError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+
+
 app.include_router(apps.router)
 app.include_router(reviews.router)
 app.include_router(analysis.router)
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
+from datetime import date
+from typing import Literal, Optional
 
 
 class Review(BaseModel):
@@ -60,34 +61,70 @@ class Theme(BaseModel):
     matching_count: int
 
 
+class DatasetRef(BaseModel):
+    """Reviews of a finished scrape job, referenced instead of re-uploaded."""
+    job_id: str
+    ratings: Optional[list[int]] = None
+    date_from: Optional[date] = None  # inclusive, by review day
+    date_to: Optional[date] = None
+
+
 class SentimentRequest(BaseModel):
-    texts: list[str]
+    texts: Optional[list[str]] = None
+    dataset: Optional[DatasetRef] = None  # texts become "title review"
 
 
 class AdjustedMetricsRequest(BaseModel):
-    reviews: list[Review]
+    reviews: Optional[list[Review]] = None
+    dataset: Optional[DatasetRef] = None
 
 
 class ThemesRequest(BaseModel):
-    reviews: list[Review]
+    reviews: Optional[list[Review]] = None
+    dataset: Optional[DatasetRef] = None
     rating_min: int = 1
     rating_max: int = 2
 
 
 class KeywordsRequest(BaseModel):
-    texts: list[str]
+    texts: Optional[list[str]] = None
+    dataset: Optional[DatasetRef] = None  # texts become the review bodies
     top_n: int = 30
 
 
+AnalysisName = Literal["sentiment", "adjusted_metrics", "themes", "keywords"]
+
+
+class AllAnalysisRequest(BaseModel):
+    reviews: Optional[list[Review]] = None
+    dataset: Optional[DatasetRef] = None
+    analyses: list[AnalysisName] = ["sentiment", "adjusted_metrics", "themes", "keywords"]
+    theme_ranges: list[tuple[int, int]] = [(1, 2), (4, 5)]
+    keywords_top_n: int = 30
+
+
 class ExcelExportRequest(BaseModel):
-    reviews: list[Review]
+    reviews: Optional[list[Review]] = None
+    dataset: Optional[DatasetRef] = None
 
 
 class ComparisonExcelRequest(BaseModel):
-    apps: dict[str, list[Review]]
+    apps: dict[str, list[Review]] = {}
+    datasets: dict[str, DatasetRef] = {}  # per app, alongside or instead of `apps`
     app_names: dict[str, str]
 
 
+ExportFileFormat = Literal["xlsx", "csv", "ndjson", "parquet", "arrow"]
+
+
+class ExportJobRequest(ExcelExportRequest):
+    format: ExportFileFormat = "xlsx"
+
+
+class ComparisonExportJobRequest(ComparisonExcelRequest):
+    format: ExportFileFormat = "xlsx"
+
+
 class SSEProgress(BaseModel):
     page: int
     total_pages: int
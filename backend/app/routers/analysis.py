@@ -1,52 +1,131 @@
+import asyncio
+import threading
+from typing import Literal
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from app.models.schemas import (
     SentimentRequest,
     AdjustedMetricsRequest,
     ThemesRequest,
     KeywordsRequest,
+    AllAnalysisRequest,
 )
 from app.services.sentiment import compute_sentiment, extract_keywords
 from app.services.classification import compute_adjusted_metrics
 from app.services.themes import cluster_reviews_by_theme
-from app.services.problem_classifier import classify_batch
+from app.services.insights import analyze_all
+from app.services.datasets import resolve_reviews, resolve_texts
+from app.services.sse import sse_format
+from app.services.problem_classifier import classify_problems as run_classify_problems
 
 router = APIRouter(prefix="/api/analysis", tags=["analysis"])
 
+KEEPALIVE_SECONDS = 15  # SSE comment while waiting on the LLM, so proxies don't drop an idle stream
+
 
 class ClassifyProblemsRequest(BaseModel):
     texts: list[str]
+    # llm: DeepSeek; local: offline keyword engine; hybrid: local, LLM for the uncertain ones
+    mode: Literal["llm", "local", "hybrid"] = "llm"
 
 
 @router.post("/sentiment")
 def sentiment(req: SentimentRequest):
-    return compute_sentiment(req.texts)
+    return compute_sentiment(resolve_texts(req.texts, req.dataset))
 
 
 @router.post("/adjusted-metrics")
 def adjusted_metrics(req: AdjustedMetricsRequest):
-    reviews = [r.model_dump() for r in req.reviews]
+    reviews = resolve_reviews(req.reviews, req.dataset)
     return compute_adjusted_metrics(reviews)
 
 
 @router.post("/themes")
 def themes(req: ThemesRequest):
-    reviews = [r.model_dump() for r in req.reviews]
+    reviews = resolve_reviews(req.reviews, req.dataset)
     return cluster_reviews_by_theme(reviews, req.rating_min, req.rating_max)
 
 
 @router.post("/keywords")
 def keywords(req: KeywordsRequest):
-    result = extract_keywords(req.texts, req.top_n)
+    result = extract_keywords(resolve_texts(req.texts, req.dataset, bodies_only=True), req.top_n)
     return [{"word": w, "count": c} for w, c in result]
 
 
+@router.post("/all")
+def all_analyses(req: AllAnalysisRequest):
+    """Sentiment, adjusted metrics, themes and keywords in one call, so reviews are uploaded once."""
+    reviews = resolve_reviews(req.reviews, req.dataset)
+    return analyze_all(reviews, req.analyses, req.theme_ranges, req.keywords_top_n)
+
+
 @router.post("/classify-problems")
 def classify_problems(req: ClassifyProblemsRequest):
     """
     Classify review texts into problem categories using an LLM.
     Returns one array of category strings per input text.
-    Requires ANTHROPIC_API_KEY env var; returns empty arrays if not set.
+    Requires DEEPSEEK_API_KEY env var for the llm mode; returns empty arrays if not set.
+    mode="local" runs the offline classifier instead, and "hybrid" only asks the LLM
+    about reviews the offline classifier is unsure of.
     """
-    results = classify_batch(req.texts)
+    results = run_classify_problems(req.texts, req.mode)
     return [{"categories": cats} for cats in results]
+
+
+@router.post("/classify-problems/stream")
+async def classify_problems_stream(req: ClassifyProblemsRequest):
+    """
+    Same classification as /classify-problems, streamed as SSE so long runs don't
+    hit request timeouts. Emits `results` {indices, categories, done, total} as each
+    chunk finishes (cached answers first, in no fixed order), then `complete` {total}.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    total = len(req.texts)
+    # Cancelling the task doesn't stop the worker thread; this tells it to stop sending chunks
+    cancel = threading.Event()
+
+    def on_chunk(indices: list[int], categories: list[list[str]]):
+        loop.call_soon_threadsafe(queue.put_nowait, ("results", {"indices": indices, "categories": categories}))
+
+    async def run():
+        try:
+            await run_in_threadpool(run_classify_problems, req.texts, req.mode, on_chunk, cancel)
+        except Exception as e:
+            queue.put_nowait(("error", {"message": f"{type(e).__name__}: {e}"}))
+        finally:
+            queue.put_nowait(None)
+
+    async def event_stream():
+        task = asyncio.create_task(run())
+        done = 0
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    break
+                event_type, data = item
+                if event_type == "results":
+                    done += len(data["indices"])
+                    data = {**data, "done": done, "total": total}
+                yield sse_format(event_type, data)
+            yield sse_format("complete", {"total": total})
+        finally:
+            cancel.set()
+            task.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -1,8 +1,6 @@
-import urllib.request
-import json
-import ssl
 from fastapi import APIRouter, Query
-from app.services.appstore import search_apps, lookup_app_name
+from app.services.appstore import search_apps, lookup_app_name, search_cache, lookup_cache
+from app.services.http_client import session
 
 router = APIRouter(prefix="/api/apps", tags=["apps"])
 
@@ -16,17 +14,15 @@ def search(query: str = Query(...), country: str = Query("us"), limit: int = Que
 @router.get("/trustpilot/search")
 def search_trustpilot(query: str = Query(...), limit: int = Query(8)):
     """Search Trustpilot autocomplete for company names."""
-    url = f"https://www.trustpilot.com/api/v1/autocomplete/search?query={urllib.parse.quote(query)}&language=en"
     try:
-        import urllib.parse
-        url = f"https://www.trustpilot.com/api/v1/autocomplete/search?query={urllib.parse.quote(query)}&language=en"
-        req = urllib.request.Request(
-            url,
+        resp = session.get(
+            "https://www.trustpilot.com/api/v1/autocomplete/search",
+            params={"query": query, "language": "en"},
             headers={"User-Agent": "Mozilla/5.0", "Accept": "application/json"},
+            timeout=8,
         )
-        ctx = ssl.create_default_context()
-        with urllib.request.urlopen(req, timeout=8, context=ctx) as resp:
-            data = json.loads(resp.read())
+        resp.raise_for_status()
+        data = resp.json()
         businesses = data.get("businesses", []) or []
         results = []
         for b in businesses[:limit]:
@@ -42,6 +38,11 @@ def search_trustpilot(query: str = Query(...), limit: int = Query(8)):
         return []
 
 
+@router.get("/cache/stats")
+def cache_stats():
+    return [search_cache.stats(), lookup_cache.stats()]
+
+
 @router.get("/{app_id}")
 def get_app(app_id: str, country: str = Query("us")):
     name = lookup_app_name(app_id, country)
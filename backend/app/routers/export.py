@@ -1,28 +1,50 @@
 from fastapi import APIRouter
-from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 from app.models.schemas import ExcelExportRequest, ComparisonExcelRequest
-from app.services.excel import create_excel, create_comparison_excel
+from app.services.excel import XLSX_MEDIA_TYPE, rating_sheets, app_sheets, export_columns, build_sheets, iter_file
+from app.services.table_export import ExportFormat, MEDIA_TYPES, stream_table
+from app.services.datasets import resolve_reviews, comparison_apps
 
 router = APIRouter(prefix="/api/export", tags=["export"])
 
 
 @router.post("/excel")
 def export_excel(req: ExcelExportRequest):
-    reviews = [r.model_dump() for r in req.reviews]
-    content = create_excel(reviews)
-    return Response(
-        content=content,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    reviews = resolve_reviews(req.reviews, req.dataset)
+    return StreamingResponse(
+        iter_file(build_sheets(rating_sheets(reviews), export_columns(reviews))),
+        media_type=XLSX_MEDIA_TYPE,
         headers={"Content-Disposition": "attachment; filename=reviews.xlsx"},
     )
 
 
 @router.post("/comparison-excel")
 def export_comparison_excel(req: ComparisonExcelRequest):
-    apps = {k: [r.model_dump() for r in v] for k, v in req.apps.items()}
-    content = create_comparison_excel(apps, req.app_names)
-    return Response(
-        content=content,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    apps = comparison_apps(req)
+    return StreamingResponse(
+        iter_file(build_sheets(app_sheets(apps, req.app_names))),
+        media_type=XLSX_MEDIA_TYPE,
         headers={"Content-Disposition": "attachment; filename=comparison_reviews.xlsx"},
     )
+
+
+@router.post("/comparison-{fmt}")
+def export_comparison_table(fmt: ExportFormat, req: ComparisonExcelRequest):
+    """Comparison export as csv, ndjson, parquet or arrow; the `partition` column names the app."""
+    apps = comparison_apps(req)
+    return StreamingResponse(
+        stream_table(app_sheets(apps, req.app_names), fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename=comparison_reviews.{fmt}"},
+    )
+
+
+@router.post("/{fmt}")
+def export_table(fmt: ExportFormat, req: ExcelExportRequest):
+    """Single-app export as csv, ndjson, parquet or arrow; the `partition` column is the rating sheet."""
+    reviews = resolve_reviews(req.reviews, req.dataset)
+    return StreamingResponse(
+        stream_table(rating_sheets(reviews), fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename=reviews.{fmt}"},
+    )
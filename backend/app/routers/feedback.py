@@ -1,7 +1,7 @@
 import os
-import httpx
 from fastapi import APIRouter
 from pydantic import BaseModel
+from app.services.http_client import get_async_client
 
 router = APIRouter(prefix="/api/feedback", tags=["feedback"])
 
@@ -21,7 +21,6 @@ async def submit_feedback(payload: FeedbackPayload):
     text = f"💡 Feature request\n\n{payload.comment.strip()}"
 
     url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    async with httpx.AsyncClient(timeout=10) as client:
-        await client.post(url, json={"chat_id": TELEGRAM_CHAT_ID, "text": text})
+    await get_async_client().post(url, json={"chat_id": TELEGRAM_CHAT_ID, "text": text})
 
     return {"ok": True}
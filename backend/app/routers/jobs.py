@@ -1,46 +1,160 @@
+import os
 import uuid
+import asyncio
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from app.services.appstore import fetch_reviews_simple
+from app.models.schemas import ExportJobRequest, ComparisonExportJobRequest
+from app.services.sse import sse_format
+from app.services import review_store, export_store, job_events
+from app.services.job_store import job_store as _jobs  # in-memory or SQLite depending on JOB_STORE
+from app.services.scheduler import scheduler
+from app.services.appstore import fetch_reviews_simple, lookup_app_name
 from app.services.trustpilot import clean_domain, fetch_reviews_simple as tp_fetch_reviews_simple
+from app.services.excel import XLSX_MEDIA_TYPE, rating_sheets, app_sheets, export_columns, write_sheets
+from app.services.table_export import MEDIA_TYPES, write_export
+from app.services.datasets import resolve_reviews, comparison_apps
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
-# In-memory job store: job_id -> job dict
-_jobs: dict[str, dict] = {}
+DEFAULT_PAGE_SIZE = 500  # reviews per paged /result read
+MAX_PAGE_SIZE = 5000
+COMPARE_CONCURRENCY = int(os.environ.get("COMPARE_CONCURRENCY", "6"))  # apps fetched at once per comparison
+EVENTS_RECHECK_SECONDS = 1.0  # re-read the store even without a local write (another worker may own the job)
+KEEPALIVE_SECONDS = 15
 
 
-def _run_appstore(job_id: str, app_id: str, country: str, max_pages: int, cutoff_date: datetime):
+def _isoformat_dates(reviews: list[dict]) -> list[dict]:
+    return [
+        {**r, "date": r["date"].isoformat() if hasattr(r["date"], "isoformat") else r["date"]}
+        for r in reviews
+    ]
+
+
+def _finish_fetch(job_id: str, source: str, feed: str, fresh: list[dict], cutoff_date: datetime,
+                  known: set[str] | None, reached_cutoff: bool, incremental: bool, **fields):
+    """Persist the fetched reviews and finish the job.
+
+    In incremental mode the fetched pages weren't streamed into the job; they are
+    added here together with the stored remainder, most recent first.
+    The feed only counts as covered back to cutoff_date when this was a full fetch
+    that actually got there (not cut short by max_pages or an error).
+    """
+    review_store.save(source, feed, fresh, cutoff_date, full=known is None and reached_cutoff)
+    if incremental:
+        stored = review_store.load_missing(source, feed, cutoff_date, fresh)
+        _jobs.append_reviews(job_id, review_store.merge_newest_first(fresh, stored))
+    _jobs.update(job_id, status="done", **fields)
+
+
+def _stream_pages(job_id: str, incremental: bool, transform=None):
+    """on_page callback adding each fetched page to the job; None in incremental mode (see _finish_fetch)."""
+    if incremental:
+        return None
+    return lambda page: _jobs.append_reviews(job_id, transform(page) if transform else page)
+
+
+def _run_appstore(job_id: str, app_id: str, country: str, max_pages: int, cutoff_date: datetime, incremental: bool):
+    try:
+        _jobs.update(job_id, status="running")
+        feed = f"{app_id}:{country}"
+        known = review_store.known_keys("appstore", feed, cutoff_date) if incremental else None
+        reviews, reached_cutoff = fetch_reviews_simple(
+            app_id, country, max_pages, cutoff_date, known_keys=known,
+            on_page=_stream_pages(job_id, incremental, _isoformat_dates),
+        )
+        _finish_fetch(
+            job_id, "appstore", feed, _isoformat_dates(reviews), cutoff_date, known, reached_cutoff, incremental,
+        )
+    except Exception as e:
+        _jobs.update(job_id, status="error", error=str(e))
+
+
+def _run_trustpilot(job_id: str, domain: str, max_pages: int, cutoff_date: datetime, incremental: bool):
+    try:
+        _jobs.update(job_id, status="running")
+        known = review_store.known_keys("trustpilot", domain, cutoff_date) if incremental else None
+        reviews, business_info, reached_cutoff = tp_fetch_reviews_simple(
+            domain, max_pages, cutoff_date, known_keys=known,
+            on_page=_stream_pages(job_id, incremental),
+        )
+        _finish_fetch(
+            job_id, "trustpilot", domain, reviews, cutoff_date, known, reached_cutoff, incremental,
+            business_info=business_info,
+        )
+    except Exception as e:
+        _jobs.update(job_id, status="error", error=str(e))
+
+
+def _run_compare(job_id: str, app_ids: list[str], app_names: dict[str, str], country: str,
+                 max_pages: int, cutoff_date: datetime):
+    """Fetch every app of a comparison at once. Reviews are tagged with their app_id;
+    per-app status and counts are kept in the job's `apps` field."""
+    lock = threading.Lock()
+    progress = {
+        app_id: {"name": app_names.get(app_id), "status": "pending", "total": 0, "error": None}
+        for app_id in app_ids
+    }
+
+    def set_progress(app_id: str, added: int = 0, **fields):
+        # Under the lock, so concurrent apps never overwrite each other's counts
+        with lock:
+            progress[app_id]["total"] += added
+            progress[app_id].update(fields)
+            _jobs.update(job_id, apps={k: dict(v) for k, v in progress.items()})
+
+    def on_page(app_id: str, page: list[dict]):
+        _jobs.append_reviews(job_id, [{**r, "app_id": app_id} for r in _isoformat_dates(page)])
+        set_progress(app_id, added=len(page))
+
+    def fetch_app(app_id: str):
+        try:
+            set_progress(app_id, status="running")
+            if not progress[app_id]["name"]:
+                set_progress(app_id, name=lookup_app_name(app_id, country))
+            reviews, reached_cutoff = fetch_reviews_simple(
+                app_id, country, max_pages, cutoff_date, on_page=lambda page: on_page(app_id, page),
+            )
+            review_store.save(
+                "appstore", f"{app_id}:{country}", _isoformat_dates(reviews), cutoff_date, full=reached_cutoff,
+            )
+            set_progress(app_id, status="done")
+        except Exception as e:
+            set_progress(app_id, status="error", error=str(e))
+
     try:
-        _jobs[job_id]["status"] = "running"
-        reviews = fetch_reviews_simple(app_id, country, max_pages, cutoff_date)
-        _jobs[job_id]["reviews"] = [
-            {**r, "date": r["date"].isoformat() if hasattr(r["date"], "isoformat") else r["date"]}
-            for r in reviews
-        ]
-        _jobs[job_id]["status"] = "done"
-        _jobs[job_id]["total"] = len(reviews)
+        _jobs.update(job_id, status="running")
+        with ThreadPoolExecutor(max_workers=max(1, min(COMPARE_CONCURRENCY, len(app_ids)))) as pool:
+            list(pool.map(fetch_app, app_ids))
+        failed = [app_id for app_id in app_ids if progress[app_id]["status"] == "error"]
+        if failed and len(failed) == len(app_ids):
+            # Nothing to compare; per-app errors stay in `apps`
+            _jobs.update(job_id, status="error", error=f"Every app failed to fetch ({progress[failed[0]]['error']})")
+        else:
+            _jobs.update(job_id, status="done")
     except Exception as e:
-        _jobs[job_id]["status"] = "error"
-        _jobs[job_id]["error"] = str(e)
+        _jobs.update(job_id, status="error", error=str(e))
 
 
-def _run_trustpilot(job_id: str, domain: str, max_pages: int, cutoff_date: datetime):
+def _run_export(job_id: str, sheets: list[tuple[str, list[dict]]], fmt: str, columns: list[str] | None):
     try:
-        _jobs[job_id]["status"] = "running"
-        reviews, business_info = tp_fetch_reviews_simple(domain, max_pages, cutoff_date)
-        _jobs[job_id]["reviews"] = [
-            {**r, "date": r["date"].isoformat() if hasattr(r["date"], "isoformat") else r["date"]}
-            for r in reviews
-        ]
-        _jobs[job_id]["business_info"] = business_info
-        _jobs[job_id]["status"] = "done"
-        _jobs[job_id]["total"] = len(reviews)
+        _jobs.update(job_id, status="running")
+        export_store.sweep()
+        if fmt == "xlsx":
+            path = export_store.write_artifact(job_id, fmt, lambda fp: write_sheets(sheets, fp, columns))
+        else:
+            path = export_store.write_artifact(job_id, fmt, lambda fp: write_export(sheets, fmt, fp))
+        # The file is on this host's disk; the job record (maybe shared via SQLite) says where
+        _jobs.update(
+            job_id, status="done", size=os.path.getsize(path), artifact_path=path,
+            artifact_host=export_store.HOSTNAME, download_url=f"/api/jobs/export/{job_id}/download",
+        )
     except Exception as e:
-        _jobs[job_id]["status"] = "error"
-        _jobs[job_id]["error"] = str(e)
+        _jobs.update(job_id, status="error", error=str(e))
 
 
 class AppStoreJobRequest(BaseModel):
@@ -48,64 +162,270 @@ class AppStoreJobRequest(BaseModel):
     country: str = "it"
     max_pages: int = 10
     cutoff_days: int = 365
+    incremental: bool = False  # only fetch pages newer than the local review store
+
+
+class CompareJobRequest(BaseModel):
+    app_ids: list[str]
+    app_names: dict[str, str] = {}  # looked up for any app missing here
+    country: str = "it"
+    max_pages: int = 10
+    cutoff_days: int = 365
 
 
 class TrustpilotJobRequest(BaseModel):
     domain: str
     max_pages: int = 10
     cutoff_days: int = 365
+    incremental: bool = False
+
+
+def _start_job(source: str, dedup_key: str, fn, *args) -> dict:
+    """Queue a scrape job, or attach to an identical one that is still in flight."""
+    job_id = str(uuid.uuid4())
+    job = {"status": "pending", "total": 0, "reviews": [], "business_info": None}
+    existing_id = _jobs.create(job_id, job, dedup_key=dedup_key)
+    if existing_id != job_id:
+        return {"job_id": existing_id, "coalesced": True}
+    scheduler.submit(job_id, source, fn, job_id, *args)
+    return {"job_id": job_id, "coalesced": False}
 
 
 @router.post("/appstore/start")
 def start_appstore_job(req: AppStoreJobRequest):
-    job_id = str(uuid.uuid4())
     cutoff_date = datetime.now(timezone.utc) - timedelta(days=req.cutoff_days)
-    _jobs[job_id] = {"status": "pending", "total": 0, "reviews": [], "business_info": None}
-    thread = threading.Thread(
-        target=_run_appstore,
-        args=(job_id, req.app_id, req.country, req.max_pages, cutoff_date),
-        daemon=True,
+    dedup_key = f"appstore|{req.app_id}|{req.country}|{req.max_pages}|{req.cutoff_days}|{req.incremental}"
+    return _start_job(
+        "appstore", dedup_key, _run_appstore,
+        req.app_id, req.country, req.max_pages, cutoff_date, req.incremental,
     )
-    thread.start()
-    return {"job_id": job_id}
 
 
 @router.post("/trustpilot/start")
 def start_trustpilot_job(req: TrustpilotJobRequest):
-    job_id = str(uuid.uuid4())
     cutoff_date = datetime.now(timezone.utc) - timedelta(days=req.cutoff_days)
     domain = clean_domain(req.domain)
-    _jobs[job_id] = {"status": "pending", "total": 0, "reviews": [], "business_info": None}
-    thread = threading.Thread(
-        target=_run_trustpilot,
-        args=(job_id, domain, req.max_pages, cutoff_date),
-        daemon=True,
+    dedup_key = f"trustpilot|{domain}|{req.max_pages}|{req.cutoff_days}|{req.incremental}"
+    return _start_job(
+        "trustpilot", dedup_key, _run_trustpilot,
+        domain, req.max_pages, cutoff_date, req.incremental,
     )
-    thread.start()
-    return {"job_id": job_id}
 
 
-@router.get("/status/{job_id}")
-def get_job_status(job_id: str):
+@router.post("/compare/start")
+def start_compare_job(req: CompareJobRequest):
+    """One job fetching all apps of a comparison concurrently; /status reports per-app progress."""
+    app_ids = list(dict.fromkeys(req.app_ids))
+    if not app_ids:
+        raise HTTPException(status_code=422, detail="No apps to compare")
+    cutoff_date = datetime.now(timezone.utc) - timedelta(days=req.cutoff_days)
+    dedup_key = f"compare|{','.join(sorted(app_ids))}|{req.country}|{req.max_pages}|{req.cutoff_days}"
+    job_id = str(uuid.uuid4())
+    job = {
+        "status": "pending", "total": 0, "reviews": [], "business_info": None, "kind": "compare",
+        "apps": {a: {"name": req.app_names.get(a), "status": "pending", "total": 0, "error": None} for a in app_ids},
+    }
+    existing_id = _jobs.create(job_id, job, dedup_key=dedup_key)
+    if existing_id != job_id:
+        return {"job_id": existing_id, "coalesced": True}
+    scheduler.submit(
+        job_id, "appstore", _run_compare,
+        job_id, app_ids, req.app_names, req.country, req.max_pages, cutoff_date,
+    )
+    return {"job_id": job_id, "coalesced": False}
+
+
+@router.get("/compare/result/{job_id}")
+def get_compare_result(job_id: str):
+    """Reviews of a finished comparison grouped by app, with each app's name and outcome."""
     job = _jobs.get(job_id)
-    if not job:
+    if not job or job.get("kind") != "compare":
         raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "done":
+        raise HTTPException(status_code=400, detail="Job not complete yet")
+    reviews_by_app: dict[str, list[dict]] = {app_id: [] for app_id in job["apps"]}
+    for r in job["reviews"]:
+        reviews_by_app[r["app_id"]].append({k: v for k, v in r.items() if k != "app_id"})
+    return {"apps": reviews_by_app, "app_names": {a: p["name"] for a, p in job["apps"].items()}, "progress": job["apps"]}
+
+
+def _start_export(sheets: list[tuple[str, list[dict]]], fmt: str, filename: str,
+                  columns: list[str] | None = None) -> dict:
+    """Queue an export job; `total` is the number of reviews going into the file.
+    `columns` is the shared sheet header for xlsx (see write_sheets)."""
+    job_id = str(uuid.uuid4())
+    job = {
+        "status": "pending", "total": sum(len(rows) for _, rows in sheets), "reviews": [], "business_info": None,
+        "kind": "export", "format": fmt, "filename": f"{filename}.{fmt}",
+    }
+    _jobs.create(job_id, job)
+    scheduler.submit(job_id, "export", _run_export, job_id, sheets, fmt, columns)
+    return {"job_id": job_id}
+
+
+@router.post("/export/start")
+def start_export_job(req: ExportJobRequest):
+    """Build /api/export/* output in the background; poll /status, then fetch its download_url."""
+    reviews = resolve_reviews(req.reviews, req.dataset)
+    return _start_export(rating_sheets(reviews), req.format, "reviews", export_columns(reviews))
+
+
+@router.post("/export/comparison/start")
+def start_comparison_export_job(req: ComparisonExportJobRequest):
+    apps = comparison_apps(req)
+    return _start_export(app_sheets(apps, req.app_names), req.format, "comparison_reviews")
+
+
+@router.get("/export/{job_id}/download")
+def download_export(job_id: str):
+    job = _jobs.get(job_id, with_reviews=False)
+    if not job or job.get("kind") != "export":
+        raise HTTPException(status_code=404, detail="Export not found")
+    if job["status"] != "done":
+        raise HTTPException(status_code=400, detail="Export not complete yet")
+    export_store.sweep()
+    path = export_store.find_artifact(job.get("artifact_path"))
+    if path is None:
+        if job.get("artifact_host") != export_store.HOSTNAME:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Export was built on host {job.get('artifact_host')} and its file is not available here; "
+                       "EXPORT_DIR must be shared by every worker, or run a single host",
+            )
+        raise HTTPException(status_code=410, detail="Export expired")
+    media_type = XLSX_MEDIA_TYPE if job["format"] == "xlsx" else MEDIA_TYPES[job["format"]]
+    return FileResponse(path, media_type=media_type, filename=job["filename"])
+
+
+def _status_payload(job_id: str, job: dict) -> dict:
     return {
         "status": job["status"],
         "total": job["total"],
         "error": job.get("error"),
+        # Only known to the worker process that queued the job
+        "queue_position": scheduler.position(job_id) if job["status"] == "pending" else None,
+        "download_url": job.get("download_url"),  # export jobs, once done
+        "apps": job.get("apps"),  # compare jobs: per-app status and review counts
+        "business_info": job.get("business_info"),  # trustpilot jobs, once done
     }
 
 
+@router.get("/status/{job_id}")
+def get_job_status(job_id: str):
+    job = _jobs.get(job_id, with_reviews=False)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _status_payload(job_id, job)
+
+
+@router.get("/events/{job_id}")
+async def job_events_stream(
+    job_id: str,
+    with_reviews: bool = False,
+    cursor: int = Query(0, ge=0),
+    last_event_id: str | None = Header(None),
+):
+    """
+    Server-sent events for one job, replacing /status polling.
+    Emits `status` (same body as /status) whenever it changes and, with `with_reviews`,
+    `reviews` {reviews, next_cursor} as reviews are added, starting at `cursor`.
+    Ends with `complete` (the final status) once the job is done or failed and every
+    review has been sent. Event ids are review cursors, so an EventSource reconnect
+    resumes via Last-Event-ID without repeating reviews.
+    """
+    job = await run_in_threadpool(_jobs.get, job_id, False)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if last_event_id and last_event_id.isdigit():
+        cursor = int(last_event_id)
+
+    async def event_stream():
+        nonlocal cursor
+        changed = job_events.subscribe(job_id)
+        last_status = None
+        idle = 0.0
+        try:
+            while True:
+                changed.clear()
+                current = await run_in_threadpool(_jobs.get, job_id, False)
+                if current is None:
+                    yield sse_format("error", {"message": "Job not found or expired"})
+                    return
+                status = _status_payload(job_id, current)
+                if status != last_status:
+                    last_status = status
+                    idle = 0.0
+                    yield sse_format("status", status, str(cursor))
+
+                finished = current["status"] in ("done", "error")
+                if with_reviews:
+                    while True:
+                        page = await run_in_threadpool(_jobs.get_reviews, job_id, cursor, DEFAULT_PAGE_SIZE)
+                        if not page:
+                            break
+                        cursor += len(page)
+                        idle = 0.0
+                        yield sse_format("reviews", {"reviews": page, "next_cursor": cursor}, str(cursor))
+                if finished:
+                    yield sse_format("complete", status, str(cursor))
+                    return
+
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=EVENTS_RECHECK_SECONDS)
+                except asyncio.TimeoutError:
+                    idle += EVENTS_RECHECK_SECONDS
+                    if idle >= KEEPALIVE_SECONDS:
+                        idle = 0.0
+                        yield ": keep-alive\n\n"
+        finally:
+            job_events.unsubscribe(job_id, changed)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @router.get("/result/{job_id}")
-def get_job_result(job_id: str):
-    job = _jobs.get(job_id)
+def get_job_result(
+    job_id: str,
+    cursor: int | None = Query(None, ge=0),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+):
+    """Whole result once the job is done, or — with cursor/limit — one page of it at any time.
+
+    Paged reads work while the job is still running: pass back `next_cursor` on the
+    next poll to receive only the reviews added since.
+    """
+    if cursor is None and limit is None:
+        job = _jobs.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job["status"] != "done":
+            raise HTTPException(status_code=400, detail="Job not complete yet")
+        return {
+            "reviews": job["reviews"],
+            "total": job["total"],
+            "business_info": job.get("business_info"),
+        }
+
+    job = _jobs.get(job_id, with_reviews=False)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    if job["status"] != "done":
-        raise HTTPException(status_code=400, detail="Job not complete yet")
+    cursor = cursor or 0
+    reviews = _jobs.get_reviews(job_id, cursor, limit or DEFAULT_PAGE_SIZE)
+    next_cursor = cursor + len(reviews)
     return {
-        "reviews": job["reviews"],
+        "reviews": reviews,
         "total": job["total"],
         "business_info": job.get("business_info"),
+        "status": job["status"],
+        "error": job.get("error"),
+        "next_cursor": next_cursor,
+        "complete": job["status"] in ("done", "error") and next_cursor >= job["total"],
     }
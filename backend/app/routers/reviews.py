@@ -1,29 +1,110 @@
-import json
+import zlib
 from datetime import datetime, timedelta, timezone
-from fastapi import APIRouter, Query
+from typing import Literal
+from fastapi import APIRouter, Header, Query
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.services import review_store
+from app.services.sse import sse_format
 from app.services.appstore import fetch_reviews_generator
 from app.services.trustpilot import clean_domain, fetch_reviews_generator as tp_fetch_reviews_generator
 
 router = APIRouter(prefix="/api/reviews", tags=["reviews"])
 
 
-def sse_format(event: str, data: dict) -> str:
-    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+def parse_resume_token(token: str | None) -> tuple[int, int, int]:
+    """Last-Event-ID -> (next_page, reviews already sent, running checksum); a fresh start if absent."""
+    try:
+        next_page, total, checksum = token.split(".")
+        return max(1, int(next_page)), int(total), int(checksum, 16)
+    except (AttributeError, ValueError):
+        return 1, 0, 0
+
+
+async def summarize_complete(events, total: int = 0, checksum: int = 0):
+    """Yield (event_type, data, event_id) with a lightweight `complete`.
+
+    Reviews only travel in reviews_chunk events, each tagged with a resume token
+    "<next_page>.<total>.<crc32>" that clients send back as Last-Event-ID. The final
+    `complete` carries the review count and the CRC32 over the review keys in order
+    instead of the full review list.
+    """
+    token = None
+    async for event_type, data in events:
+        if event_type == "reviews_chunk":
+            for r in data["reviews"]:
+                checksum = zlib.crc32(review_store.review_key(r).encode(), checksum)
+            total += len(data["reviews"])
+            if "next_page" in data:
+                token = f"{data['next_page']}.{total}.{checksum:08x}"
+                yield event_type, data, token
+                continue
+        elif event_type == "complete":
+            summary = {k: v for k, v in data.items() if k != "reviews"}
+            summary.update(total=total, checksum=f"{checksum:08x}", resume_token=token)
+            yield event_type, summary, None
+            continue
+        yield event_type, data, None
+
+
+async def with_review_store(events, source: str, feed: str, cutoff_date: datetime, full: bool, incremental: bool):
+    """Persist the fetched reviews on `complete`; in incremental mode also send the stored ones.
+
+    `full` says the stream was meant to fetch the whole range (not incremental, not
+    resumed); the feed is only marked as covered if the fetcher's `complete` also
+    reports that it read back past cutoff_date.
+    """
+    async for event_type, data in events:
+        if event_type != "complete":
+            yield event_type, data
+            continue
+
+        data = dict(data)
+        reached_cutoff = data.pop("reached_cutoff", False)
+        fresh = data["reviews"]
+        await run_in_threadpool(
+            review_store.save, source, feed, fresh, cutoff_date, full=full and reached_cutoff,
+        )
+        if incremental:
+            stored = await run_in_threadpool(review_store.load_missing, source, feed, cutoff_date, fresh)
+            if stored:
+                yield "reviews_chunk", {"reviews": stored}
+            all_reviews = review_store.merge_newest_first(fresh, stored)
+            data = {**data, "reviews": all_reviews, "total": len(all_reviews)}
+        yield event_type, data
 
 
 @router.get("/appstore/stream")
-def stream_appstore_reviews(
+async def stream_appstore_reviews(
     app_id: str = Query(...),
     country: str = Query("it"),
     max_pages: int = Query(10),
     cutoff_days: int = Query(365),
+    incremental: bool = Query(False),
+    complete: Literal["full", "summary"] = Query("full"),
+    last_event_id: str | None = Header(None),
 ):
     cutoff_date = datetime.now(timezone.utc) - timedelta(days=cutoff_days)
+    feed = f"{app_id}:{country}"
 
-    def generate():
-        for event_type, data in fetch_reviews_generator(app_id, country, max_pages, cutoff_date):
-            yield sse_format(event_type, data)
+    async def generate():
+        # Resuming is only meaningful in summary mode: a full `complete` would lack the earlier pages
+        start_page, sent, checksum = parse_resume_token(last_event_id if complete == "summary" else None)
+        known = (
+            await run_in_threadpool(review_store.known_keys, "appstore", feed, cutoff_date)
+            if incremental else None
+        )
+        events = fetch_reviews_generator(
+            app_id, country, max_pages, cutoff_date, known_keys=known, start_page=start_page,
+        )
+        full = known is None and start_page == 1
+        events = with_review_store(events, "appstore", feed, cutoff_date, full, incremental)
+        if complete == "full":
+            async for event_type, data in events:
+                yield sse_format(event_type, data)
+            return
+        async for event_type, data, event_id in summarize_complete(events, sent, checksum):
+            yield sse_format(event_type, data, event_id)
 
     return StreamingResponse(
         generate(),
@@ -38,17 +119,36 @@ def stream_appstore_reviews(
 
 
 @router.get("/trustpilot/stream")
-def stream_trustpilot_reviews(
+async def stream_trustpilot_reviews(
     domain: str = Query(...),
     max_pages: int = Query(10),
     cutoff_days: int = Query(365),
+    incremental: bool = Query(False),
+    complete: Literal["full", "summary"] = Query("full"),
+    last_event_id: str | None = Header(None),
 ):
     domain_clean = clean_domain(domain)
     cutoff_date = datetime.now(timezone.utc) - timedelta(days=cutoff_days)
 
-    def generate():
-        for event_type, data in tp_fetch_reviews_generator(domain_clean, max_pages, cutoff_date):
-            yield sse_format(event_type, data)
+    async def generate():
+        start_page, sent, checksum = parse_resume_token(last_event_id if complete == "summary" else None)
+        known = (
+            await run_in_threadpool(review_store.known_keys, "trustpilot", domain_clean, cutoff_date)
+            if incremental else None
+        )
+        # Per-page chunks are only for summary mode, which needs them; full mode keeps its old event stream
+        events = tp_fetch_reviews_generator(
+            domain_clean, max_pages, cutoff_date, known_keys=known, start_page=start_page,
+            chunks=complete == "summary",
+        )
+        full = known is None and start_page == 1
+        events = with_review_store(events, "trustpilot", domain_clean, cutoff_date, full, incremental)
+        if complete == "full":
+            async for event_type, data in events:
+                yield sse_format(event_type, data)
+            return
+        async for event_type, data, event_id in summarize_complete(events, sent, checksum):
+            yield sse_format(event_type, data, event_id)
 
     return StreamingResponse(
         generate(),
@@ -1,5 +1,25 @@
+import os
+import asyncio
+import httpx
 import requests
+from collections import deque
+from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from app.services.cache import TTLCache
+from app.services.http_client import session, get_async_client
+from app.services.review_store import review_key
+from app.services.rate_limit import RateLimiter
+
+PAGE_CONCURRENCY = 4  # RSS pages kept in flight at once; 1 = strictly sequential
+# Shared by every feed fetch in the process, sync and async, so concurrent jobs and
+# streams (e.g. a comparison fanning out over several apps) stay under one request rate towards Apple
+APPSTORE_REQUESTS_PER_MINUTE = int(os.environ.get("APPSTORE_REQUESTS_PER_MINUTE", "1200"))
+_feed_rate_limiter = RateLimiter(APPSTORE_REQUESTS_PER_MINUTE, PAGE_CONCURRENCY * 4)
+
+ITUNES_CACHE_TTL = int(os.environ.get("ITUNES_CACHE_TTL", "3600"))
+search_cache = TTLCache("itunes_search", maxsize=1024, ttl_seconds=ITUNES_CACHE_TTL)
+lookup_cache = TTLCache("itunes_lookup", maxsize=4096, ttl_seconds=ITUNES_CACHE_TTL)
 
 
 def build_url(country: str, app_id: str, page: int = 1) -> str:
@@ -7,23 +27,35 @@ def build_url(country: str, app_id: str, page: int = 1) -> str:
 
 
 def lookup_app_name(app_id: str, country: str = "us") -> str:
+    key = (app_id, country.lower())
+    name = lookup_cache.get(key)
+    if name is not None:
+        return name
     try:
-        resp = requests.get(
+        resp = session.get(
             f"https://itunes.apple.com/lookup?id={app_id}&country={country}",
             timeout=10,
         )
         data = resp.json()
         results = data.get("results", [])
         if results:
-            return results[0].get("trackName", f"App {app_id}")
+            name = results[0].get("trackName", f"App {app_id}")
+            lookup_cache.set(key, name)
+            return name
     except Exception:
         pass
     return f"App {app_id}"
 
 
 def search_apps(query: str, country: str = "us", limit: int = 10) -> list[dict]:
+    # Failures aren't cached, so a flaky upstream doesn't pin an empty result list.
+    # The cache holds its own copy and hands out fresh ones, so callers can't edit it.
+    key = (query.strip().lower(), country.lower(), limit)
+    cached = search_cache.get(key)
+    if cached is not None:
+        return [dict(r) for r in cached]
     try:
-        resp = requests.get(
+        resp = session.get(
             "https://itunes.apple.com/search",
             params={
                 "term": query,
@@ -46,6 +78,7 @@ def search_apps(query: str, country: str = "us", limit: int = 10) -> list[dict]:
                 "rating": r.get("averageUserRating", 0),
                 "ratings_count": r.get("userRatingCount", 0),
             })
+        search_cache.set(key, tuple(dict(r) for r in results))
         return results
     except Exception:
         return []
@@ -73,45 +106,178 @@ def parse_entry(entry: dict) -> dict | None:
         return None
 
 
-def fetch_reviews_simple(app_id: str, country: str, max_pages: int, cutoff_date: datetime) -> list[dict]:
-    all_reviews = []
-    for page in range(1, max_pages + 1):
-        url = build_url(country, app_id, page)
-        try:
-            response = requests.get(url, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-        except Exception:
-            break
+def parse_page(
+    entries: list[dict], cutoff_date: datetime, known_keys: set[str] | None = None,
+) -> tuple[list[dict], bool, bool, bool]:
+    """Parse one RSS page -> (reviews newer than cutoff_date, all_too_old, reached_known, reached_cutoff).
+
+    With `known_keys`, already-stored reviews are skipped and flagged via reached_known.
+    reached_cutoff says the page holds a review older than cutoff_date, i.e. the
+    feed has been read back past the requested range.
+    """
+    reviews = []
+    all_too_old = True
+    reached_known = False
+    reached_cutoff = False
+    for entry in entries:
+        parsed = parse_entry(entry)
+        if parsed and parsed["date"] and parsed["rating"]:
+            if parsed["date"] >= cutoff_date:
+                all_too_old = False
+                if known_keys and review_key(parsed) in known_keys:
+                    reached_known = True
+                    continue
+                reviews.append(parsed)
+            else:
+                reached_cutoff = True
+    return reviews, all_too_old, reached_known, reached_cutoff
+
+
+def _fetch_feed_entries(app_id: str, country: str, page: int, timeout: int) -> list[dict]:
+    _feed_rate_limiter.acquire()
+    response = session.get(build_url(country, app_id, page), timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    return data.get("feed", {}).get("entry", [])
+
+
+def iter_feed_pages(
+    app_id: str,
+    country: str,
+    max_pages: int,
+    timeout: int = 15,
+    concurrency: int = PAGE_CONCURRENCY,
+    start_page: int = 1,
+):
+    """Yield (page, entries) in page order while up to `concurrency` pages download in parallel.
+
+    Stops at the first page that fails. Closing the generator early (e.g. once the
+    cutoff date is reached) cancels every page that has not started downloading yet.
+    """
+    concurrency = max(1, concurrency)
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    pending = deque()
+    next_page = start_page
+    try:
+        while True:
+            while next_page <= max_pages and len(pending) < concurrency:
+                pending.append((next_page, pool.submit(_fetch_feed_entries, app_id, country, next_page, timeout)))
+                next_page += 1
+            if not pending:
+                return
+
+            page, future = pending.popleft()
+            try:
+                entries = future.result()
+            except (requests.exceptions.RequestException, ValueError):
+                # Page doesn't exist or network error — stop here
+                return
+            yield page, entries
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
 
-        feed = data.get("feed", {})
-        entries = feed.get("entry", [])
+async def _afetch_feed_entries(app_id: str, country: str, page: int, timeout: int) -> list[dict]:
+    await _feed_rate_limiter.aacquire()
+    response = await get_async_client().get(build_url(country, app_id, page), timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    return data.get("feed", {}).get("entry", [])
+
+
+async def aiter_feed_pages(
+    app_id: str,
+    country: str,
+    max_pages: int,
+    timeout: int = 10,
+    concurrency: int = PAGE_CONCURRENCY,
+    start_page: int = 1,
+):
+    """Async counterpart of iter_feed_pages: same ordering, window and early-stop cancellation."""
+    concurrency = max(1, concurrency)
+    pending = deque()
+    next_page = start_page
+    try:
+        while True:
+            while next_page <= max_pages and len(pending) < concurrency:
+                task = asyncio.create_task(_afetch_feed_entries(app_id, country, next_page, timeout))
+                pending.append((next_page, task))
+                next_page += 1
+            if not pending:
+                return
+
+            page, task = pending.popleft()
+            try:
+                entries = await task
+            except (httpx.HTTPError, ValueError):
+                return
+            yield page, entries
+    finally:
+        for _, task in pending:
+            task.cancel()
+        # Let the cancellations land so no task outlives the generator or logs "exception never retrieved"
+        await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+
+
+def fetch_reviews_simple(
+    app_id: str,
+    country: str,
+    max_pages: int,
+    cutoff_date: datetime,
+    concurrency: int = PAGE_CONCURRENCY,
+    known_keys: set[str] | None = None,
+    on_page: Callable[[list[dict]], None] | None = None,
+) -> tuple[list[dict], bool]:
+    """Fetch reviews newer than cutoff_date -> (reviews, reached_cutoff).
+
+    With `known_keys`, stop at the first page that reaches an already-stored review
+    and return only the new ones. `on_page` receives each page's reviews as soon as
+    that page is parsed. reached_cutoff is only True when the feed was read back past
+    cutoff_date; a fetch cut short by max_pages or a failed page leaves it False.
+    """
+    all_reviews = []
+    reached_cutoff = False
+    for page, entries in iter_feed_pages(app_id, country, max_pages, timeout=15, concurrency=concurrency):
         if not entries:
             break
 
-        all_too_old = True
-        for entry in entries:
-            parsed = parse_entry(entry)
-            if parsed and parsed["date"] and parsed["rating"]:
-                if parsed["date"] >= cutoff_date:
-                    all_reviews.append(parsed)
-                    all_too_old = False
+        reviews, all_too_old, reached_known, page_reached_cutoff = parse_page(entries, cutoff_date, known_keys)
+        reached_cutoff = reached_cutoff or page_reached_cutoff
+        all_reviews.extend(reviews)
+        if on_page:
+            on_page(reviews)
 
-        if all_too_old and page > 1:
+        if (all_too_old and page > 1) or reached_known:
             break
 
-    return all_reviews
+    return all_reviews, reached_cutoff
 
 
 BATCH_SIZE = 3  # Fetch N pages then immediately flush chunk to keep connection alive
 
 
-def fetch_reviews_generator(app_id: str, country: str, max_pages: int, cutoff_date: datetime):
-    """Generator that yields (event_type, data) tuples for SSE streaming."""
+async def fetch_reviews_generator(
+    app_id: str,
+    country: str,
+    max_pages: int,
+    cutoff_date: datetime,
+    concurrency: int = PAGE_CONCURRENCY,
+    known_keys: set[str] | None = None,
+    start_page: int = 1,
+):
+    """Async generator that yields (event_type, data) tuples for SSE streaming.
+
+    Each reviews_chunk carries `next_page`, the page a resumed stream should start from.
+    `complete` carries `reached_cutoff` (see fetch_reviews_simple).
+    """
     all_reviews = []
     batch_reviews = []
+    page = start_page - 1
+    reached_cutoff = False
 
-    for page in range(1, max_pages + 1):
+    async for page, entries in aiter_feed_pages(
+        app_id, country, max_pages, timeout=10, concurrency=concurrency, start_page=start_page,
+    ):
         yield ("progress", {
             "page": page,
             "total_pages": max_pages,
@@ -119,46 +285,30 @@ def fetch_reviews_generator(app_id: str, country: str, max_pages: int, cutoff_da
             "message": f"Fetching page {page}/{max_pages}...",
         })
 
-        url = build_url(country, app_id, page)
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-        except requests.exceptions.RequestException:
-            # Page doesn't exist or network error — flush what we have and stop
-            break
-        except ValueError:
-            break
-
-        feed = data.get("feed", {})
-        entries = feed.get("entry", [])
-
         if not entries:
             break
 
-        all_too_old = True
-        for entry in entries:
-            parsed = parse_entry(entry)
-            if parsed and parsed["date"] and parsed["rating"]:
-                if parsed["date"] >= cutoff_date:
-                    parsed["date"] = parsed["date"].isoformat()
-                    all_reviews.append(parsed)
-                    batch_reviews.append(parsed)
-                    all_too_old = False
+        reviews, all_too_old, reached_known, page_reached_cutoff = parse_page(entries, cutoff_date, known_keys)
+        reached_cutoff = reached_cutoff or page_reached_cutoff
+        for r in reviews:
+            r["date"] = r["date"].isoformat()
+        all_reviews.extend(reviews)
+        batch_reviews.extend(reviews)
 
         # Flush batch every BATCH_SIZE pages to keep the connection alive
         if page % BATCH_SIZE == 0 and batch_reviews:
-            yield ("reviews_chunk", {"reviews": batch_reviews})
+            yield ("reviews_chunk", {"reviews": batch_reviews, "next_page": page + 1})
             batch_reviews = []
 
-        if all_too_old and page > 1:
+        if (all_too_old and page > 1) or reached_known:
             break
 
     # Flush any remaining reviews in the last partial batch
     if batch_reviews:
-        yield ("reviews_chunk", {"reviews": batch_reviews})
+        yield ("reviews_chunk", {"reviews": batch_reviews, "next_page": page + 1})
 
     yield ("complete", {
         "reviews": all_reviews,
         "total": len(all_reviews),
+        "reached_cutoff": reached_cutoff,
     })
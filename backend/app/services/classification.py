@@ -1,28 +1,36 @@
-import re
+import numpy as np
 import pandas as pd
 from app.config import NON_APP_CATEGORIES, APP_RELATED_KEYWORDS, CATEGORY_LABELS
+from app.services.phrase_matcher import PhraseMatcher
+from app.services.tokenizer import TERM_RE, tokenize
+
+# Hit-count columns for the batch classifier: one per non-app category, then app-related last
+_CATEGORY_NAMES = list(NON_APP_CATEGORIES)
+_APP_COL = len(_CATEGORY_NAMES)
+_KEYWORD_SETS = [*NON_APP_CATEGORIES.values(), APP_RELATED_KEYWORDS]
+_WORD_COLUMNS = pd.DataFrame(
+    [(kw, col) for col, kw_set in enumerate(_KEYWORD_SETS) for kw in kw_set if " " not in kw],
+    columns=["word", "col"],
+)
+# Single words are matched by token lookup; multi-word phrases (substring semantics) by one automaton
+_PHRASE_MATCHER = PhraseMatcher(
+    (kw, col) for col, kw_set in enumerate(_KEYWORD_SETS) for kw in kw_set if " " in kw
+)
 
 
 def classify_review(title: str, review_text: str) -> tuple[str, str | None]:
-    text = f"{title} {review_text}".lower()
-    words = set(re.findall(r"[a-zA-ZàèéìòùÀÈÉÌÒÙ'-]{3,}", text))
+    text = f"{title} {review_text}"
+    words = set(tokenize(text).terms)
+    phrase_hits = _PHRASE_MATCHER.search(text.lower())
 
     non_app_scores = {}
     total_non_app = 0
-    for category, kw_set in NON_APP_CATEGORIES.items():
-        hits = words & kw_set
-        for phrase in kw_set:
-            if " " in phrase and phrase in text:
-                hits.add(phrase)
-        score = len(hits)
+    for col, (category, kw_set) in enumerate(NON_APP_CATEGORIES.items()):
+        score = len(words & kw_set) + sum(1 for _, c in phrase_hits if c == col)
         non_app_scores[category] = score
         total_non_app += score
 
-    app_hits = words & APP_RELATED_KEYWORDS
-    for phrase in APP_RELATED_KEYWORDS:
-        if " " in phrase and phrase in text:
-            app_hits.add(phrase)
-    app_score = len(app_hits)
+    app_score = len(words & APP_RELATED_KEYWORDS) + sum(1 for _, c in phrase_hits if c == _APP_COL)
 
     if total_non_app == 0 and app_score == 0:
         return "app_related", None
@@ -40,21 +48,66 @@ def classify_review(title: str, review_text: str) -> tuple[str, str | None]:
     return "app_related", None
 
 
-def add_classification_columns(df: pd.DataFrame) -> pd.DataFrame:
-    classifications = df.apply(
-        lambda r: classify_review(str(r.get("title", "")), str(r.get("review", ""))),
-        axis=1,
+def _keyword_hits(texts: pd.Series) -> np.ndarray:
+    """Distinct keyword hits per (review, category column), for texts indexed 0..n-1.
+
+    Tokenized with one vectorized str.findall over the column rather than through the
+    per-text tokenizer cache, which only pays off for single-text callers.
+    """
+    counts = np.zeros((len(texts), len(_KEYWORD_SETS)), dtype=np.int64)
+    texts = texts.str.lower()
+
+    words = texts.str.findall(TERM_RE).explode().dropna()
+    if not words.empty:
+        pairs = pd.DataFrame({"row": words.index, "word": words.to_numpy()}).drop_duplicates()
+        hits = pairs.merge(_WORD_COLUMNS, on="word")
+        np.add.at(counts, (hits["row"].to_numpy(), hits["col"].to_numpy()), 1)
+
+    for row, text in enumerate(texts):
+        for _, col in _PHRASE_MATCHER.search(text):
+            counts[row, col] += 1
+    return counts
+
+
+def classify_reviews(titles: pd.Series, reviews: pd.Series) -> pd.DataFrame:
+    """Batch version of classify_review: same decision rules, scored for all reviews at once.
+
+    Returns a frame aligned with the inputs with `is_app_related` and `exclusion_category`.
+    """
+    texts = titles.fillna("").astype(str) + " " + reviews.fillna("").astype(str)
+    texts = texts.reset_index(drop=True)
+    counts = _keyword_hits(texts)
+
+    non_app = counts[:, :_APP_COL]
+    app_score = counts[:, _APP_COL]
+    total_non_app = non_app.sum(axis=1)
+    is_non_app = (total_non_app > 0) & ((app_score == 0) | (total_non_app > app_score * 1.5))
+    exclusion = np.array(_CATEGORY_NAMES, dtype=object)[non_app.argmax(axis=1)]
+    exclusion[~is_non_app] = None
+
+    return pd.DataFrame(
+        {"is_app_related": ~is_non_app, "exclusion_category": exclusion},
+        index=titles.index,
     )
-    df["is_app_related"] = classifications.apply(lambda x: x[0] == "app_related")
-    df["exclusion_category"] = classifications.apply(lambda x: x[1])
+
+
+def add_classification_columns(df: pd.DataFrame) -> pd.DataFrame:
+    titles = df["title"] if "title" in df else pd.Series("", index=df.index)
+    reviews = df["review"] if "review" in df else pd.Series("", index=df.index)
+    classified = classify_reviews(titles, reviews)
+    df["is_app_related"] = classified["is_app_related"]
+    df["exclusion_category"] = classified["exclusion_category"]
     return df
 
 
 def compute_adjusted_metrics(reviews: list[dict]) -> dict:
     if not reviews:
         return {}
+    return adjusted_metrics_from_frame(pd.DataFrame(reviews))
+
 
-    df = pd.DataFrame(reviews)
+def adjusted_metrics_from_frame(df: pd.DataFrame) -> dict:
+    """compute_adjusted_metrics over an existing reviews frame (classification columns are added to it)."""
     if df.empty:
         return {}
 
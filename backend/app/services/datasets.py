@@ -0,0 +1,89 @@
+"""
+Dataset handles: analysis and export requests can name a finished scrape job instead
+of re-uploading its reviews, optionally narrowed by rating and date range.
+With several uvicorn workers this needs JOB_STORE=sqlite so any worker can see the job.
+"""
+from datetime import date, datetime
+from app.services.job_store import job_store
+
+
+class DatasetError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _review_day(value) -> date | None:
+    if hasattr(value, "date"):
+        return value.date()
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).date()
+    except ValueError:
+        return None
+
+
+def filter_reviews(
+    reviews: list[dict],
+    ratings: list[int] | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> list[dict]:
+    """Reviews whose rating is in `ratings` and whose day falls in [date_from, date_to]; None means no bound."""
+    if ratings is not None:
+        wanted = set(ratings)
+        reviews = [r for r in reviews if r.get("rating") in wanted]
+    if date_from is not None or date_to is not None:
+        kept = []
+        for r in reviews:
+            day = _review_day(r.get("date"))
+            if day is None:
+                continue
+            if (date_from is None or day >= date_from) and (date_to is None or day <= date_to):
+                kept.append(r)
+        reviews = kept
+    return reviews
+
+
+def load_dataset(job_id: str, ratings: list[int] | None = None,
+                 date_from: date | None = None, date_to: date | None = None) -> list[dict]:
+    """Reviews of a finished job, filtered. Raises DatasetError for unknown or unfinished jobs."""
+    job = job_store.get(job_id)
+    if not job:
+        raise DatasetError(404, "Dataset not found or expired")
+    if job["status"] != "done":
+        raise DatasetError(400, "Dataset job not complete yet")
+    return filter_reviews(job["reviews"], ratings, date_from, date_to)
+
+
+def resolve_reviews(reviews: list | None, dataset) -> list[dict]:
+    """Reviews for a request that carries either inline `reviews` (pydantic models) or a `dataset` handle."""
+    if dataset is not None:
+        return load_dataset(dataset.job_id, dataset.ratings, dataset.date_from, dataset.date_to)
+    if reviews is None:
+        raise DatasetError(422, "Provide either reviews or dataset")
+    return [r.model_dump() for r in reviews]
+
+
+def resolve_texts(texts: list[str] | None, dataset, bodies_only: bool = False) -> list[str]:
+    """Texts for a request that carries either inline `texts` or a `dataset` handle.
+
+    Dataset reviews become "title review", or only their non-empty bodies with `bodies_only`,
+    matching what the frontend sends to each endpoint.
+    """
+    if dataset is None:
+        if texts is None:
+            raise DatasetError(422, "Provide either texts or dataset")
+        return texts
+    reviews = resolve_reviews(None, dataset)
+    if bodies_only:
+        return [r["review"] for r in reviews if r.get("review")]
+    return [f"{r.get('title', '')} {r.get('review', '')}" for r in reviews]
+
+
+def comparison_apps(req) -> dict[str, list[dict]]:
+    """Reviews per app from a comparison request: inline `apps` plus any `datasets` handles."""
+    apps = {k: [r.model_dump() for r in v] for k, v in req.apps.items()}
+    for k, ref in req.datasets.items():
+        apps[k] = load_dataset(ref.job_id, ref.ratings, ref.date_from, ref.date_to)
+    return apps
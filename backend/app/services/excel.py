@@ -1,37 +1,116 @@
+"""
+Excel exports: one sheet per star rating for a single app, one sheet per app for comparisons.
+
+Sheets are written row by row with openpyxl's write-only mode, which spools each
+sheet to a temp file instead of building it in memory, so exporting 50k reviews
+costs about as much memory as exporting 50.
+"""
 import re
-import pandas as pd
-from io import BytesIO
-
-
-def create_excel(reviews: list[dict]) -> bytes:
-    df = pd.DataFrame(reviews)
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        for rating in range(1, 6):
-            sheet_name = f"{rating}_stelle"
-            rating_df = df[df["rating"] == rating].copy()
-            if not rating_df.empty and "date" in rating_df.columns:
-                try:
-                    rating_df["date"] = pd.to_datetime(rating_df["date"]).dt.strftime("%Y-%m-%d %H:%M")
-                except Exception:
-                    pass
-            rating_df.to_excel(writer, sheet_name=sheet_name, index=False)
-    output.seek(0)
-    return output.getvalue()
-
-
-def create_comparison_excel(apps: dict[str, list[dict]], app_names: dict[str, str]) -> bytes:
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        for app_id, reviews in apps.items():
-            name = app_names.get(app_id, app_id)
-            sheet_name = re.sub(r'[\\/*?:\[\]]', '', name)[:31]
-            df = pd.DataFrame(reviews)
-            if not df.empty and "date" in df.columns:
-                try:
-                    df["date"] = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d %H:%M")
-                except Exception:
-                    pass
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
-    output.seek(0)
-    return output.getvalue()
+import tempfile
+from datetime import datetime
+from typing import BinaryIO, Iterator
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Alignment, Border, Font, Side
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Same look as the header pandas' to_excel wrote
+_THIN = Side(style="thin")
+_HEADER_FONT = Font(bold=True)
+_HEADER_BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="top")
+
+
+def rating_sheets(reviews: list[dict]) -> list[tuple[str, list[dict]]]:
+    """(sheet name, reviews) for ratings 1–5, partitioned in one pass."""
+    by_rating: dict[int, list[dict]] = {rating: [] for rating in range(1, 6)}
+    for r in reviews:
+        bucket = by_rating.get(r.get("rating"))
+        if bucket is not None:
+            bucket.append(r)
+    return [(f"{rating}_stelle", rows) for rating, rows in by_rating.items()]
+
+
+def app_sheets(apps: dict[str, list[dict]], app_names: dict[str, str]) -> list[tuple[str, list[dict]]]:
+    """(sheet name, reviews) per app, named after the app within Excel's sheet name rules."""
+    return [
+        (re.sub(r'[\\/*?:\[\]]', '', app_names.get(app_id, app_id))[:31], reviews)
+        for app_id, reviews in apps.items()
+    ]
+
+
+def export_columns(reviews: list[dict]) -> list[str]:
+    """Every field that appears in `reviews`, in first-seen order (like a DataFrame built from them)."""
+    columns: dict[str, None] = {}
+    for r in reviews:
+        columns.update(dict.fromkeys(r))
+    return list(columns)
+
+
+def format_date(value):
+    """ISO timestamps as "YYYY-MM-DD HH:MM"; anything unparseable is left as it is."""
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d %H:%M")
+    try:
+        return datetime.fromisoformat(str(value)).strftime("%Y-%m-%d %H:%M")
+    except ValueError:
+        return value
+
+
+def _cell_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return ILLEGAL_CHARACTERS_RE.sub("", str(value))
+
+
+def write_sheets(
+    sheets: list[tuple[str, list[dict]]], target: str | BinaryIO, columns: list[str] | None = None,
+):
+    """Write `sheets` to an .xlsx file path or binary file object.
+
+    `columns` is the header of every sheet, so sheets cut from one list of reviews
+    (rating_sheets) all share it and even empty ones get a header row; without it
+    each sheet gets the columns of its own reviews.
+    """
+    wb = Workbook(write_only=True)
+    for sheet_name, reviews in sheets:
+        ws = wb.create_sheet(sheet_name)
+        sheet_columns = columns if columns is not None else export_columns(reviews)
+        header = []
+        for name in sheet_columns:
+            cell = WriteOnlyCell(ws, value=name)
+            cell.font, cell.border, cell.alignment = _HEADER_FONT, _HEADER_BORDER, _HEADER_ALIGNMENT
+            header.append(cell)
+        ws.append(header)
+        for r in reviews:
+            ws.append([
+                _cell_value(format_date(r.get(c)) if c == "date" else r.get(c))
+                for c in sheet_columns
+            ])
+    wb.save(target)
+
+
+def iter_file(fp: BinaryIO) -> Iterator[bytes]:
+    """Chunks of an open file from the start, closing it when done."""
+    with fp:
+        fp.seek(0)
+        while chunk := fp.read(STREAM_CHUNK_SIZE):
+            yield chunk
+
+
+def build_sheets(sheets: list[tuple[str, list[dict]]], columns: list[str] | None = None) -> BinaryIO:
+    """The workbook in a temp file rather than in memory; stream it with iter_file.
+
+    Built before the response starts, so a write error is an error response rather
+    than a 200 with a truncated file.
+    """
+    tmp = tempfile.TemporaryFile()
+    try:
+        write_sheets(sheets, tmp, columns)
+    except BaseException:
+        tmp.close()
+        raise
+    return tmp
@@ -0,0 +1,66 @@
+"""
+Files produced by background export jobs (routers/jobs.py), kept on disk until
+they expire. Expired files are swept whenever an export starts or is downloaded.
+Artifacts are written under a temporary name and renamed when complete, so a
+download never sees a half-written file.
+
+The job record (shared between workers with JOB_STORE=sqlite) stores the artifact's
+path and the host that built it, but the file itself lives in EXPORT_DIR. With
+workers on more than one host, EXPORT_DIR must be a directory they all share
+(e.g. a network volume); otherwise run on a single host. A download on a host that
+can't see the file gets a 409 naming the host that built it.
+"""
+import os
+import glob
+import time
+import socket
+import tempfile
+from typing import BinaryIO, Callable
+
+# Must be shared storage when workers run on more than one host (see above)
+EXPORT_DIR = os.environ.get("EXPORT_DIR", os.path.join(tempfile.gettempdir(), "review-exports"))
+EXPORT_TTL_SECONDS = int(os.environ.get("EXPORT_TTL_SECONDS", "3600"))
+HOSTNAME = socket.gethostname()
+
+
+def _path(job_id: str, ext: str) -> str:
+    return os.path.join(EXPORT_DIR, f"{job_id}.{ext}")
+
+
+def write_artifact(job_id: str, ext: str, write: Callable[[BinaryIO], None]) -> str:
+    """Create the artifact for `job_id` by calling `write` with an open file; returns its path."""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    final = _path(job_id, ext)
+    partial = final + ".part"
+    try:
+        with open(partial, "wb") as fp:
+            write(fp)
+        os.replace(partial, final)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return final
+
+
+def find_artifact(path: str | None) -> str | None:
+    """`path` if that artifact exists on this host and hasn't expired, else None."""
+    if not path:
+        return None
+    try:
+        if time.time() - os.path.getmtime(path) <= EXPORT_TTL_SECONDS:
+            return path
+    except OSError:
+        pass
+    return None
+
+
+def sweep():
+    """Delete artifacts (and abandoned partial files) older than the TTL."""
+    cutoff = time.time() - EXPORT_TTL_SECONDS
+    for path in glob.glob(os.path.join(EXPORT_DIR, "*")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass  # already gone, or removed by another worker
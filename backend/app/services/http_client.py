@@ -0,0 +1,107 @@
+"""
+Shared outbound HTTP clients.
+Every scraper goes through one pooled requests.Session (sync code) or one
+httpx.AsyncClient (async routes), so keep-alive connections and TLS sessions to
+itunes.apple.com / trustpilot.com are reused instead of renegotiated per page.
+"""
+import os
+import ssl
+import asyncio
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_HOSTS = int(os.environ.get("HTTP_POOL_HOSTS", "16"))  # distinct hosts kept warm
+POOL_PER_HOST = int(os.environ.get("HTTP_POOL_PER_HOST", "8"))  # max open connections per host
+
+# One verified TLS context for the async client. requests>=2.32 already preloads and
+# shares its own default context across connections, so the session needs no adapter hook.
+TLS_CONTEXT = ssl.create_default_context()
+
+
+def _build_session() -> requests.Session:
+    s = requests.Session()
+    # pool_block: callers past the per-host limit wait for a free connection
+    # instead of opening (and then discarding) an extra one.
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST, pool_block=True)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+session = _build_session()
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that gives its host slot back once the body is read or closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class _HostLimitedTransport(httpx.AsyncBaseTransport):
+    """At most `per_host` requests in flight per host; the rest wait, like the session's pool_block."""
+
+    def __init__(self, per_host: int, **kwargs):
+        self._transport = httpx.AsyncHTTPTransport(**kwargs)
+        self._per_host = max(1, per_host)
+        self._slots: dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        slot = self._slots.setdefault(request.url.host, asyncio.Semaphore(self._per_host))
+        await slot.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            slot.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, slot.release)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+_async_client: httpx.AsyncClient | None = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the process-wide AsyncClient, creating it on first use inside the event loop."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=10,
+            # requests follows redirects by default; match it so both paths see the same pages
+            follow_redirects=True,
+            transport=_HostLimitedTransport(
+                POOL_PER_HOST,
+                verify=TLS_CONTEXT,
+                limits=httpx.Limits(
+                    max_connections=POOL_HOSTS * POOL_PER_HOST,
+                    max_keepalive_connections=POOL_HOSTS * POOL_PER_HOST,
+                ),
+            ),
+        )
+    return _async_client
+
+
+async def aclose():
+    """Close pooled connections; called on application shutdown."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    session.close()
@@ -0,0 +1,41 @@
+"""
+Every dashboard analysis over a single upload of reviews.
+The reviews become one DataFrame shared by the frame-level services, and texts are
+tokenized once through the tokenizer cache.
+"""
+import pandas as pd
+from app.services.sentiment import compute_sentiment, extract_keywords
+from app.services.classification import adjusted_metrics_from_frame
+from app.services.themes import cluster_frame_by_theme
+
+ANALYSES = ("sentiment", "adjusted_metrics", "themes", "keywords")
+
+
+def analyze_all(
+    reviews: list[dict],
+    analyses: list[str],
+    theme_ranges: list[tuple[int, int]],
+    keywords_top_n: int = 30,
+) -> dict:
+    """Run the requested analyses; themes come back as one list per (rating_min, rating_max) range.
+
+    Sentiment reads "title review" like the insights panel; keywords read review bodies only.
+    """
+    df = pd.DataFrame(reviews)
+    if df.empty:
+        texts, bodies = [], []
+    else:
+        texts = (df["title"].fillna("") + " " + df["review"].fillna("")).tolist()
+        bodies = [b for b in df["review"].fillna("").tolist() if b]
+
+    result = {}
+    if "sentiment" in analyses:
+        result["sentiment"] = compute_sentiment(texts)
+    if "themes" in analyses:
+        result["themes"] = [cluster_frame_by_theme(df, lo, hi) for lo, hi in theme_ranges]
+    if "keywords" in analyses:
+        result["keywords"] = [{"word": w, "count": c} for w, c in extract_keywords(bodies, keywords_top_n)]
+    if "adjusted_metrics" in analyses:
+        # Last: it adds classification columns to the shared frame
+        result["adjusted_metrics"] = adjusted_metrics_from_frame(df)
+    return result
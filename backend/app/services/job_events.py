@@ -0,0 +1,42 @@
+"""
+In-process change notifications for jobs, so the SSE endpoint in routers/jobs.py can
+push updates the moment a worker thread writes them instead of clients polling.
+The job store publishes on every write; subscribers are asyncio events woken
+thread-safely on their own loop. Writes made by another uvicorn worker (SQLite
+store) aren't seen here, which is why subscribers also recheck on a short timer.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_subscribers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = defaultdict(set)
+
+
+def subscribe(job_id: str) -> asyncio.Event:
+    """An event set whenever `job_id` changes; call from the event loop, and unsubscribe when done."""
+    event = asyncio.Event()
+    with _lock:
+        _subscribers[job_id].add((asyncio.get_running_loop(), event))
+    return event
+
+
+def unsubscribe(job_id: str, event: asyncio.Event):
+    with _lock:
+        subs = _subscribers.get(job_id)
+        if subs is None:
+            return
+        subs.difference_update({s for s in subs if s[1] is event})
+        if not subs:
+            del _subscribers[job_id]
+
+
+def publish(job_id: str):
+    """Wake every subscriber of `job_id`. Safe from any thread."""
+    with _lock:
+        subs = list(_subscribers.get(job_id, ()))
+    for loop, event in subs:
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            pass  # loop already closed
@@ -0,0 +1,409 @@
+"""
+Job state for the polling and event-stream endpoints in routers/jobs.py.
+Every write is announced through job_events, which wakes the streams in this process.
+Two backends behind the same small interface:
+- MemoryJobStore: per-process, LRU + TTL eviction and an approximate memory cap.
+- SQLiteJobStore: file-backed, so every uvicorn worker sees the same jobs and
+  they survive a restart. Each job row records the process that runs it and a
+  heartbeat; active jobs whose heartbeat goes stale (their worker crashed or
+  restarted, taking its in-memory queue with it) are marked as errors.
+Pick one with JOB_STORE=memory|sqlite.
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from app.services import job_events
+
+JOB_STORE = os.environ.get("JOB_STORE", "memory")
+JOB_STORE_PATH = os.environ.get("JOB_STORE_PATH", "jobs.db")
+JOB_TTL_SECONDS = int(os.environ.get("JOB_TTL_SECONDS", "3600"))
+JOB_STORE_MAX_JOBS = int(os.environ.get("JOB_STORE_MAX_JOBS", "200"))
+JOB_STORE_MAX_MB = int(os.environ.get("JOB_STORE_MAX_MB", "256"))
+# SQLite store: how often a worker refreshes its active jobs' heartbeat; after
+# three missed beats the jobs count as orphaned
+JOB_HEARTBEAT_SECONDS = float(os.environ.get("JOB_HEARTBEAT_SECONDS", "10"))
+
+ORPHANED_ERROR = "The worker running this job stopped before it finished"
+
+FINISHED = {"done", "error"}
+ACTIVE = {"pending", "running"}
+
+
+def _review_size(review: dict) -> int:
+    return 200 + sum(len(v) for v in review.values() if isinstance(v, str))
+
+
+def _approx_size(job: dict) -> int:
+    """Rough byte size of a job, dominated by its review texts."""
+    return 512 + sum(_review_size(r) for r in job.get("reviews") or [])
+
+
+class JobStore(ABC):
+    """Finished jobs expire after the TTL or when the store is over its caps; pending
+    and running jobs are never evicted, since a worker is still writing to them."""
+
+    @abstractmethod
+    def create(self, job_id: str, job: dict, dedup_key: str | None = None) -> str:
+        """Store a new job and return its id.
+
+        With `dedup_key`, an active job created with the same key is returned instead
+        and nothing is stored, so identical concurrent requests share one job.
+        """
+
+    @abstractmethod
+    def get(self, job_id: str, with_reviews: bool = True) -> dict | None:
+        """The job, or None. Without `with_reviews` its "reviews" list comes back empty."""
+
+    @abstractmethod
+    def update(self, job_id: str, **fields):
+        ...
+
+    @abstractmethod
+    def append_reviews(self, job_id: str, reviews: list[dict]):
+        """Add reviews to a running job and bump its total."""
+
+    @abstractmethod
+    def get_reviews(self, job_id: str, offset: int, limit: int) -> list[dict]:
+        ...
+
+
+class MemoryJobStore(JobStore):
+    """LRU over finished jobs, bounded by count and approximate size; finished jobs expire after ttl."""
+
+    def __init__(self, max_jobs: int, max_bytes: int, ttl_seconds: int):
+        self.max_jobs = max_jobs
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._jobs: OrderedDict[str, dict] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._touched: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, job: dict, dedup_key: str | None = None) -> str:
+        with self._lock:
+            if dedup_key is not None:
+                for existing_id, existing in self._jobs.items():
+                    if existing.get("dedup_key") == dedup_key and existing["status"] in ACTIVE:
+                        return existing_id
+            self._jobs[job_id] = {**job, "reviews": list(job.get("reviews") or []), "dedup_key": dedup_key}
+            self._sizes[job_id] = _approx_size(job)
+            self._touched[job_id] = time.monotonic()
+            self._evict()
+            return job_id
+
+    def get(self, job_id: str, with_reviews: bool = True) -> dict | None:
+        with self._lock:
+            self._evict()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._jobs.move_to_end(job_id)
+            self._touched[job_id] = time.monotonic()
+            return {**job, "reviews": list(job["reviews"]) if with_reviews else []}
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            if "reviews" in fields:
+                job["reviews"] = list(fields["reviews"])
+                self._sizes[job_id] = _approx_size(job)
+            self._jobs.move_to_end(job_id)
+            self._touched[job_id] = time.monotonic()
+            self._evict()
+        job_events.publish(job_id)
+
+    def append_reviews(self, job_id: str, reviews: list[dict]):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            # In place; get() and get_reviews() hand out copies, so no reader sees it grow
+            job["reviews"].extend(reviews)
+            job["total"] = len(job["reviews"])
+            self._sizes[job_id] += sum(_review_size(r) for r in reviews)
+            self._touched[job_id] = time.monotonic()
+        job_events.publish(job_id)
+
+    def get_reviews(self, job_id: str, offset: int, limit: int) -> list[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job["reviews"][offset:offset + limit] if job else []
+
+    def _drop(self, job_id: str):
+        del self._jobs[job_id]
+        del self._sizes[job_id]
+        del self._touched[job_id]
+
+    def _evict(self):
+        # Only finished jobs are evicted; running ones still have a thread writing to them
+        now = time.monotonic()
+        for job_id in [
+            j for j, t in self._touched.items()
+            if now - t > self.ttl_seconds and self._jobs[j]["status"] in FINISHED
+        ]:
+            self._drop(job_id)
+
+        total = sum(self._sizes.values())
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs and total <= self.max_bytes:
+                break
+            if self._jobs[job_id]["status"] in FINISHED:
+                total -= self._sizes[job_id]
+                self._drop(job_id)
+
+
+class SQLiteJobStore(JobStore):
+    """Jobs in a SQLite file shared by all workers; reviews are kept in their own table.
+
+    Finished jobs are bounded by count, by the size of their stored JSON and by ttl.
+    Every job row carries its owner (this store's process) and a heartbeat, refreshed
+    by a background thread while the job is active. The scheduler queue only lives in
+    the owner's memory, so once the heartbeat is stale the job can never finish: it is
+    marked as an error (on startup, on create and on each beat) and from then on ages
+    out like any finished job, and is never handed out by dedup.
+    """
+
+    def __init__(self, path: str, max_jobs: int, max_bytes: int, ttl_seconds: int,
+                 heartbeat_seconds: float = JOB_HEARTBEAT_SECONDS):
+        self.max_jobs = max_jobs
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                touched REAL NOT NULL,
+                owner TEXT,
+                heartbeat REAL
+            );
+            CREATE TABLE IF NOT EXISTS job_reviews (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            );
+        """)
+        # Databases from before owners and heartbeats; their active jobs count as orphaned
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        with self._conn:
+            for column, kind in (("owner", "TEXT"), ("heartbeat", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._reap_orphans()
+        self._stop = threading.Event()
+        threading.Thread(target=self._heartbeat, name="job-store-heartbeat", daemon=True).start()
+
+    def close(self):
+        """Stop the heartbeat and close the database; this store's active jobs will be reaped."""
+        self._stop.set()
+        with self._lock:
+            self._conn.close()
+
+    def _stale_before(self) -> float:
+        return time.time() - 3 * self.heartbeat_seconds
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.heartbeat_seconds):
+            try:
+                with self._lock, self._conn:
+                    self._conn.execute(
+                        """
+                        UPDATE jobs SET heartbeat = ?
+                        WHERE owner = ? AND json_extract(data, '$.status') IN ('pending', 'running')
+                        """,
+                        (time.time(), self.owner),
+                    )
+                self._reap_orphans()
+            except sqlite3.Error:
+                pass  # a locked or closed database; the next beat tries again
+
+    def _reap_orphans(self):
+        """Mark active jobs whose heartbeat is stale as errors."""
+        with self._lock, self._conn:
+            ids = [row[0] for row in self._conn.execute(
+                """
+                SELECT id FROM jobs
+                WHERE json_extract(data, '$.status') IN ('pending', 'running')
+                  AND COALESCE(heartbeat, 0) < ?
+                """,
+                (self._stale_before(),),
+            )]
+            for job_id in ids:
+                # touched is reset so clients still get to read the error for a full TTL
+                self._conn.execute(
+                    """
+                    UPDATE jobs SET data = json_set(data, '$.status', 'error', '$.error', ?), touched = ?
+                    WHERE id = ?
+                    """,
+                    (ORPHANED_ERROR, time.time(), job_id),
+                )
+        for job_id in ids:
+            job_events.publish(job_id)
+
+    def create(self, job_id: str, job: dict, dedup_key: str | None = None) -> str:
+        meta = {k: v for k, v in job.items() if k != "reviews"}
+        meta["dedup_key"] = dedup_key
+        self._reap_orphans()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so two workers can't both miss the lookup
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if dedup_key is not None:
+                    row = self._conn.execute(
+                        """
+                        SELECT id FROM jobs
+                        WHERE json_extract(data, '$.dedup_key') = ?
+                          AND json_extract(data, '$.status') IN ('pending', 'running')
+                          AND touched >= ?
+                          AND (owner = ? OR heartbeat >= ?)
+                        """,
+                        (dedup_key, time.time() - self.ttl_seconds, self.owner, self._stale_before()),
+                    ).fetchone()
+                    if row is not None:
+                        self._conn.commit()
+                        return row[0]
+                now = time.time()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO jobs (id, data, touched, owner, heartbeat) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, json.dumps(meta), now, self.owner, now),
+                )
+                self._write_reviews(job_id, job.get("reviews") or [])
+                self._evict()
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return job_id
+
+    def get(self, job_id: str, with_reviews: bool = True) -> dict | None:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                """
+                SELECT data FROM jobs
+                WHERE id = ?
+                  AND (touched >= ? OR json_extract(data, '$.status') IN ('pending', 'running'))
+                """,
+                (job_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE jobs SET touched = ? WHERE id = ?", (time.time(), job_id))
+            rows = self._conn.execute(
+                "SELECT data FROM job_reviews WHERE job_id = ? ORDER BY seq", (job_id,)
+            ).fetchall() if with_reviews else []
+        job = json.loads(row[0])
+        job["reviews"] = [json.loads(r[0]) for r in rows]
+        return job
+
+    def update(self, job_id: str, **fields):
+        reviews = fields.pop("reviews", None)
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            meta = {**json.loads(row[0]), **fields}
+            self._conn.execute(
+                "UPDATE jobs SET data = ?, touched = ? WHERE id = ?", (json.dumps(meta), time.time(), job_id)
+            )
+            if reviews is not None:
+                self._write_reviews(job_id, reviews)
+        job_events.publish(job_id)
+
+    def append_reviews(self, job_id: str, reviews: list[dict]):
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            meta = json.loads(row[0])
+            start = meta.get("total", 0)
+            self._conn.executemany(
+                "INSERT INTO job_reviews VALUES (?, ?, ?)",
+                ((job_id, start + i, json.dumps(r)) for i, r in enumerate(reviews)),
+            )
+            meta["total"] = start + len(reviews)
+            self._conn.execute(
+                "UPDATE jobs SET data = ?, touched = ? WHERE id = ?", (json.dumps(meta), time.time(), job_id)
+            )
+        job_events.publish(job_id)
+
+    def get_reviews(self, job_id: str, offset: int, limit: int) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM job_reviews WHERE job_id = ? AND seq >= ? ORDER BY seq LIMIT ?",
+                (job_id, offset, limit),
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def _write_reviews(self, job_id: str, reviews: list[dict]):
+        self._conn.execute("DELETE FROM job_reviews WHERE job_id = ?", (job_id,))
+        self._conn.executemany(
+            "INSERT INTO job_reviews VALUES (?, ?, ?)",
+            ((job_id, i, json.dumps(r)) for i, r in enumerate(reviews)),
+        )
+
+    def _evict(self):
+        self._conn.execute(
+            "DELETE FROM jobs WHERE touched < ? AND json_extract(data, '$.status') IN ('done', 'error')",
+            (time.time() - self.ttl_seconds,),
+        )
+        self._conn.execute(
+            """
+            DELETE FROM jobs
+            WHERE json_extract(data, '$.status') IN ('done', 'error')
+              AND id NOT IN (
+                  SELECT id FROM jobs
+                  WHERE json_extract(data, '$.status') IN ('done', 'error')
+                  ORDER BY touched DESC
+                  LIMIT MAX(0, ? - (SELECT COUNT(*) FROM jobs WHERE json_extract(data, '$.status') IN ('pending', 'running')))
+              )
+            """,
+            (self.max_jobs,),
+        )
+        self._conn.execute("DELETE FROM job_reviews WHERE job_id NOT IN (SELECT id FROM jobs)")
+
+        total = self._conn.execute(
+            "SELECT (SELECT COALESCE(SUM(LENGTH(data)), 0) FROM jobs)"
+            " + (SELECT COALESCE(SUM(LENGTH(data)), 0) FROM job_reviews)"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Over the size cap: drop finished jobs, least recently used first
+        rows = self._conn.execute(
+            """
+            SELECT j.id, LENGTH(j.data) + COALESCE(SUM(LENGTH(r.data)), 0)
+            FROM jobs j LEFT JOIN job_reviews r ON r.job_id = j.id
+            WHERE json_extract(j.data, '$.status') IN ('done', 'error')
+            GROUP BY j.id
+            ORDER BY j.touched
+            """
+        ).fetchall()
+        for job_id, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            self._conn.execute("DELETE FROM job_reviews WHERE job_id = ?", (job_id,))
+            total -= size
+
+
+def create_job_store() -> JobStore:
+    if JOB_STORE == "sqlite":
+        return SQLiteJobStore(JOB_STORE_PATH, JOB_STORE_MAX_JOBS, JOB_STORE_MAX_MB * 1024 * 1024, JOB_TTL_SECONDS)
+    return MemoryJobStore(JOB_STORE_MAX_JOBS, JOB_STORE_MAX_MB * 1024 * 1024, JOB_TTL_SECONDS)
+
+
+# Shared by the jobs router and dataset handles (services/datasets.py)
+job_store = create_job_store()
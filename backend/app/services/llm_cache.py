@@ -0,0 +1,58 @@
+"""
+Persistent cache of LLM problem classifications, keyed by a hash of the normalized
+review text (the classifier folds its model and prompt into the key, so changing
+either starts fresh). Repeat runs over the same reviews don't call the API again.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "llm_cache.db")
+
+_SQL_BATCH = 500  # keys per IN (...) lookup, under SQLite's variable limit
+
+_lock = threading.Lock()
+_conn: sqlite3.Connection | None = None
+
+
+def _db() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(LLM_CACHE_PATH, timeout=30, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS classifications (
+                text_key TEXT PRIMARY KEY,
+                categories TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+    return _conn
+
+
+def get_many(keys: list[str]) -> dict[str, list[str]]:
+    """Cached categories for whichever of `keys` are stored."""
+    found = {}
+    with _lock:
+        db = _db()
+        for i in range(0, len(keys), _SQL_BATCH):
+            batch = keys[i:i + _SQL_BATCH]
+            rows = db.execute(
+                f"SELECT text_key, categories FROM classifications WHERE text_key IN ({','.join('?' * len(batch))})",
+                batch,
+            ).fetchall()
+            found.update((k, json.loads(c)) for k, c in rows)
+    return found
+
+
+def put_many(items: dict[str, list[str]]):
+    now = time.time()
+    with _lock:
+        db = _db()
+        with db:
+            db.executemany(
+                "INSERT OR REPLACE INTO classifications VALUES (?, ?, ?)",
+                ((k, json.dumps(c), now) for k, c in items.items()),
+            )
@@ -0,0 +1,202 @@
+"""
+Offline Italian problem classifier: the same pipeline as frontend/src/lib/classifier.ts,
+so results match what the UI computes locally, with no network and no API key.
+
+Pipeline: normalize (lowercase, strip accents) → tokenize → soft stem → fuzzy keyword
+match (Jaro-Winkler ≥ 0.85) → skip negated words → score (phrases +3, keywords +1,
+keep categories ≥ 40% of the best) → halve BUGS_TECNICI in positive context → confidence.
+
+Built for large batches: all phrases and sentiment modifiers go through one
+Aho-Corasick pass per review, and fuzzy keyword matching is memoized per distinct
+token, so a corpus costs roughly one dictionary scan per vocabulary word.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+import numpy as np
+from app.config import (
+    PROBLEM_PHRASES,
+    PROBLEM_KEYWORDS,
+    PROBLEM_POSITIVE_MODIFIERS,
+    PROBLEM_NEGATIVE_MODIFIERS,
+    PROBLEM_STEM_SUFFIXES,
+)
+from app.services.phrase_matcher import PhraseMatcher
+
+FUZZY_THRESHOLD = 0.85
+TOKEN_MEMO_SIZE = 200_000
+
+_CATEGORIES = list(PROBLEM_PHRASES)
+_ACCENTS_RE = re.compile("[\u0300-\u036f]")
+_NON_WORD_RE = re.compile(r"[^a-z0-9\s]")
+_SPACES_RE = re.compile(r"\s+")
+_NEGATION_RE = re.compile(r"(?:^|\s)(non|mai|nessun|nessuna|niente|senza)\s+(\w+)", re.ASCII)
+
+# (category, keyword) in dictionary order; token matches are cached as indices into this
+_KEYWORDS = [(cat, kw) for cat in _CATEGORIES for kw in PROBLEM_KEYWORDS[cat]]
+
+# Per-keyword character counts, lengths and first four char codes for _jaro_candidates
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789"
+_CHAR_INDEX = {c: i for i, c in enumerate(_ALPHABET)}
+_KEYWORD_COUNTS = np.array([[kw.count(c) for c in _ALPHABET] for _, kw in _KEYWORDS], dtype=float)
+_KEYWORD_LENGTHS = np.array([len(kw) for _, kw in _KEYWORDS], dtype=float)
+_KEYWORD_PREFIXES = np.array([[ord(c) for c in kw[:4]] + [-1] * (4 - len(kw[:4])) for _, kw in _KEYWORDS])
+
+# One automaton for every substring test: labels are ("phrase", category, position) or ("pos"/"neg", position)
+_MATCHER = PhraseMatcher([
+    *((phrase, ("phrase", cat, i)) for cat in _CATEGORIES for i, phrase in enumerate(PROBLEM_PHRASES[cat])),
+    *((m, ("pos", i)) for i, m in enumerate(PROBLEM_POSITIVE_MODIFIERS)),
+    *((m, ("neg", i)) for i, m in enumerate(PROBLEM_NEGATIVE_MODIFIERS)),
+])
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFD", text.lower())
+    text = _NON_WORD_RE.sub(" ", _ACCENTS_RE.sub("", text))
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+def soft_stem(word: str) -> str:
+    for suf in PROBLEM_STEM_SUFFIXES:
+        if word.endswith(suf) and len(word) - len(suf) >= 3:
+            return word[: len(word) - len(suf)]
+    return word
+
+
+def jaro(s1: str, s2: str) -> float:
+    if s1 == s2:
+        return 1.0
+    len1, len2 = len(s1), len(s2)
+    if not len1 or not len2:
+        return 0.0
+    win = max(len1, len2) // 2 - 1
+    m1 = [False] * len1
+    m2 = [False] * len2
+    matches = 0
+    for i in range(len1):
+        for j in range(max(0, i - win), min(i + win + 1, len2)):
+            if m2[j] or s1[i] != s2[j]:
+                continue
+            m1[i] = m2[j] = True
+            matches += 1
+            break
+    if not matches:
+        return 0.0
+    t = k = 0
+    for i in range(len1):
+        if not m1[i]:
+            continue
+        while not m2[k]:
+            k += 1
+        if s1[i] != s2[k]:
+            t += 1
+        k += 1
+    return (matches / len1 + matches / len2 + (matches - t / 2) / matches) / 3
+
+
+def jaro_winkler(s1: str, s2: str) -> float:
+    j = jaro(s1, s2)
+    p = 0
+    for i in range(min(4, len(s1), len(s2))):
+        if s1[i] != s2[i]:
+            break
+        p += 1
+    return j + p * 0.1 * (1 - j)
+
+
+def fuzzy_match(token: str, kw: str, threshold: float = FUZZY_THRESHOLD) -> bool:
+    if token == kw or kw in token or token in kw:
+        return True
+    return jaro_winkler(token, kw) >= threshold
+
+
+def _jaro_candidates(s: str, threshold: float) -> np.ndarray:
+    """Mask of keywords whose Jaro-Winkler similarity to `s` could reach `threshold`.
+
+    An upper bound computed for all keywords at once: Jaro is at most
+    (m/len1 + m/len2 + 1) / 3 where m can't exceed the characters both strings share,
+    and the Winkler bonus is fixed by the common prefix.
+    """
+    counts = np.zeros(len(_ALPHABET))
+    for c in s:
+        i = _CHAR_INDEX.get(c)
+        if i is not None:
+            counts[i] += 1
+    prefix = np.full(4, -2)
+    prefix[: min(4, len(s))] = [ord(c) for c in s[:4]]
+    p = np.cumprod(_KEYWORD_PREFIXES == prefix, axis=1).sum(axis=1)
+    need = (threshold - 1e-9 - p * 0.1) / (1 - p * 0.1)
+    m = np.minimum(_KEYWORD_COUNTS, counts).sum(axis=1)
+    return (m / len(s) + m / _KEYWORD_LENGTHS + 1) / 3 >= need
+
+
+@lru_cache(maxsize=TOKEN_MEMO_SIZE)
+def _token_keywords(token: str) -> tuple[int, ...]:
+    """Indices into _KEYWORDS that this token matches: fuzzy_match on its stem, or a prefix either way."""
+    stem = soft_stem(token)
+    candidates = _jaro_candidates(stem, FUZZY_THRESHOLD)
+    return tuple(
+        i for i, (_, kw) in enumerate(_KEYWORDS)
+        if token == kw or token.startswith(kw) or kw.startswith(token) or kw in stem or stem in kw
+        or (candidates[i] and jaro_winkler(stem, kw) >= FUZZY_THRESHOLD)
+    )
+
+
+def classify_with_evidence(text: str) -> dict:
+    """Problem categories for one review ("title body"), with matched keywords, confidence and sentiment."""
+    raw = normalize(text)
+    tokens = raw.split()
+    negated = {m.group(2) for m in _NEGATION_RE.finditer(raw)}
+
+    phrase_hits: dict[str, list[tuple[int, str]]] = {cat: [] for cat in _CATEGORIES}
+    pos = neg = 0
+    for phrase, label in _MATCHER.search(raw):
+        if label[0] == "phrase":
+            phrase_hits[label[1]].append((label[2], phrase))
+        elif label[0] == "pos":
+            pos += 1
+        else:
+            neg += 1
+    sentiment = "positive" if pos > neg else "negative" if neg > pos else "neutral"
+
+    keyword_hits: dict[str, list[str]] = {cat: [] for cat in _CATEGORIES}
+    for i in sorted({i for tok in set(tokens) for i in _token_keywords(tok)}):
+        cat, kw = _KEYWORDS[i]
+        if kw not in negated:
+            keyword_hits[cat].append(kw)
+
+    scores: dict[str, float] = {}
+    matched: dict[str, list[str]] = {}
+    for cat in _CATEGORIES:
+        phrases = [
+            phrase for _, phrase in sorted(phrase_hits[cat])
+            if not any(w in negated for w in phrase.split(" "))
+        ]
+        hits = phrases + keyword_hits[cat]
+        score = 3 * len(phrases) + len(keyword_hits[cat])
+        if score > 0:
+            scores[cat] = score
+            matched[cat] = hits
+
+    if sentiment == "positive" and scores.get("BUGS_TECNICI"):
+        scores["BUGS_TECNICI"] *= 0.5
+        if scores["BUGS_TECNICI"] < 1:
+            del scores["BUGS_TECNICI"]
+            del matched["BUGS_TECNICI"]
+
+    max_score = max([*scores.values(), 0])
+    threshold = max(max_score * 0.4, 0.5)
+    categories = [cat for cat, s in scores.items() if s >= threshold]
+
+    confidence = min(max_score / max(len(tokens) * 0.1, 1), 1.0) if tokens else 0
+    return {
+        "categories": categories,
+        "matched_keywords": {cat: matched[cat] for cat in categories},
+        "confidence": confidence,
+        "needs_review": confidence < 0.3 or not categories,
+        "sentiment": sentiment,
+    }
+
+
+def classify_texts(texts: list[str]) -> list[dict]:
+    return [classify_with_evidence(t) for t in texts]
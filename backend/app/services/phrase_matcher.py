@@ -0,0 +1,54 @@
+"""
+Aho–Corasick automaton for the multi-word keyword phrases in config.py.
+Built once; finds every (possibly overlapping) occurrence of every phrase in a
+single left-to-right pass, so matching cost no longer grows with dictionary size.
+"""
+from collections import deque
+from typing import Hashable, Iterable
+
+
+class PhraseMatcher:
+    def __init__(self, phrases: Iterable[tuple[str, Hashable]]):
+        """`phrases` are (phrase, label) pairs; the same phrase may carry several labels."""
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[tuple[str, Hashable], ...]] = [()]
+
+        for phrase, label in phrases:
+            state = 0
+            for ch in phrase:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] += ((phrase, label),)
+
+        # Breadth-first so every fail target is finished before the states that point to it.
+        # Transitions are flattened into a full table (a DFA), so search never walks fail links.
+        self._delta: list[dict[str, int]] = [dict(self._goto[0])] + [{} for _ in self._goto[1:]]
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+                queue.append(nxt)
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+
+    def search(self, text: str) -> set[tuple[str, Hashable]]:
+        """All (phrase, label) pairs whose phrase occurs anywhere in `text`."""
+        delta, out = self._delta, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
@@ -1,12 +1,24 @@
 """
 LLM-based problem category classifier using DeepSeek.
 Uses the OpenAI-compatible DeepSeek API for efficient batch classification.
+Chunks are sent concurrently under a shared rate limit, and results are cached
+persistently by review text (services/llm_cache.py), so repeat runs are free.
 """
 import os
 import json
+import hashlib
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
 from openai import OpenAI
+from app.services import llm_cache, local_classifier
+from app.services.rate_limit import RateLimiter
 
 DEEPSEEK_API_KEY = os.environ.get("DEEPSEEK_API_KEY", "")
+DEEPSEEK_MODEL = "deepseek-chat"
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", "4"))
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get("LLM_REQUESTS_PER_MINUTE", "120"))
 
 VALID_CATEGORIES = {
     "BUGS_TECNICI",
@@ -30,16 +42,66 @@ Regole:
 - Se la recensione è positiva o non descrive problemi specifici, l'array è vuoto []
 - Restituisci SOLO l'oggetto JSON richiesto, nient'altro"""
 
-BATCH_SIZE = 30
+BATCH_SIZE = 30  # most reviews per request
+BATCH_INPUT_TOKENS = int(os.environ.get("LLM_BATCH_INPUT_TOKENS", "6000"))  # estimated review tokens per request
+MAX_REVIEW_CHARS = 4000  # longer reviews are cut; the gist is in the first paragraphs
+OUTPUT_TOKENS_BASE = 50
+OUTPUT_TOKENS_PER_REVIEW = 25  # up to two category names plus JSON punctuation
 
+# Cache keys include the model and prompt, so editing either doesn't serve stale answers
+_PROMPT_VERSION = hashlib.sha1(f"{DEEPSEEK_MODEL}\n{SYSTEM_PROMPT}".encode("utf-8")).hexdigest()[:12]
 
-def _classify_chunk(texts: list[str]) -> list[list[str]]:
-    """Send one chunk of reviews to DeepSeek, return categories for each."""
-    if not DEEPSEEK_API_KEY:
-        return [[] for _ in texts]
 
-    client = OpenAI(api_key=DEEPSEEK_API_KEY, base_url="https://api.deepseek.com")
+_rate_limiter = RateLimiter(LLM_REQUESTS_PER_MINUTE, LLM_CONCURRENCY)
 
+_client: OpenAI | None = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> OpenAI:
+    """One client (and connection pool) for every chunk and request."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OpenAI(api_key=DEEPSEEK_API_KEY, base_url="https://api.deepseek.com")
+        return _client
+
+
+def _cache_key(text: str) -> str:
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha1(f"{_PROMPT_VERSION}\x1f{normalized}".encode("utf-8")).hexdigest()
+
+
+class _BadOutput(Exception):
+    """The model answered, but not with one category list per review (truncated, malformed, miscounted)."""
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count for Italian/English text; errs high so batches stay under budget."""
+    return len(text) // 3 + 8  # + numbering and quotes
+
+
+def _pack_batches(items: list[tuple[str, str]]) -> list[list[tuple[str, str]]]:
+    """Greedily pack (key, text) items, in order, into batches under both the token and size caps."""
+    batches, current, used = [], [], 0
+    for item in items:
+        cost = _estimate_tokens(item[1])
+        if current and (used + cost > BATCH_INPUT_TOKENS or len(current) >= BATCH_SIZE):
+            batches.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _request_chunk(texts: list[str]) -> list[list[str]]:
+    """Send one chunk of reviews to DeepSeek, return categories for each.
+
+    Raises _BadOutput when the reply can't be lined up with the reviews; API and
+    network errors propagate as they are.
+    """
     numbered = "\n".join(f'{i + 1}. "{t}"' for i, t in enumerate(texts))
     user_msg = (
         f"Classifica queste {len(texts)} recensioni.\n"
@@ -48,55 +110,184 @@ def _classify_chunk(texts: list[str]) -> list[list[str]]:
         f"{numbered}"
     )
 
+    resp = _get_client().chat.completions.create(
+        model=DEEPSEEK_MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_msg},
+        ],
+        max_tokens=OUTPUT_TOKENS_BASE + OUTPUT_TOKENS_PER_REVIEW * len(texts),
+        temperature=0,
+        response_format={"type": "json_object"},
+    )
+    choice = resp.choices[0]
+    if choice.finish_reason == "length":
+        raise _BadOutput("reply truncated")
     try:
-        resp = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_msg},
-            ],
-            max_tokens=800,
-            temperature=0,
-            response_format={"type": "json_object"},
-        )
-        raw = resp.choices[0].message.content.strip()
-        data = json.loads(raw)
-
-        # Extract the results list from the JSON object
-        result_list = None
-        if isinstance(data, list):
-            result_list = data
-        elif isinstance(data, dict):
-            for key in ("results", "classifications", "categories", "data"):
-                if key in data and isinstance(data[key], list):
-                    result_list = data[key]
-                    break
-            if result_list is None:
-                for v in data.values():
-                    if isinstance(v, list):
-                        result_list = v
-                        break
+        data = json.loads((choice.message.content or "").strip())
+    except ValueError as e:
+        raise _BadOutput(f"invalid JSON: {e}") from e
 
+    # Extract the results list from the JSON object
+    result_list = None
+    if isinstance(data, list):
+        result_list = data
+    elif isinstance(data, dict):
+        for key in ("results", "classifications", "categories", "data"):
+            if key in data and isinstance(data[key], list):
+                result_list = data[key]
+                break
         if result_list is None:
-            return [[] for _ in texts]
-
-        # Pad to correct length, filter to valid categories only
-        padded = (result_list + [[] for _ in texts])[: len(texts)]
-        return [
-            [c for c in (item if isinstance(item, list) else []) if c in VALID_CATEGORIES]
-            for item in padded
-        ]
+            for v in data.values():
+                if isinstance(v, list):
+                    result_list = v
+                    break
+
+    if result_list is None or len(result_list) != len(texts):
+        raise _BadOutput("results don't match the reviews sent")
+
+    # Filter to valid categories only
+    return [
+        [c for c in (item if isinstance(item, list) else []) if c in VALID_CATEGORIES]
+        for item in result_list
+    ]
+
+
+def _classify_chunk(
+    texts: list[str], cancel: threading.Event | None = None,
+) -> tuple[list[list[str]], list[bool]]:
+    """Categories for each review plus whether each one was actually answered (and may be cached).
+
+    A reply that doesn't line up is retried by bisection, so one bad review costs its
+    own answer rather than the whole chunk's. API errors fail the chunk without retrying.
+    Once `cancel` is set no further request is sent; the remaining reviews come back unanswered.
+    """
+    if cancel is not None and cancel.is_set():
+        return [[] for _ in texts], [False] * len(texts)
+    _rate_limiter.acquire()
+    # Checked again: the wait for a rate-limit slot can be long
+    if cancel is not None and cancel.is_set():
+        return [[] for _ in texts], [False] * len(texts)
+    try:
+        return _request_chunk(texts), [True] * len(texts)
+    except _BadOutput:
+        if len(texts) == 1:
+            return [[]], [False]
+        mid = len(texts) // 2
+        left_cats, left_ok = _classify_chunk(texts[:mid], cancel)
+        right_cats, right_ok = _classify_chunk(texts[mid:], cancel)
+        return left_cats + right_cats, left_ok + right_ok
     except Exception:
-        return [[] for _ in texts]
+        return [[] for _ in texts], [False] * len(texts)
+
+
+def classify_batch(
+    review_texts: list[str],
+    on_chunk: Callable[[list[int], list[list[str]]], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> list[list[str]]:
+    """Classify a batch of review texts. Returns one category list per input text.
 
+    Cached texts are answered from the store; the rest are deduplicated, packed into
+    chunks by estimated token count and sent concurrently. Without an API key only cached answers are returned.
+    `on_chunk(indices, categories)` is called with the cached answers first and then
+    once per chunk as it completes; every input index is reported exactly once.
+    Setting `cancel` (e.g. when the client disconnects) stops sending chunks: queued
+    ones are dropped, requests already in flight finish, and nothing more is reported.
+    """
+    report = None if on_chunk is None else lambda indices, categories, answered: on_chunk(indices, categories)
+    return _classify_batch(review_texts, report, cancel)
 
-def classify_batch(review_texts: list[str]) -> list[list[str]]:
-    """Classify a batch of review texts. Returns one category list per input text."""
+
+def _classify_batch(
+    review_texts: list[str],
+    on_answers: Callable[[list[int], list[list[str]], list[bool]], None] | None,
+    cancel: threading.Event | None,
+) -> list[list[str]]:
+    """classify_batch, reporting alongside each category list whether the LLM (or its
+    cache) actually answered for that review or it is just an empty placeholder."""
     if not review_texts:
         return []
 
-    results: list[list[str]] = []
-    for i in range(0, len(review_texts), BATCH_SIZE):
-        chunk = review_texts[i : i + BATCH_SIZE]
-        results.extend(_classify_chunk(chunk))
+    keys = [_cache_key(t) for t in review_texts]
+    positions: dict[str, list[int]] = defaultdict(list)
+    for i, key in enumerate(keys):
+        positions[key].append(i)
+    found = llm_cache.get_many(list(positions))
+
+    def report(reported_keys, answered_keys: set[str]):
+        if on_answers is None:
+            return
+        indices = sorted(i for key in reported_keys for i in positions[key])
+        if indices:
+            on_answers(
+                indices,
+                [found.get(keys[i], []) for i in indices],
+                [keys[i] in answered_keys for i in indices],
+            )
+
+    cached = [key for key in positions if key in found]
+    report(cached, set(cached))
+    pending = {key: review_texts[idx[0]][:MAX_REVIEW_CHARS] for key, idx in positions.items() if key not in found}
+
+    if pending and DEEPSEEK_API_KEY:
+        chunks = _pack_batches(list(pending.items()))
+        with ThreadPoolExecutor(max_workers=max(1, min(LLM_CONCURRENCY, len(chunks)))) as pool:
+            futures = {pool.submit(_classify_chunk, [text for _, text in chunk], cancel): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                categories, answered = future.result()
+                fresh = {key: cats for (key, _), cats in zip(chunk, categories)}
+                answered_keys = {key for (key, _), ok in zip(chunk, answered) if ok}
+                found.update(fresh)
+                llm_cache.put_many({key: fresh[key] for key in answered_keys})
+                if cancel is not None and cancel.is_set():
+                    for f in futures:
+                        f.cancel()
+                    break
+                report(fresh, answered_keys)
+    else:
+        report(pending, set())
+
+    return [found.get(key, []) for key in keys]
+
+
+def classify_problems(
+    review_texts: list[str],
+    mode: str = "llm",
+    on_chunk: Callable[[list[int], list[list[str]]], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> list[list[str]]:
+    """Entry point for the classify-problems endpoints.
+
+    - "llm": DeepSeek only (classify_batch).
+    - "local": the offline engine in local_classifier; no network, no key needed.
+    - "hybrid": the offline engine for every review, then the ones it flags as
+      needs_review are re-asked to the LLM when a key is set. An LLM answer replaces
+      the local one; where the LLM failed or gave no answer the local result stays.
+    `on_chunk` reports every index exactly once and `cancel` stops LLM requests, as in classify_batch.
+    """
+    if mode == "llm":
+        return classify_batch(review_texts, on_chunk, cancel)
+
+    evidence = local_classifier.classify_texts(review_texts)
+    results = [e["categories"] for e in evidence]
+    unsure = [i for i, e in enumerate(evidence) if e["needs_review"]] if mode == "hybrid" and DEEPSEEK_API_KEY else []
+
+    if on_chunk is not None:
+        unsure_set = set(unsure)
+        sure = [i for i in range(len(results)) if i not in unsure_set]
+        if sure:
+            on_chunk(sure, [results[i] for i in sure])
+
+    def refine(indices: list[int], categories: list[list[str]], answered: list[bool]):
+        mapped = [unsure[i] for i in indices]
+        for i, cats, ok in zip(mapped, categories, answered):
+            if ok:
+                results[i] = cats
+        if on_chunk is not None:
+            on_chunk(mapped, [results[i] for i in mapped])
+
+    if unsure:
+        _classify_batch([review_texts[i] for i in unsure], refine, cancel)
     return results
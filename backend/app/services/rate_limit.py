@@ -0,0 +1,40 @@
+"""
+Token-bucket rate limiter shared by threads and async tasks, for outbound APIs with
+request quotas (the LLM classifier, the App Store RSS feed).
+"""
+import time
+import asyncio
+import threading
+
+
+class RateLimiter:
+    """Token bucket shared by every thread: `per_minute` sustained, bursts of up to `burst`."""
+
+    def __init__(self, per_minute: int, burst: int):
+        self.rate = per_minute / 60.0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _try_take(self) -> float:
+        """Take a token and return 0, or return how long to wait before trying again."""
+        if self.rate <= 0:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        while wait := self._try_take():
+            time.sleep(wait)
+
+    async def aacquire(self):
+        """acquire for async code: waits without blocking the event loop, same bucket."""
+        while wait := self._try_take():
+            await asyncio.sleep(wait)
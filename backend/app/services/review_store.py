@@ -0,0 +1,126 @@
+"""
+Local SQLite store of fetched reviews, keyed by source ("appstore" / "trustpilot")
+plus feed (f"{app_id}:{country}" or the Trustpilot domain).
+Every fetch is written here; incremental fetches then only page through reviews
+newer than the stored ones and fill in the rest from disk.
+"""
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+REVIEW_STORE_PATH = os.environ.get("REVIEW_STORE_PATH", "reviews.db")
+
+_lock = threading.Lock()
+_conn: sqlite3.Connection | None = None
+
+
+def _db() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(REVIEW_STORE_PATH, timeout=30, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.executescript("""
+            CREATE TABLE IF NOT EXISTS reviews (
+                source TEXT NOT NULL,
+                feed TEXT NOT NULL,
+                review_key TEXT NOT NULL,
+                ts REAL NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (source, feed, review_key)
+            );
+            CREATE INDEX IF NOT EXISTS reviews_by_date ON reviews (source, feed, ts);
+            CREATE TABLE IF NOT EXISTS feeds (
+                source TEXT NOT NULL,
+                feed TEXT NOT NULL,
+                covered_since REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (source, feed)
+            );
+        """)
+    return _conn
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def review_key(review: dict) -> str:
+    """Stable identity for a review; neither feed exposes an id we keep, so hash the content."""
+    date = review.get("date")
+    date_str = date.isoformat() if hasattr(date, "isoformat") else str(date)
+    raw = "\x1f".join([date_str, str(review.get("author", "")), str(review.get("title", "")), str(review.get("review", ""))])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def known_keys(source: str, feed: str, cutoff_date: datetime) -> set[str] | None:
+    """Keys of stored reviews newer than cutoff_date, or None when the store can't serve that range.
+
+    The store only answers for a feed that was once fetched in full back to cutoff_date
+    (or further); otherwise the caller has to do a full fetch.
+    """
+    with _lock:
+        db = _db()
+        row = db.execute(
+            "SELECT covered_since FROM feeds WHERE source = ? AND feed = ?", (source, feed)
+        ).fetchone()
+        if row is None or row[0] > cutoff_date.timestamp():
+            return None
+        rows = db.execute(
+            "SELECT review_key FROM reviews WHERE source = ? AND feed = ? AND ts >= ?",
+            (source, feed, cutoff_date.timestamp()),
+        ).fetchall()
+    return {r[0] for r in rows}
+
+
+def save(source: str, feed: str, reviews: list[dict], cutoff_date: datetime, full: bool):
+    """Upsert fetched reviews (dates as ISO strings). `full` marks a fetch that covered the whole range."""
+    rows = [
+        (source, feed, review_key(r), _as_datetime(r["date"]).timestamp(), json.dumps(r))
+        for r in reviews
+    ]
+    now = datetime.now(timezone.utc).timestamp()
+    with _lock:
+        db = _db()
+        with db:
+            db.executemany("INSERT OR REPLACE INTO reviews VALUES (?, ?, ?, ?, ?)", rows)
+            if full:
+                db.execute(
+                    """
+                    INSERT INTO feeds VALUES (?, ?, ?, ?)
+                    ON CONFLICT (source, feed) DO UPDATE SET
+                        covered_since = MIN(covered_since, excluded.covered_since),
+                        updated_at = excluded.updated_at
+                    """,
+                    (source, feed, cutoff_date.timestamp(), now),
+                )
+            else:
+                db.execute(
+                    "UPDATE feeds SET updated_at = ? WHERE source = ? AND feed = ?",
+                    (now, source, feed),
+                )
+
+
+def load(source: str, feed: str, cutoff_date: datetime) -> list[dict]:
+    """Stored reviews newer than cutoff_date, most recent first."""
+    with _lock:
+        rows = _db().execute(
+            "SELECT data FROM reviews WHERE source = ? AND feed = ? AND ts >= ? ORDER BY ts DESC",
+            (source, feed, cutoff_date.timestamp()),
+        ).fetchall()
+    return [json.loads(r[0]) for r in rows]
+
+
+def merge_newest_first(fresh: list[dict], stored: list[dict]) -> list[dict]:
+    """Fetched plus stored reviews in one list, most recent first (ties keep fetch order)."""
+    return sorted(fresh + stored, key=lambda r: _as_datetime(r["date"]), reverse=True)
+
+
+def load_missing(source: str, feed: str, cutoff_date: datetime, fresh: list[dict]) -> list[dict]:
+    """Stored reviews newer than cutoff_date that aren't in `fresh`, most recent first."""
+    fresh_keys = {review_key(r) for r in fresh}
+    return [r for r in load(source, feed, cutoff_date) if review_key(r) not in fresh_keys]
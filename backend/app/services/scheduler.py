@@ -0,0 +1,74 @@
+"""
+Bounded worker pool for scrape and export jobs.
+Jobs wait in a priority queue (lower number first, FIFO within a priority) and are
+handed to a fixed set of worker threads, with a separate concurrency cap per source
+so a burst of requests can't open dozens of scrapers against one upstream.
+"""
+import os
+import bisect
+import itertools
+import threading
+from collections import Counter
+from typing import Callable
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+JOB_SOURCE_LIMITS = {
+    "appstore": int(os.environ.get("JOB_LIMIT_APPSTORE", "3")),
+    "trustpilot": int(os.environ.get("JOB_LIMIT_TRUSTPILOT", "2")),
+    "export": int(os.environ.get("JOB_LIMIT_EXPORT", "2")),
+}
+
+
+class JobScheduler:
+    def __init__(self, workers: int, source_limits: dict[str, int]):
+        self.source_limits = source_limits
+        self._cond = threading.Condition()
+        self._queue: list[tuple] = []  # sorted (priority, seq, job_id, source, fn, args)
+        self._running: Counter = Counter()
+        self._seq = itertools.count()
+        for i in range(max(1, workers)):
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True).start()
+
+    def submit(self, job_id: str, source: str, fn: Callable, *args, priority: int = 0):
+        with self._cond:
+            bisect.insort(self._queue, (priority, next(self._seq), job_id, source, fn, args))
+            self._cond.notify_all()
+
+    def position(self, job_id: str) -> int | None:
+        """1-based place in the queue, or None once the job has started (or isn't ours)."""
+        with self._cond:
+            for i, entry in enumerate(self._queue):
+                if entry[2] == job_id:
+                    return i + 1
+        return None
+
+    def _has_capacity(self, source: str) -> bool:
+        limit = self.source_limits.get(source)
+        return limit is None or self._running[source] < limit
+
+    def _take(self) -> tuple | None:
+        for i, entry in enumerate(self._queue):
+            if self._has_capacity(entry[3]):
+                return self._queue.pop(i)
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                entry = self._take()
+                while entry is None:
+                    self._cond.wait()
+                    entry = self._take()
+                _, _, _, source, fn, args = entry
+                self._running[source] += 1
+            try:
+                fn(*args)
+            except Exception:
+                pass  # runners record their own errors on the job; keep the worker alive
+            finally:
+                with self._cond:
+                    self._running[source] -= 1
+                    self._cond.notify_all()
+
+
+scheduler = JobScheduler(JOB_WORKERS, JOB_SOURCE_LIMITS)
@@ -1,20 +1,18 @@
-import re
 from collections import Counter
 from app.config import POSITIVE_WORDS, NEGATIVE_WORDS, STOP_WORDS
+from app.services.tokenizer import tokenize
 
 
 def compute_sentiment(texts: list[str]) -> dict:
-    pos_count = 0
-    neg_count = 0
+    word_counts: Counter = Counter()
     total_words = 0
     for text in texts:
-        words = re.findall(r"[a-zA-ZàèéìòùÀÈÉÌÒÙ]{3,}", text.lower())
+        words = tokenize(text).words
         total_words += len(words)
-        for w in words:
-            if w in POSITIVE_WORDS:
-                pos_count += 1
-            elif w in NEGATIVE_WORDS:
-                neg_count += 1
+        word_counts.update(words)
+    # A word in both lists counts as positive
+    pos_count = sum(word_counts[w] for w in POSITIVE_WORDS)
+    neg_count = sum(word_counts[w] for w in NEGATIVE_WORDS - POSITIVE_WORDS)
 
     sentiment_total = pos_count + neg_count
     if sentiment_total == 0:
@@ -40,18 +38,15 @@ def compute_sentiment(texts: list[str]) -> dict:
 def extract_keywords(texts: list[str], top_n: int = 30) -> list[tuple[str, int]]:
     word_counts: Counter = Counter()
     for text in texts:
-        words = re.findall(r"[a-zA-ZàèéìòùÀÈÉÌÒÙ]{3,}", text.lower())
-        for w in words:
-            if w not in STOP_WORDS:
-                word_counts[w] += 1
+        word_counts.update(tokenize(text).words)
+    for w in STOP_WORDS:
+        word_counts.pop(w, None)
     return word_counts.most_common(top_n)
 
 
 def extract_bigrams(texts: list[str], top_n: int = 20) -> list[tuple[tuple[str, str], int]]:
     bigram_counts: Counter = Counter()
     for text in texts:
-        words = re.findall(r"[a-zA-ZàèéìòùÀÈÉÌÒÙ]{3,}", text.lower())
-        words = [w for w in words if w not in STOP_WORDS]
-        for i in range(len(words) - 1):
-            bigram_counts[(words[i], words[i + 1])] += 1
+        words = [w for w in tokenize(text).words if w not in STOP_WORDS]
+        bigram_counts.update(zip(words, words[1:]))
     return bigram_counts.most_common(top_n)
@@ -0,0 +1,7 @@
+"""Server-sent event framing shared by the streaming endpoints."""
+import json
+
+
+def sse_format(event: str, data: dict, event_id: str | None = None) -> str:
+    id_line = f"id: {event_id}\n" if event_id else ""
+    return f"{id_line}event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,143 @@
+"""
+Columnar and line-based exports (CSV, NDJSON, Parquet, Arrow IPC) for BI ingestion.
+
+They use the same partitions as the Excel export: one per star rating for a single
+app, one per app for comparisons. Each row carries its partition in a leading
+`partition` column, so one file holds what the workbook spreads across sheets.
+Values are written as stored (ISO dates, no display formatting).
+CSV and NDJSON are generated while the response is sent. Parquet and Arrow are
+built in a temp file, with one row group/record batch per ROWS_PER_BATCH rows,
+before the response starts.
+"""
+import io
+import csv
+import json
+import tempfile
+from typing import BinaryIO, Iterator, Literal
+from app.services.excel import export_columns, iter_file
+
+ExportFormat = Literal["csv", "ndjson", "parquet", "arrow"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+ROWS_PER_BATCH = 10_000
+PARTITION_COLUMN = "partition"
+
+
+def _columns(partitions: list[tuple[str, list[dict]]]) -> list[str]:
+    columns = export_columns([r for _, rows in partitions for r in rows])
+    return [PARTITION_COLUMN] + [c for c in columns if c != PARTITION_COLUMN]
+
+
+def stream_csv(partitions: list[tuple[str, list[dict]]]) -> Iterator[bytes]:
+    columns = _columns(partitions)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for name, rows in partitions:
+        for i, r in enumerate(rows, 1):
+            writer.writerow([name] + [r.get(c) for c in columns[1:]])
+            if i % ROWS_PER_BATCH == 0:
+                yield buf.getvalue().encode("utf-8")
+                buf.seek(0)
+                buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+def stream_ndjson(partitions: list[tuple[str, list[dict]]]) -> Iterator[bytes]:
+    for name, rows in partitions:
+        for start in range(0, len(rows), ROWS_PER_BATCH):
+            yield "".join(
+                json.dumps({PARTITION_COLUMN: name, **r}, ensure_ascii=False, default=str) + "\n"
+                for r in rows[start:start + ROWS_PER_BATCH]
+            ).encode("utf-8")
+
+
+def _arrow_schema(partitions: list[tuple[str, list[dict]]], columns: list[str]):
+    """int64/float64/bool for columns that only ever hold those (or nulls), string otherwise."""
+    import pyarrow as pa
+
+    kinds: dict[str, set[type]] = {c: set() for c in columns[1:]}
+    for _, rows in partitions:
+        for r in rows:
+            for c, v in r.items():
+                if v is not None and c in kinds:
+                    kinds[c].add(type(v))
+    fields = [pa.field(PARTITION_COLUMN, pa.string())]
+    for c in columns[1:]:
+        if kinds[c] and kinds[c] <= {bool}:
+            fields.append(pa.field(c, pa.bool_()))
+        elif kinds[c] and kinds[c] <= {int}:
+            fields.append(pa.field(c, pa.int64()))
+        elif kinds[c] and kinds[c] <= {int, float}:
+            fields.append(pa.field(c, pa.float64()))
+        else:
+            fields.append(pa.field(c, pa.string()))
+    return pa.schema(fields)
+
+
+def _arrow_batches(partitions: list[tuple[str, list[dict]]], schema) -> Iterator:
+    import pyarrow as pa
+
+    for name, rows in partitions:
+        for start in range(0, len(rows), ROWS_PER_BATCH):
+            chunk = rows[start:start + ROWS_PER_BATCH]
+            arrays = [pa.array([name] * len(chunk), pa.string())]
+            for field in list(schema)[1:]:
+                values = [r.get(field.name) for r in chunk]
+                if pa.types.is_string(field.type):
+                    values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+                arrays.append(pa.array(values, field.type))
+            yield pa.record_batch(arrays, schema=schema)
+
+
+def write_table(partitions: list[tuple[str, list[dict]]], fmt: ExportFormat, target):
+    """Write a Parquet or Arrow IPC stream file to `target` (path or binary file object)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = _columns(partitions)
+    schema = _arrow_schema(partitions, columns)
+    if fmt == "parquet":
+        with pq.ParquetWriter(target, schema) as writer:
+            for batch in _arrow_batches(partitions, schema):
+                writer.write_batch(batch)
+    else:
+        with pa.ipc.new_stream(target, schema) as writer:
+            for batch in _arrow_batches(partitions, schema):
+                writer.write_batch(batch)
+
+
+def write_export(partitions: list[tuple[str, list[dict]]], fmt: ExportFormat, fp: BinaryIO):
+    """Write an export in any of the formats to an open binary file."""
+    if fmt == "csv":
+        fp.writelines(stream_csv(partitions))
+    elif fmt == "ndjson":
+        fp.writelines(stream_ndjson(partitions))
+    else:
+        write_table(partitions, fmt, fp)
+
+
+def stream_table(partitions: list[tuple[str, list[dict]]], fmt: ExportFormat) -> Iterator[bytes]:
+    """Chunks of an export in any of the formats, for a StreamingResponse.
+
+    Not a generator itself: Parquet and Arrow files are written to the temp file
+    here, before the response starts, so a write error is an error response rather
+    than a 200 with a truncated file. CSV and NDJSON are generated as they are sent.
+    """
+    if fmt == "csv":
+        return stream_csv(partitions)
+    if fmt == "ndjson":
+        return stream_ndjson(partitions)
+    tmp = tempfile.TemporaryFile()
+    try:
+        write_table(partitions, fmt, tmp)
+    except BaseException:
+        tmp.close()
+        raise
+    return iter_file(tmp)
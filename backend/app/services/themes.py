@@ -1,20 +1,42 @@
+from collections import defaultdict
 import pandas as pd
 from app.services.sentiment import extract_keywords, extract_bigrams
+from app.services.tokenizer import tokenize
 
 
 def cluster_reviews_by_theme(reviews: list[dict], rating_min: int, rating_max: int, top_n: int = 5) -> list[dict]:
-    df = pd.DataFrame(reviews)
+    return cluster_frame_by_theme(pd.DataFrame(reviews), rating_min, rating_max, top_n)
+
+
+def cluster_frame_by_theme(df: pd.DataFrame, rating_min: int, rating_max: int, top_n: int = 5) -> list[dict]:
+    """cluster_reviews_by_theme over an existing reviews frame."""
     if df.empty:
         return []
 
-    subset = df[df["rating"].between(rating_min, rating_max)].copy()
+    subset = df[df["rating"].between(rating_min, rating_max)].reset_index(drop=True)
     if subset.empty:
         return []
 
     texts = (subset["title"].fillna("") + " " + subset["review"].fillna("")).tolist()
+    tokens = [tokenize(t).words for t in texts]
     bigrams = extract_bigrams(texts, top_n=50)
     keywords = extract_keywords(texts, top_n=50)
 
+    # Token -> positions in `subset` of the reviews containing it, built once for all phrases
+    index: dict[str, set[int]] = defaultdict(set)
+    for pos, words in enumerate(tokens):
+        for w in words:
+            index[w].add(pos)
+
+    found: dict[str, set[int]] = {}
+
+    def containing(word: str) -> set[int]:
+        # Substring semantics, as when every review text was scanned: `word` (letters only)
+        # occurs in a text exactly when it occurs inside one of the text's tokens
+        if word not in found:
+            found[word] = set().union(*(positions for token, positions in index.items() if word in token))
+        return found[word]
+
     bg_dict = {f"{a} {b}": c for (a, b), c in bigrams}
 
     themes = []
@@ -26,19 +48,10 @@ def cluster_reviews_by_theme(reviews: list[dict], rating_min: int, rating_max: i
             break
 
         phrase_words = phrase.split()
-        matching = subset[
-            subset.apply(
-                lambda r, pw=phrase_words: any(
-                    w in (str(r["title"]).lower() + " " + str(r["review"]).lower())
-                    for w in pw
-                ),
-                axis=1,
-            )
-        ]
-
-        matching = matching[~matching.index.isin(used_reviews)]
-        if matching.empty:
+        positions = set().union(*(containing(w) for w in phrase_words)) - used_reviews
+        if not positions:
             continue
+        matching = subset.iloc[sorted(positions)]
 
         # Sort by date if date column exists and is valid
         try:
@@ -48,7 +61,7 @@ def cluster_reviews_by_theme(reviews: list[dict], rating_min: int, rating_max: i
         used_reviews.add(best.name)
 
         related_words = []
-        review_text = (str(best["title"]) + " " + str(best["review"])).lower()
+        review_text = texts[best.name].lower()
         for kw, cnt in keywords:
             if kw in review_text and kw not in phrase_words and len(related_words) < 3:
                 related_words.append(kw)
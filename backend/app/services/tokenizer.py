@@ -0,0 +1,56 @@
+"""
+Shared tokenizer for the analysis services.
+One regex pass per text yields both token flavours the services need, and results
+are cached by content hash so the several analysis calls the UI makes over the same
+reviews don't retokenize them each time.
+"""
+import os
+import re
+import hashlib
+from typing import NamedTuple
+from app.services.cache import TTLCache
+
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", "100000"))
+TOKEN_CACHE_TTL = int(os.environ.get("TOKEN_CACHE_TTL", "3600"))
+
+# Maximal runs of letters, apostrophes and hyphens. Runs of 3+ are the classifier's
+# terms (so "in-app" stays whole); splitting them on ' and - gives the plain words
+# sentiment and keywords count, exactly what [a-zA-ZàèéìòùÀÈÉÌÒÙ]{3,} would find.
+_RUN_RE = re.compile(r"[a-zA-ZàèéìòùÀÈÉÌÒÙ'-]+")
+# Public so batch callers can run it vectorized over a whole column instead of per text
+TERM_RE = re.compile(r"[a-zA-ZàèéìòùÀÈÉÌÒÙ'-]{3,}")
+_JOINER_RE = re.compile(r"['-]")
+
+
+class Tokens(NamedTuple):
+    words: tuple[str, ...]  # letter-only words of 3+ chars
+    terms: tuple[str, ...]  # letter/apostrophe/hyphen runs of 3+ chars
+
+
+token_cache = TTLCache("tokens", TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+
+
+def tokenize(text: str) -> Tokens:
+    """Lowercased tokens of `text`, from the cache when the same content was seen recently."""
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    tokens = token_cache.get(key)
+    if tokens is not None:
+        return tokens
+
+    lowered = text.lower()
+    if "'" not in lowered and "-" not in lowered:
+        # Most reviews: runs are plain words, so both flavours are the same
+        words = tuple(TERM_RE.findall(lowered))
+        tokens = Tokens(words, words)
+    else:
+        words, terms = [], []
+        for run in _RUN_RE.findall(lowered):
+            if len(run) >= 3:
+                terms.append(run)
+            if "'" in run or "-" in run:
+                words.extend(w for w in _JOINER_RE.split(run) if len(w) >= 3)
+            elif len(run) >= 3:
+                words.append(run)
+        tokens = Tokens(tuple(words), tuple(terms))
+    token_cache.set(key, tokens)
+    return tokens
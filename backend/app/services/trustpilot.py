@@ -1,8 +1,9 @@
 import re
 import json
-import urllib.request
-import ssl
 from datetime import datetime
+from typing import Callable
+from app.services.http_client import session, get_async_client
+from app.services.review_store import review_key
 
 
 def clean_domain(raw_input: str) -> str:
@@ -24,98 +25,179 @@ def clean_domain(raw_input: str) -> str:
     return d
 
 
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html",
+    "Accept-Language": "it-IT,it;q=0.9",
+}
+HOSTS = ["it.trustpilot.com", "www.trustpilot.com"]
+
+
 def fetch_page(domain: str, page: int) -> tuple[int, str]:
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html",
-        "Accept-Language": "it-IT,it;q=0.9",
-    }
-    ctx = ssl.create_default_context()
+    for host in HOSTS:
+        url = f"https://{host}/review/{domain}?page={page}"
+        resp = session.get(url, headers=HEADERS, timeout=30)
+        if resp.status_code == 404 and host == "it.trustpilot.com":
+            continue
+        resp.raise_for_status()
+        html = resp.content.decode("utf-8", errors="replace")
+        return resp.status_code, html
 
-    for host in ["it.trustpilot.com", "www.trustpilot.com"]:
+    raise Exception(f"Domain '{domain}' not found on Trustpilot (404 on both it. and www. subdomains)")
+
+
+async def afetch_page(domain: str, page: int) -> tuple[int, str]:
+    for host in HOSTS:
         url = f"https://{host}/review/{domain}?page={page}"
-        req = urllib.request.Request(url, headers=headers)
-        try:
-            with urllib.request.urlopen(req, timeout=30, context=ctx) as resp:
-                raw = resp.read()
-                html = raw.decode("utf-8", errors="replace")
-                return resp.status, html
-        except urllib.request.HTTPError as e:
-            if e.code == 404 and host == "it.trustpilot.com":
-                continue
-            raise
+        resp = await get_async_client().get(url, headers=HEADERS, timeout=30)
+        if resp.status_code == 404 and host == "it.trustpilot.com":
+            continue
+        resp.raise_for_status()
+        html = resp.content.decode("utf-8", errors="replace")
+        return resp.status_code, html
 
     raise Exception(f"Domain '{domain}' not found on Trustpilot (404 on both it. and www. subdomains)")
 
 
-def fetch_reviews_simple(domain: str, max_pages: int, cutoff_date: datetime) -> tuple[list[dict], dict | None]:
-    """Blocking fetch — returns (reviews, business_info). Used by polling jobs."""
+def extract_page_props(html: str) -> dict | None:
+    """The pageProps object embedded in the page's __NEXT_DATA__ script, or None."""
+    match = re.search(r'<script id="__NEXT_DATA__"[^>]*>(.*?)</script>', html, re.DOTALL)
+    if not match:
+        return None
+    nd = json.loads(match.group(1))
+    return nd.get("props", {}).get("pageProps", {})
+
+
+def parse_business_info(props: dict, domain: str) -> tuple[dict, int]:
+    """-> (business_info, total_pages) from any page's props; every page carries both."""
+    bu = props.get("businessUnit", {})
+    business_info = {
+        "name": bu.get("displayName", domain),
+        "trustScore": bu.get("trustScore", 0),
+        "stars": bu.get("stars", 0),
+        "totalReviews": bu.get("numberOfReviews", 0),
+    }
+    pagination = props.get("filters", {}).get("pagination", {})
+    return business_info, pagination.get("totalPages", 1)
+
+
+def parse_reviews(
+    raw_reviews: list[dict], cutoff_date: datetime, known_keys: set[str] | None = None,
+) -> tuple[list[dict], bool, bool, bool]:
+    """Parse one page of reviews -> (reviews newer than cutoff_date, all_too_old, reached_known, reached_cutoff).
+
+    With `known_keys`, already-stored reviews are skipped and flagged via reached_known.
+    reached_cutoff says the page holds a review older than cutoff_date.
+    """
+    reviews = []
+    all_too_old = True
+    reached_known = False
+    reached_cutoff = False
+    for r in raw_reviews:
+        try:
+            pub_date_str = r.get("dates", {}).get("publishedDate", "")
+            if not pub_date_str:
+                continue
+            pub_date = datetime.fromisoformat(pub_date_str.replace("Z", "+00:00"))
+            if pub_date < cutoff_date:
+                reached_cutoff = True
+                continue
+            all_too_old = False
+            parsed = {
+                "date": pub_date.isoformat(),
+                "rating": r.get("rating", 0),
+                "title": r.get("title", ""),
+                "review": r.get("text", ""),
+                "author": r.get("consumer", {}).get("displayName", ""),
+                "version": "N/A",
+            }
+            if known_keys and review_key(parsed) in known_keys:
+                reached_known = True
+                continue
+            reviews.append(parsed)
+        except Exception:
+            continue
+    return reviews, all_too_old, reached_known, reached_cutoff
+
+
+def fetch_reviews_simple(
+    domain: str,
+    max_pages: int,
+    cutoff_date: datetime,
+    known_keys: set[str] | None = None,
+    on_page: Callable[[list[dict]], None] | None = None,
+) -> tuple[list[dict], dict | None, bool]:
+    """Blocking fetch — returns (reviews, business_info, reached_cutoff). Used by polling jobs.
+
+    With `known_keys`, stops at the first page that reaches an already-stored review
+    and returns only the new ones. `on_page` receives each page's reviews as soon as
+    that page is parsed. reached_cutoff is only True when the pages were read back
+    past cutoff_date, not when the fetch stopped at max_pages or on an error.
+    """
     all_reviews = []
     business_info = None
+    reached_cutoff = False
 
     for page in range(1, max_pages + 1):
+        if page > max_pages:  # lowered to the shop's page count by page 1
+            break
         try:
             status_code, html = fetch_page(domain, page)
             if status_code != 200 or len(html) < 1000:
                 break
-            match = re.search(r'<script id="__NEXT_DATA__"[^>]*>(.*?)</script>', html, re.DOTALL)
-            if not match:
+            props = extract_page_props(html)
+            if props is None:
                 break
-            nd = json.loads(match.group(1))
-            props = nd.get("props", {}).get("pageProps", {})
 
             if page == 1:
-                bu = props.get("businessUnit", {})
-                business_info = {
-                    "name": bu.get("displayName", domain),
-                    "trustScore": bu.get("trustScore", 0),
-                    "stars": bu.get("stars", 0),
-                    "totalReviews": bu.get("numberOfReviews", 0),
-                }
-                pagination = props.get("filters", {}).get("pagination", {})
-                total_pages = pagination.get("totalPages", 1)
+                business_info, total_pages = parse_business_info(props, domain)
                 if max_pages > total_pages:
                     max_pages = total_pages
 
-            reviews = props.get("reviews", [])
-            if not reviews:
+            raw_reviews = props.get("reviews", [])
+            if not raw_reviews:
                 break
 
-            all_too_old = True
-            for r in reviews:
-                try:
-                    pub_date_str = r.get("dates", {}).get("publishedDate", "")
-                    if not pub_date_str:
-                        continue
-                    pub_date = datetime.fromisoformat(pub_date_str.replace("Z", "+00:00"))
-                    if pub_date < cutoff_date:
-                        continue
-                    all_too_old = False
-                    all_reviews.append({
-                        "date": pub_date.isoformat(),
-                        "rating": r.get("rating", 0),
-                        "title": r.get("title", ""),
-                        "review": r.get("text", ""),
-                        "author": r.get("consumer", {}).get("displayName", ""),
-                        "version": "N/A",
-                    })
-                except Exception:
-                    continue
-
-            if all_too_old and page > 1:
-                break
+            reviews, all_too_old, reached_known, page_reached_cutoff = parse_reviews(raw_reviews, cutoff_date, known_keys)
+            reached_cutoff = reached_cutoff or page_reached_cutoff
         except Exception:
             break
 
-    return all_reviews, business_info
+        all_reviews.extend(reviews)
+        # Outside the try: a failing callback is the caller's error, not the end of the feed
+        if on_page:
+            on_page(reviews)
 
+        if (all_too_old and page > 1) or reached_known:
+            break
 
-def fetch_reviews_generator(domain: str, max_pages: int, cutoff_date: datetime):
-    """Generator that yields (event_type, data) tuples for SSE streaming."""
+    return all_reviews, business_info, reached_cutoff
+
+
+async def fetch_reviews_generator(
+    domain: str,
+    max_pages: int,
+    cutoff_date: datetime,
+    known_keys: set[str] | None = None,
+    start_page: int = 1,
+    chunks: bool = False,
+):
+    """Async generator that yields (event_type, data) tuples for SSE streaming.
+
+    With `chunks`, each page's reviews also go out as a reviews_chunk carrying
+    `next_page`, the page a resumed stream should start from; without it the reviews
+    only arrive in `complete`, as before. business_info is sent after the first page
+    fetched, so a stream resumed at a later page still gets it, and every page's
+    pagination caps max_pages at the shop's page count.
+    `complete` carries `reached_cutoff` (see fetch_reviews_simple).
+    """
     all_reviews = []
     business_info = None
+    reached_cutoff = False
 
-    for page in range(1, max_pages + 1):
+    for page in range(start_page, max_pages + 1):
+        if page > max_pages:  # lowered to the shop's page count once a page has been read
+            break
         yield ("progress", {
             "page": page,
             "total_pages": max_pages,
@@ -124,7 +206,7 @@ def fetch_reviews_generator(domain: str, max_pages: int, cutoff_date: datetime):
         })
 
         try:
-            status_code, html = fetch_page(domain, page)
+            status_code, html = await afetch_page(domain, page)
 
             if status_code != 200:
                 yield ("error", {"message": f"Trustpilot page {page}: HTTP {status_code}"})
@@ -134,59 +216,29 @@ def fetch_reviews_generator(domain: str, max_pages: int, cutoff_date: datetime):
                 yield ("error", {"message": f"Trustpilot page {page}: Response too short ({len(html)} bytes)"})
                 break
 
-            match = re.search(r'<script id="__NEXT_DATA__"[^>]*>(.*?)</script>', html, re.DOTALL)
-            if not match:
+            props = extract_page_props(html)
+            if props is None:
                 yield ("error", {"message": f"Trustpilot page {page}: Could not find review data in page"})
                 break
 
-            nd = json.loads(match.group(1))
-            props = nd.get("props", {}).get("pageProps", {})
-
-            if page == 1:
-                bu = props.get("businessUnit", {})
-                business_info = {
-                    "name": bu.get("displayName", domain),
-                    "trustScore": bu.get("trustScore", 0),
-                    "stars": bu.get("stars", 0),
-                    "totalReviews": bu.get("numberOfReviews", 0),
-                }
-                pagination = props.get("filters", {}).get("pagination", {})
-                total_pages = pagination.get("totalPages", 1)
-                if max_pages > total_pages:
-                    max_pages = total_pages
-
+            page_info, total_pages = parse_business_info(props, domain)
+            if max_pages > total_pages:
+                max_pages = total_pages
+            if business_info is None:
+                business_info = page_info
                 yield ("business_info", business_info)
 
-            reviews = props.get("reviews", [])
-            if not reviews:
+            raw_reviews = props.get("reviews", [])
+            if not raw_reviews:
                 break
 
-            all_too_old = True
-            for r in reviews:
-                try:
-                    dates = r.get("dates", {})
-                    pub_date_str = dates.get("publishedDate", "")
-                    if pub_date_str:
-                        pub_date = datetime.fromisoformat(pub_date_str.replace("Z", "+00:00"))
-                    else:
-                        continue
-
-                    if pub_date < cutoff_date:
-                        continue
-
-                    all_too_old = False
-                    all_reviews.append({
-                        "date": pub_date.isoformat(),
-                        "rating": r.get("rating", 0),
-                        "title": r.get("title", ""),
-                        "review": r.get("text", ""),
-                        "author": r.get("consumer", {}).get("displayName", ""),
-                        "version": "N/A",
-                    })
-                except Exception:
-                    continue
-
-            if all_too_old and page > 1:
+            reviews, all_too_old, reached_known, page_reached_cutoff = parse_reviews(raw_reviews, cutoff_date, known_keys)
+            reached_cutoff = reached_cutoff or page_reached_cutoff
+            all_reviews.extend(reviews)
+            if chunks and reviews:
+                yield ("reviews_chunk", {"reviews": reviews, "next_page": page + 1})
+
+            if (all_too_old and page > 1) or reached_known:
                 break
 
         except Exception as e:
@@ -197,4 +249,5 @@ def fetch_reviews_generator(domain: str, max_pages: int, cutoff_date: datetime):
         "reviews": all_reviews,
         "total": len(all_reviews),
         "business_info": business_info,
+        "reached_cutoff": reached_cutoff,
     })
@@ -0,0 +1,27 @@
+import pytest
+
+from app.services import export_store, llm_cache, review_store
+
+
+@pytest.fixture(autouse=True)
+def _isolated_review_store(tmp_path, monkeypatch):
+    """Every test gets its own review database instead of ./reviews.db."""
+    monkeypatch.setattr(review_store, "REVIEW_STORE_PATH", str(tmp_path / "reviews.db"))
+    monkeypatch.setattr(review_store, "_conn", None)
+    yield
+    if review_store._conn is not None:
+        review_store._conn.close()
+
+
+@pytest.fixture(autouse=True)
+def _isolated_llm_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_PATH", str(tmp_path / "llm_cache.db"))
+    monkeypatch.setattr(llm_cache, "_conn", None)
+    yield
+    if llm_cache._conn is not None:
+        llm_cache._conn.close()
+
+
+@pytest.fixture(autouse=True)
+def _isolated_export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_store, "EXPORT_DIR", str(tmp_path / "exports"))
@@ -0,0 +1,55 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+_TEXTS = [
+    (1, "App inutile", "L'app va in crash continuo dopo l'aggiornamento"),
+    (1, "Crash", "Crash continuo all'avvio, impossibile accedere al conto"),
+    (2, "Lenta", "Accesso lento e crash continuo, assistenza clienti assente"),
+    (2, "Bloccata", "Schermata bianca e assistenza clienti che non risponde"),
+    (3, "Così così", "Funziona ma manca la modalità scura"),
+    (4, "Buona", "Interfaccia chiara, bonifici istantanei comodi"),
+    (5, "Ottima", "Bonifici istantanei e interfaccia chiara, consigliata"),
+    (5, "Perfetta", "Tutto perfetto, interfaccia chiara e veloce"),
+]
+REVIEWS = [
+    {"date": f"2026-09-{i % 28 + 1:02d}T10:00:00+00:00", "rating": rating, "title": title,
+     "review": body, "author": f"u{i}", "version": "1.0"}
+    for i, (rating, title, body) in enumerate(_TEXTS * 3)
+]
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_all_matches_the_individual_endpoints(client):
+    resp = client.post("/api/analysis/all", json={"reviews": REVIEWS, "keywords_top_n": 10})
+    assert resp.status_code == 200
+    combined = resp.json()
+
+    texts = [f"{r['title']} {r['review']}" for r in REVIEWS]
+    bodies = [r["review"] for r in REVIEWS]
+    assert combined["sentiment"] == client.post("/api/analysis/sentiment", json={"texts": texts}).json()
+    assert combined["keywords"] == client.post(
+        "/api/analysis/keywords", json={"texts": bodies, "top_n": 10},
+    ).json()
+    assert combined["adjusted_metrics"] == client.post(
+        "/api/analysis/adjusted-metrics", json={"reviews": REVIEWS},
+    ).json()
+    assert combined["themes"] == [
+        client.post("/api/analysis/themes", json={"reviews": REVIEWS, "rating_min": lo, "rating_max": hi}).json()
+        for lo, hi in [(1, 2), (4, 5)]
+    ]
+    assert combined["themes"][0]  # the data has themes to compare
+
+
+def test_all_runs_only_the_requested_analyses(client):
+    resp = client.post("/api/analysis/all", json={
+        "reviews": REVIEWS, "analyses": ["themes"], "theme_ranges": [[1, 5]],
+    })
+    body = resp.json()
+    assert set(body) == {"themes"}
+    assert len(body["themes"]) == 1
@@ -0,0 +1,118 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+from app.services import appstore
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def _entry(n: int, days_ago: int) -> dict:
+    date = (NOW - timedelta(days=days_ago)).isoformat().replace("+00:00", "Z")
+    return {
+        "content": {"label": f"review {n}"},
+        "title": {"label": f"title {n}"},
+        "im:rating": {"label": "4"},
+        "updated": {"label": date},
+        "author": {"name": {"label": f"user{n}"}},
+        "im:version": {"label": "1.0"},
+    }
+
+
+def _fake_feed(monkeypatch, pages: dict[int, list[dict]], fail_from: int | None = None):
+    """Serve `pages` from _fetch_feed_entries with random latency; record what was requested."""
+    requested = []
+
+    def fetch(app_id, country, page, timeout):
+        requested.append(page)
+        time.sleep(random.uniform(0, 0.02))
+        if fail_from is not None and page >= fail_from:
+            raise requests.exceptions.HTTPError("404")
+        return pages.get(page, [])
+
+    monkeypatch.setattr(appstore, "_fetch_feed_entries", fetch)
+    return requested
+
+
+def test_iter_feed_pages_yields_pages_in_order(monkeypatch):
+    pages = {p: [_entry(p, p)] for p in range(1, 11)}
+    _fake_feed(monkeypatch, pages)
+
+    result = list(appstore.iter_feed_pages("1", "us", 10, concurrency=4))
+
+    assert [page for page, _ in result] == list(range(1, 11))
+    assert [entries for _, entries in result] == [pages[p] for p in range(1, 11)]
+
+
+def test_iter_feed_pages_stops_at_first_failed_page(monkeypatch):
+    pages = {p: [_entry(p, p)] for p in range(1, 11)}
+    _fake_feed(monkeypatch, pages, fail_from=4)
+
+    result = list(appstore.iter_feed_pages("1", "us", 10, concurrency=3))
+
+    assert [page for page, _ in result] == [1, 2, 3]
+
+
+def test_fetch_reviews_simple_sequential_matches_concurrent(monkeypatch):
+    # three reviews per page, a day apart; the cutoff falls inside page 4
+    pages = {p: [_entry(3 * p + i, 3 * p + i) for i in range(3)] for p in range(1, 9)}
+    _fake_feed(monkeypatch, pages)
+    cutoff = NOW - timedelta(days=13, hours=12)
+
+    sequential, _ = appstore.fetch_reviews_simple("1", "us", 8, cutoff, concurrency=1)
+    concurrent, _ = appstore.fetch_reviews_simple("1", "us", 8, cutoff, concurrency=4)
+
+    assert concurrent == sequential
+    assert [r["review"] for r in sequential] == [f"review {n}" for n in range(3, 14)]
+
+
+def test_fetch_reviews_simple_reports_reaching_the_cutoff(monkeypatch):
+    pages = {p: [_entry(3 * p + i, 3 * p + i) for i in range(3)] for p in range(1, 9)}
+    _fake_feed(monkeypatch, pages)
+    cutoff = NOW - timedelta(days=13, hours=12)
+
+    _, reached = appstore.fetch_reviews_simple("1", "us", 8, cutoff)
+    assert reached
+
+    # stopped by max_pages before getting back to the cutoff
+    _, reached = appstore.fetch_reviews_simple("1", "us", 2, cutoff)
+    assert not reached
+
+
+def test_fetch_reviews_simple_failed_page_does_not_reach_cutoff(monkeypatch):
+    pages = {p: [_entry(3 * p + i, 3 * p + i) for i in range(3)] for p in range(1, 9)}
+    _fake_feed(monkeypatch, pages, fail_from=3)
+    cutoff = NOW - timedelta(days=13, hours=12)
+
+    reviews, reached = appstore.fetch_reviews_simple("1", "us", 8, cutoff)
+    assert len(reviews) == 6
+    assert not reached
+
+
+def test_aiter_feed_pages_settles_cancelled_prefetches(monkeypatch):
+    started, finished = [], []
+
+    async def afetch(app_id, country, page, timeout):
+        started.append(page)
+        try:
+            await asyncio.sleep(0.01 * page)
+            return [_entry(page, page)]
+        finally:
+            finished.append(page)
+
+    monkeypatch.setattr(appstore, "_afetch_feed_entries", afetch)
+
+    async def go():
+        pages = appstore.aiter_feed_pages("1", "us", 10, concurrency=4)
+        async for page, _ in pages:
+            if page == 2:
+                break
+        await pages.aclose()
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    leftover = asyncio.run(go())
+    assert leftover == []
+    assert sorted(finished) == sorted(started)
@@ -0,0 +1,85 @@
+import pytest
+
+from app.services import appstore, cache
+from app.services.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_ttl(clock):
+    c = TTLCache("t", maxsize=10, ttl_seconds=60)
+    c.set("a", 1)
+    clock.now += 59
+    assert c.get("a") == 1
+    clock.now += 2
+    assert c.get("a") is None
+    assert c.get("a", "default") == "default"
+    assert c.stats()["size"] == 0
+
+
+def test_lru_evicts_least_recently_used(clock):
+    c = TTLCache("t", maxsize=2, ttl_seconds=60)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")  # a is now the most recently used
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1 and c.get("c") == 3
+
+    c.set("a", 10)  # overwriting also counts as a use
+    c.set("d", 4)
+    assert c.get("c") is None
+    assert c.get("a") == 10
+
+
+def test_stats_count_hits_and_misses(clock):
+    c = TTLCache("t", maxsize=10, ttl_seconds=60)
+    assert c.stats()["hit_rate"] == 0.0
+    c.set("a", 1)
+    c.get("a")
+    c.get("a")
+    c.get("missing")
+    clock.now += 61
+    c.get("a")  # expired: a miss
+    stats = c.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+    assert stats["hit_rate"] == 0.5
+    assert stats["name"] == "t" and stats["maxsize"] == 10
+
+
+class _Response:
+    def json(self):
+        return {"results": [{"trackId": 1, "trackName": "App"}]}
+
+
+def test_search_results_are_copies_of_the_cache(monkeypatch):
+    calls = []
+
+    def get(url, params=None, timeout=None):
+        calls.append(url)
+        return _Response()
+
+    monkeypatch.setattr(appstore, "search_cache", TTLCache("s", maxsize=10, ttl_seconds=60))
+    monkeypatch.setattr(appstore.session, "get", get)
+
+    first = appstore.search_apps("app")
+    first[0]["name"] = "edited"
+    first.append({"id": "x"})
+    second = appstore.search_apps("app")
+    second[0]["name"] = "edited again"
+
+    assert appstore.search_apps("app") == [{**first[0], "name": "App"}]
+    assert len(calls) == 1
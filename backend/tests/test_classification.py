@@ -0,0 +1,29 @@
+import pandas as pd
+
+from app.config import NON_APP_CATEGORIES, APP_RELATED_KEYWORDS
+from app.services.classification import classify_review, classify_reviews
+
+TEXTS = [
+    ("Ottima app", "Funziona benissimo, nessun crash"),
+    ("Consegna in ritardo", "Il corriere non è mai arrivato, pacco perso"),
+    ("", "L'in-app purchase non funziona e il login fallisce"),
+    ("Servizio clienti", "Nessuno risponde al telefono, assistenza pessima"),
+    ("", ""),
+    ("PREZZO", "Troppo caro, rimborso mai ricevuto"),
+]
+
+
+def test_batch_matches_single_review_classifier():
+    # plus every configured keyword on its own, so each category is hit at least once
+    texts = TEXTS + [("", kw) for kws in [*NON_APP_CATEGORIES.values(), APP_RELATED_KEYWORDS] for kw in sorted(kws)]
+    titles = pd.Series([t for t, _ in texts], index=range(10, 10 + len(texts)))
+    reviews = pd.Series([r for _, r in texts], index=titles.index)
+
+    batch = classify_reviews(titles, reviews)
+
+    assert list(batch.index) == list(titles.index)
+    for (title, review), (_, row) in zip(texts, batch.iterrows()):
+        kind, category = classify_review(title, review)
+        assert row["is_app_related"] == (kind == "app_related"), (title, review)
+        exclusion = None if pd.isna(row["exclusion_category"]) else row["exclusion_category"]
+        assert exclusion == category, (title, review)
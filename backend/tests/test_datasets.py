@@ -0,0 +1,95 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import datasets
+from app.services.datasets import DatasetError, filter_reviews, load_dataset
+from app.services.job_store import MemoryJobStore
+
+
+def _review(day: int, rating: int, text: str = "") -> dict:
+    return {"date": f"2026-09-{day:02d}T23:30:00+00:00", "rating": rating, "title": f"t{day}",
+            "review": text or f"r{day}", "author": "a", "version": "1.0"}
+
+
+REVIEWS = [_review(1, 1), _review(5, 2), _review(10, 5), _review(20, 4), _review(30, 1)]
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = MemoryJobStore(100, 10 * 1024 * 1024, 3600)
+    monkeypatch.setattr(datasets, "job_store", store)
+    store.create("done", {"status": "done", "total": len(REVIEWS), "reviews": REVIEWS})
+    store.create("running", {"status": "running", "total": 0, "reviews": []})
+    return store
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _titles(reviews: list[dict]) -> list[str]:
+    return [r["title"] for r in reviews]
+
+
+def test_filter_by_rating_and_inclusive_day_range():
+    assert _titles(filter_reviews(REVIEWS, ratings=[1])) == ["t1", "t30"]
+    assert _titles(filter_reviews(REVIEWS, date_from=date(2026, 9, 5), date_to=date(2026, 9, 20))) == ["t5", "t10", "t20"]
+    assert _titles(filter_reviews(REVIEWS, ratings=[1, 2], date_to=date(2026, 9, 5))) == ["t1", "t5"]
+    assert filter_reviews(REVIEWS) == REVIEWS
+
+
+def test_reviews_without_a_readable_date_are_dropped_by_a_date_filter():
+    odd = [{**_review(3, 1), "date": "yesterday"}, _review(4, 1)]
+    assert _titles(filter_reviews(odd, date_from=date(2026, 9, 1))) == ["t4"]
+    assert len(filter_reviews(odd, ratings=[1])) == 2
+
+
+def test_load_dataset_errors(store):
+    with pytest.raises(DatasetError) as e:
+        load_dataset("missing")
+    assert e.value.status_code == 404
+    with pytest.raises(DatasetError) as e:
+        load_dataset("running")
+    assert e.value.status_code == 400
+    assert _titles(load_dataset("done", ratings=[4, 5])) == ["t10", "t20"]
+
+
+def test_analysis_endpoints_accept_dataset_handles(store, client):
+    dataset = {"job_id": "done", "ratings": [1]}
+    by_handle = client.post("/api/analysis/sentiment", json={"dataset": dataset}).json()
+    inline = client.post("/api/analysis/sentiment", json={"texts": ["t1 r1", "t30 r30"]}).json()
+    assert by_handle == inline
+
+    keywords = client.post("/api/analysis/keywords", json={"dataset": dataset}).json()
+    assert keywords == client.post("/api/analysis/keywords", json={"texts": ["r1", "r30"]}).json()
+
+    metrics = client.post("/api/analysis/adjusted-metrics", json={"dataset": {"job_id": "done"}})
+    assert metrics.status_code == 200
+
+
+@pytest.mark.parametrize("body, status", [
+    ({"dataset": {"job_id": "missing"}}, 404),
+    ({"dataset": {"job_id": "running"}}, 400),
+    ({}, 422),
+])
+def test_dataset_errors_become_json_responses(store, client, body, status):
+    for path in ("/api/analysis/sentiment", "/api/analysis/themes", "/api/export/excel"):
+        resp = client.post(path, json=body)
+        assert resp.status_code == status, path
+        assert "detail" in resp.json()
+
+
+def test_comparison_export_mixes_inline_apps_and_datasets(store, client):
+    resp = client.post("/api/export/comparison-csv", json={
+        "apps": {"a": [REVIEWS[0]]},
+        "datasets": {"b": {"job_id": "done", "ratings": [5]}},
+        "app_names": {"a": "App A", "b": "App B"},
+    })
+    assert resp.status_code == 200
+    lines = resp.text.strip().splitlines()
+    assert [line.split(",")[0] for line in lines[1:]] == ["App A", "App B"]
+    assert "t10" in lines[2]
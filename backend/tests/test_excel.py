@@ -0,0 +1,49 @@
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from openpyxl import load_workbook
+
+from app.main import app
+from app.services import excel
+
+REVIEWS = [
+    {"date": "2024-05-01T10:00:00+00:00", "rating": 5, "title": "Ottima", "review": "Tutto bene", "author": "a"},
+    {"date": "2024-05-02T10:00:00+00:00", "rating": 1, "title": "Crash", "review": "Si chiude", "author": "b"},
+]
+
+
+def _workbook(fp):
+    return load_workbook(io.BytesIO(b"".join(excel.iter_file(fp))))
+
+
+def _header(ws):
+    return [c.value for c in next(ws.iter_rows(max_row=1))]
+
+
+def test_empty_rating_sheets_get_the_shared_header():
+    fp = excel.build_sheets(excel.rating_sheets(REVIEWS), excel.export_columns(REVIEWS))
+    wb = _workbook(fp)
+    for ws in wb.worksheets:
+        assert _header(ws) == ["date", "rating", "title", "review", "author"]
+    assert wb["3_stelle"].max_row == 1
+
+
+def test_comparison_sheets_keep_their_own_columns():
+    apps = [("A", [{"rating": 5, "review": "ok"}]), ("B", [])]
+    wb = _workbook(excel.build_sheets(apps))
+    assert _header(wb["A"]) == ["rating", "review"]
+    assert wb["B"].max_row <= 1 and wb["B"]["A1"].value is None
+
+
+def test_write_error_is_raised_before_the_response(monkeypatch):
+    def broken(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(excel, "write_sheets", broken)
+    with pytest.raises(OSError):
+        excel.build_sheets(excel.rating_sheets(REVIEWS))
+
+    client = TestClient(app, raise_server_exceptions=False)
+    resp = client.post("/api/export/excel", json={"reviews": REVIEWS})
+    assert resp.status_code == 500
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services import http_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/moved":
+            self.send_response(302)
+            self.send_header("Location", "/page")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        time.sleep(0.05)
+        with cls.lock:
+            cls.active -= 1
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    _Handler.active = _Handler.peak = 0
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+
+
+def _run(coro):
+    async def wrapped():
+        try:
+            return await coro
+        finally:
+            await http_client.aclose()
+    return asyncio.run(wrapped())
+
+
+def test_async_client_follows_redirects(server):
+    async def go():
+        return await http_client.get_async_client().get(server + "/moved")
+
+    response = _run(go())
+    assert response.status_code == 200
+    assert response.url.path == "/page"
+
+
+def test_async_client_caps_requests_per_host(server, monkeypatch):
+    monkeypatch.setattr(http_client, "POOL_PER_HOST", 3)
+
+    async def go():
+        client = http_client.get_async_client()
+        return await asyncio.gather(*(client.get(server + "/page") for _ in range(12)))
+
+    responses = _run(go())
+    assert all(r.status_code == 200 for r in responses)
+    assert _Handler.peak <= 3
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import jobs
+from app.services.job_store import MemoryJobStore
+
+
+def _review(n: int) -> dict:
+    return {"date": "2026-09-01T00:00:00+00:00", "rating": 5, "title": f"t{n}", "review": "", "author": "a"}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = MemoryJobStore(100, 10 * 1024 * 1024, 3600)
+    monkeypatch.setattr(jobs, "_jobs", store)
+    return store
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _events(client, url: str, headers: dict | None = None) -> list[tuple[str, str | None, dict]]:
+    """(event, id, data) for every event until the server closes the stream."""
+    events, fields = [], {}
+    with client.stream("GET", url, headers=headers or {}) as resp:
+        assert resp.status_code == 200
+        for line in resp.iter_lines():
+            if line.startswith(":"):
+                continue
+            if line:
+                key, _, value = line.partition(": ")
+                fields[key] = value
+            elif fields:
+                events.append((fields["event"], fields.get("id"), json.loads(fields["data"])))
+                fields = {}
+    return events
+
+
+def _titles(events) -> list[str]:
+    return [r["title"] for kind, _, data in events if kind == "reviews" for r in data["reviews"]]
+
+
+def test_finished_job_sends_status_reviews_then_complete(store, client, monkeypatch):
+    monkeypatch.setattr(jobs, "DEFAULT_PAGE_SIZE", 2)
+    store.create("a", {"status": "done", "total": 5, "reviews": [_review(i) for i in range(5)]})
+
+    events = _events(client, "/api/jobs/events/a?with_reviews=true")
+    assert [kind for kind, _, _ in events] == ["status", "reviews", "reviews", "reviews", "complete"]
+    assert events[0][2]["status"] == "done"
+    batches = [(eid, data["next_cursor"], len(data["reviews"])) for kind, eid, data in events if kind == "reviews"]
+    assert batches == [("2", 2, 2), ("4", 4, 2), ("5", 5, 1)]
+    assert _titles(events) == [f"t{i}" for i in range(5)]
+    assert events[-1][1] == "5" and events[-1][2]["status"] == "done"
+
+
+def test_without_reviews_only_status_is_sent(store, client):
+    store.create("a", {"status": "done", "total": 2, "reviews": [_review(0), _review(1)]})
+    assert [kind for kind, _, _ in _events(client, "/api/jobs/events/a")] == ["status", "complete"]
+
+
+def test_cursor_and_last_event_id_resume_without_repeats(store, client):
+    store.create("a", {"status": "done", "total": 5, "reviews": [_review(i) for i in range(5)]})
+
+    assert _titles(_events(client, "/api/jobs/events/a?with_reviews=true&cursor=3")) == ["t3", "t4"]
+    # An EventSource reconnect sends the last id it saw, which wins over the original cursor
+    resumed = _events(client, "/api/jobs/events/a?with_reviews=true&cursor=0", {"Last-Event-ID": "4"})
+    assert _titles(resumed) == ["t4"]
+    assert _events(client, "/api/jobs/events/a?with_reviews=true", {"Last-Event-ID": "5"})[-1][0] == "complete"
+
+
+def test_live_job_streams_batches_in_order_and_closes_on_done(store, client):
+    store.create("a", {"status": "running", "total": 0, "reviews": []})
+
+    def worker():
+        time.sleep(0.2)
+        store.append_reviews("a", [_review(0), _review(1)])
+        time.sleep(0.2)
+        store.append_reviews("a", [_review(2)])
+        time.sleep(0.2)
+        store.update("a", status="done")
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    events = _events(client, "/api/jobs/events/a?with_reviews=true")
+    thread.join()
+
+    kinds = [kind for kind, _, _ in events]
+    assert kinds[0] == "status" and events[0][2]["status"] == "running"
+    assert kinds[-2:] == ["status", "complete"]
+    assert events[-1][2]["status"] == "done"
+    assert _titles(events) == ["t0", "t1", "t2"]
+    cursors = [data["next_cursor"] for kind, _, data in events if kind == "reviews"]
+    assert cursors == sorted(cursors) and cursors[-1] == 3
+
+
+def test_stream_closes_on_error(store, client):
+    store.create("a", {"status": "running", "total": 0, "reviews": []})
+    timer = threading.Timer(0.2, store.update, args=("a",), kwargs={"status": "error", "error": "boom"})
+    timer.start()
+    events = _events(client, "/api/jobs/events/a")
+    timer.join()
+    assert events[-1][0] == "complete"
+    assert events[-1][2]["status"] == "error" and events[-1][2]["error"] == "boom"
+
+
+def test_unknown_job_is_404(store, client):
+    assert client.get("/api/jobs/events/missing").status_code == 404
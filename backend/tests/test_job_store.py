@@ -0,0 +1,147 @@
+import time
+
+import pytest
+
+from app.services.job_store import ORPHANED_ERROR, JobStore, MemoryJobStore, SQLiteJobStore, _approx_size
+
+
+def _review(n: int) -> dict:
+    return {"date": "2026-10-01T00:00:00+00:00", "rating": 5, "title": f"t{n}", "review": "x" * 1000, "author": "a"}
+
+
+def _job(status: str = "pending", reviews: list[dict] | None = None) -> dict:
+    return {"status": status, "total": len(reviews or []), "reviews": reviews or [], "business_info": None}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(max_jobs: int = 100, max_bytes: int = 10 * 1024 * 1024, ttl_seconds: int = 3600) -> JobStore:
+        if request.param == "memory":
+            return MemoryJobStore(max_jobs, max_bytes, ttl_seconds)
+        return SQLiteJobStore(str(tmp_path / "jobs.db"), max_jobs, max_bytes, ttl_seconds)
+    return make
+
+
+def test_job_store_is_abstract():
+    with pytest.raises(TypeError):
+        JobStore()
+
+
+def test_get_without_reviews(make_store):
+    store = make_store()
+    store.create("a", _job("done", [_review(1), _review(2)]))
+
+    assert len(store.get("a")["reviews"]) == 2
+    job = store.get("a", with_reviews=False)
+    assert job["reviews"] == []
+    assert job["total"] == 2
+
+
+def test_ttl_evicts_only_finished_jobs(make_store):
+    store = make_store(ttl_seconds=0)
+    store.create("running", _job("running"))
+    store.create("done", _job("done"))
+    time.sleep(0.01)
+    store.create("trigger", _job("pending"))
+
+    assert store.get("running") is not None
+    assert store.get("done") is None
+
+
+def test_count_cap_evicts_only_finished_jobs(make_store):
+    store = make_store(max_jobs=2)
+    for i in range(4):
+        store.create(f"active{i}", _job("pending"))
+    store.create("done", _job("done"))
+    store.create("trigger", _job("pending"))
+
+    assert all(store.get(f"active{i}") is not None for i in range(4))
+    assert store.get("done") is None
+
+
+def test_size_cap_evicts_finished_jobs_oldest_first(make_store):
+    store = make_store(max_bytes=110_000)
+    store.create("running", _job("running", [_review(i) for i in range(40)]))
+    store.create("old", _job("done", [_review(i) for i in range(40)]))
+    store.create("new", _job("done", [_review(i) for i in range(40)]))
+    store.create("trigger", _job("pending"))
+
+    assert store.get("running") is not None
+    assert store.get("old") is None
+    assert store.get("new") is not None
+
+
+def test_dedup_key_joins_active_job(make_store):
+    store = make_store()
+    assert store.create("a", _job(), dedup_key="k") == "a"
+    assert store.create("b", _job(), dedup_key="k") == "a"
+    store.update("a", status="done")
+    assert store.create("c", _job(), dedup_key="k") == "c"
+
+
+def test_append_and_read_by_cursor(make_store):
+    store = make_store()
+    store.create("a", _job("running"))
+    store.append_reviews("a", [_review(0), _review(1)])
+    snapshot = store.get("a")
+    store.append_reviews("a", [_review(2), _review(3), _review(4)])
+
+    assert store.get("a", with_reviews=False)["total"] == 5
+    assert [r["title"] for r in store.get_reviews("a", 0, 2)] == ["t0", "t1"]
+    assert [r["title"] for r in store.get_reviews("a", 2, 10)] == ["t2", "t3", "t4"]
+    assert store.get_reviews("a", 5, 10) == []
+    # earlier reads are snapshots
+    assert len(snapshot["reviews"]) == 2
+    page = store.get_reviews("a", 0, 10)
+    store.append_reviews("a", [_review(5)])
+    assert len(page) == 5
+
+
+def test_memory_size_tracks_appends():
+    store = MemoryJobStore(100, 10 * 1024 * 1024, 3600)
+    store.create("a", _job("running"))
+    for i in range(10):
+        store.append_reviews("a", [_review(i)])
+    assert store._sizes["a"] == _approx_size(store.get("a"))
+
+
+def _sqlite(path, **kwargs) -> SQLiteJobStore:
+    return SQLiteJobStore(str(path), kwargs.pop("max_jobs", 100), 10 * 1024 * 1024, 3600,
+                          heartbeat_seconds=0.05, **kwargs)
+
+
+def test_orphaned_jobs_become_errors_after_restart(tmp_path):
+    crashed = _sqlite(tmp_path / "jobs.db")
+    crashed.create("a", _job("running"), dedup_key="k")
+    crashed.close()  # no more heartbeats, as if the worker died
+    time.sleep(0.2)
+
+    store = _sqlite(tmp_path / "jobs.db")
+    assert store.create("b", _job(), dedup_key="k") == "b"
+    job = store.get("a")
+    assert job["status"] == "error"
+    assert job["error"] == ORPHANED_ERROR
+
+
+def test_jobs_of_a_live_worker_are_kept_and_shared(tmp_path):
+    worker = _sqlite(tmp_path / "jobs.db")
+    worker.create("a", _job("running"), dedup_key="k")
+    time.sleep(0.3)  # several heartbeat periods
+
+    other = _sqlite(tmp_path / "jobs.db")
+    assert other.get("a")["status"] == "running"
+    assert other.create("b", _job(), dedup_key="k") == "a"
+
+
+def test_reaped_orphans_no_longer_hold_the_count_cap(tmp_path):
+    crashed = _sqlite(tmp_path / "jobs.db")
+    for i in range(3):
+        crashed.create(f"orphan{i}", _job("running"))
+    crashed.close()
+    time.sleep(0.2)
+
+    store = _sqlite(tmp_path / "jobs.db", max_jobs=2)
+    store.create("done", _job("done"))
+    store.create("trigger", _job("pending"))
+    assert store.get("done") is not None
+    assert store.get("trigger") is not None
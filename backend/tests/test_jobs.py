@@ -0,0 +1,133 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers import jobs
+from app.services import export_store, review_store
+from app.services.job_store import MemoryJobStore
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+CUTOFF = NOW - timedelta(days=30)
+
+
+def _review(days_ago: int) -> dict:
+    return {
+        "date": NOW - timedelta(days=days_ago),
+        "rating": 4,
+        "title": f"t{days_ago}",
+        "review": f"r{days_ago}",
+        "author": "a",
+        "version": "1.0",
+    }
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = MemoryJobStore(100, 10 * 1024 * 1024, 3600)
+    monkeypatch.setattr(jobs, "_jobs", store)
+    return store
+
+
+def _fake_fetch(monkeypatch, fetched: list[dict], reached_cutoff: bool = True):
+    def fetch(app_id, country, max_pages, cutoff_date, known_keys=None, on_page=None):
+        if on_page:
+            on_page(fetched)
+        return fetched, reached_cutoff
+
+    monkeypatch.setattr(jobs, "fetch_reviews_simple", fetch)
+
+
+def test_appstore_job_saves_coverage_only_when_cutoff_reached(store, monkeypatch):
+    _fake_fetch(monkeypatch, [_review(1)], reached_cutoff=False)
+    store.create("a", {"status": "pending", "total": 0, "reviews": []})
+    jobs._run_appstore("a", "1", "us", 10, CUTOFF, False)
+    assert store.get("a")["status"] == "done"
+    assert review_store.known_keys("appstore", "1:us", CUTOFF) is None
+
+    _fake_fetch(monkeypatch, [_review(1)], reached_cutoff=True)
+    store.create("b", {"status": "pending", "total": 0, "reviews": []})
+    jobs._run_appstore("b", "1", "us", 10, CUTOFF, False)
+    assert review_store.known_keys("appstore", "1:us", CUTOFF) is not None
+
+
+def test_compare_job_saves_coverage_only_when_cutoff_reached(store, monkeypatch):
+    _fake_fetch(monkeypatch, [_review(1)], reached_cutoff=False)
+    store.create("c", {"status": "pending", "total": 0, "reviews": []})
+    jobs._run_compare("c", ["1"], {"1": "App"}, "us", 10, CUTOFF)
+    assert store.get("c")["apps"]["1"]["status"] == "done"
+    assert review_store.known_keys("appstore", "1:us", CUTOFF) is None
+
+    _fake_fetch(monkeypatch, [_review(1)], reached_cutoff=True)
+    store.create("d", {"status": "pending", "total": 0, "reviews": []})
+    jobs._run_compare("d", ["1"], {"1": "App"}, "us", 10, CUTOFF)
+    assert review_store.known_keys("appstore", "1:us", CUTOFF) is not None
+
+
+def test_compare_job_fails_when_every_app_fails(store, monkeypatch):
+    def fetch(app_id, country, max_pages, cutoff_date, known_keys=None, on_page=None):
+        if app_id == "2":
+            return [_review(1)], True
+        raise RuntimeError(f"feed {app_id} unavailable")
+
+    monkeypatch.setattr(jobs, "fetch_reviews_simple", fetch)
+    store.create("all", {"status": "pending", "total": 0, "reviews": []})
+    jobs._run_compare("all", ["1", "3"], {"1": "A", "3": "C"}, "us", 10, CUTOFF)
+    job = store.get("all")
+    assert job["status"] == "error"
+    assert "unavailable" in job["error"]
+    assert {a["status"] for a in job["apps"].values()} == {"error"}
+
+    store.create("some", {"status": "pending", "total": 0, "reviews": []})
+    jobs._run_compare("some", ["1", "2"], {"1": "A", "2": "B"}, "us", 10, CUTOFF)
+    job = store.get("some")
+    assert job["status"] == "done"
+    assert job["apps"]["1"]["status"] == "error"
+
+
+def test_incremental_job_result_is_sorted_newest_first(store, monkeypatch):
+    stored = [_review(d) for d in (3, 5, 8)]
+    review_store.save("appstore", "1:us", jobs._isoformat_dates(stored), CUTOFF, full=True)
+    # the fresh page holds one review older than some stored ones
+    _fake_fetch(monkeypatch, [_review(0), _review(4)])
+    store.create("a", {"status": "pending", "total": 0, "reviews": []})
+
+    jobs._run_appstore("a", "1", "us", 10, CUTOFF, True)
+
+    job = store.get("a")
+    assert job["status"] == "done"
+    assert [r["title"] for r in job["reviews"]] == ["t0", "t3", "t4", "t5", "t8"]
+    assert job["total"] == 5
+
+
+def _export_job(store, job_id: str = "e") -> dict:
+    reviews = jobs._isoformat_dates([_review(1), _review(2)])
+    store.create(job_id, {"status": "pending", "total": 2, "reviews": [], "kind": "export",
+                          "format": "csv", "filename": "reviews.csv"})
+    jobs._run_export(job_id, [("4_stelle", reviews)], "csv", None)
+    return store.get(job_id, with_reviews=False)
+
+
+def test_export_job_records_artifact_path_and_host(store):
+    job = _export_job(store)
+    assert job["status"] == "done"
+    assert job["artifact_host"] == export_store.HOSTNAME
+    assert os.path.dirname(job["artifact_path"]) == export_store.EXPORT_DIR
+    assert job["size"] == os.path.getsize(job["artifact_path"])
+    assert jobs.download_export("e").path == job["artifact_path"]
+
+
+def test_download_of_export_built_on_another_host(store):
+    job = _export_job(store)
+    os.remove(job["artifact_path"])
+    store.update("e", artifact_host="worker-2")
+    with pytest.raises(HTTPException) as e:
+        jobs.download_export("e")
+    assert e.value.status_code == 409
+    assert "worker-2" in e.value.detail
+
+    store.update("e", artifact_host=export_store.HOSTNAME)
+    with pytest.raises(HTTPException) as e:
+        jobs.download_export("e")
+    assert e.value.status_code == 410
@@ -0,0 +1,49 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from app import config
+from app.services import local_classifier
+
+CLASSIFIER_TS = Path(__file__).resolve().parents[2] / "frontend" / "src" / "lib" / "classifier.ts"
+
+
+def _ts_block(source: str, name: str) -> str:
+    """Body of `const NAME ... = [ ... ];` or `= { ... };` in the TS source."""
+    match = re.search(rf"const {name}\b[^=]*=\s*([\[{{])(.*?)\n[\]}}];", source, re.DOTALL)
+    assert match, f"{name} not found in classifier.ts"
+    return match.group(2)
+
+
+def _ts_strings(block: str) -> list[str]:
+    return re.findall(r'"([^"]*)"', block)
+
+
+def _ts_record(block: str) -> dict[str, list[str]]:
+    return {
+        key: _ts_strings(body)
+        for key, body in re.findall(r"^\s*(\w+):\s*\[(.*?)\],", block, re.DOTALL | re.MULTILINE)
+    }
+
+
+@pytest.mark.skipif(not CLASSIFIER_TS.exists(), reason="frontend sources not present")
+def test_dictionaries_match_the_frontend_engine():
+    source = CLASSIFIER_TS.read_text(encoding="utf-8")
+
+    assert config.PROBLEM_PHRASES == _ts_record(_ts_block(source, "PHRASES"))
+    assert config.PROBLEM_KEYWORDS == _ts_record(_ts_block(source, "SINGLE_KEYWORDS"))
+    assert config.PROBLEM_POSITIVE_MODIFIERS == _ts_strings(_ts_block(source, "POSITIVE_MODIFIERS"))
+    assert config.PROBLEM_NEGATIVE_MODIFIERS == _ts_strings(_ts_block(source, "NEGATIVE_MODIFIERS"))
+    assert config.PROBLEM_STEM_SUFFIXES == _ts_strings(_ts_block(source, "SUFFIXES"))
+
+
+def test_evidence_shape_and_review_flag():
+    crash = local_classifier.classify_with_evidence("L'app si blocca di continuo, crash ad ogni avvio")
+    assert "BUGS_TECNICI" in crash["categories"]
+    assert set(crash) == {"categories", "matched_keywords", "confidence", "needs_review", "sentiment"}
+    assert crash["needs_review"] == (crash["confidence"] < 0.3 or not crash["categories"])
+
+    nothing = local_classifier.classify_with_evidence("Tutto ok")
+    assert nothing["categories"] == []
+    assert nothing["needs_review"]
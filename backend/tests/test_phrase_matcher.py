@@ -0,0 +1,34 @@
+import random
+
+from app.services.phrase_matcher import PhraseMatcher
+
+
+def _brute_force(phrases, text):
+    return {(p, label) for p, label in phrases if p in text}
+
+
+def test_finds_overlapping_and_nested_phrases():
+    phrases = [("he", 1), ("she", 2), ("his", 3), ("hers", 4), ("non funziona", 5), ("funziona", 6)]
+    matcher = PhraseMatcher(phrases)
+
+    assert matcher.search("ushers") == {("she", 2), ("he", 1), ("hers", 4)}
+    assert matcher.search("l'app non funziona più") == {("non funziona", 5), ("funziona", 6)}
+    assert matcher.search("nothing here?") == {("he", 1)}
+    assert matcher.search("") == set()
+
+
+def test_same_phrase_with_several_labels():
+    matcher = PhraseMatcher([("crash", "bug"), ("crash", "stability")])
+    assert matcher.search("app crash") == {("crash", "bug"), ("crash", "stability")}
+
+
+def test_matches_brute_force_on_random_input():
+    rng = random.Random(7)
+    alphabet = "abc "
+    for _ in range(200):
+        phrases = [
+            ("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))), i)
+            for i in range(rng.randint(1, 12))
+        ]
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert PhraseMatcher(phrases).search(text) == _brute_force(phrases, text)
@@ -0,0 +1,159 @@
+import threading
+import time
+
+import pytest
+
+from app.services import problem_classifier as pc
+
+
+class FakeLLM:
+    """Stands in for _request_chunk; answers every review with the categories in `answers`."""
+
+    def __init__(self, answers: dict[str, list[str]] | None = None, bad: set[str] = frozenset(), delay: float = 0):
+        self.answers = answers or {}
+        self.bad = bad
+        self.delay = delay
+        self.calls: list[list[str]] = []
+        self.lock = threading.Lock()
+
+    def __call__(self, texts: list[str]) -> list[list[str]]:
+        with self.lock:
+            self.calls.append(list(texts))
+        time.sleep(self.delay)
+        if any(t in self.bad for t in texts):
+            raise pc._BadOutput("miscounted")
+        return [list(self.answers.get(t, [])) for t in texts]
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = FakeLLM()
+    monkeypatch.setattr(pc, "_request_chunk", fake)
+    monkeypatch.setattr(pc, "DEEPSEEK_API_KEY", "test-key")
+    monkeypatch.setattr(pc, "_rate_limiter", pc.RateLimiter(10_000, 100))
+    return fake
+
+
+def test_cancel_stops_sending_chunks(llm, monkeypatch):
+    monkeypatch.setattr(pc, "BATCH_SIZE", 2)
+    monkeypatch.setattr(pc, "LLM_CONCURRENCY", 1)
+    llm.delay = 0.05
+    cancel = threading.Event()
+    reported = []
+
+    def on_chunk(indices, categories):
+        reported.extend(indices)
+        cancel.set()  # the client goes away after the first chunk
+
+    pc.classify_batch([f"review {i}" for i in range(10)], on_chunk, cancel)
+
+    # the request already in flight when the client left finishes; nothing after it is sent
+    assert len(llm.calls) <= 2
+    assert len(reported) == 2
+
+
+def test_pack_batches_respects_both_caps(monkeypatch):
+    monkeypatch.setattr(pc, "BATCH_SIZE", 3)
+    monkeypatch.setattr(pc, "BATCH_INPUT_TOKENS", 100)
+    short = [(f"s{i}", "x" * 30) for i in range(7)]  # 18 tokens each
+    batches = pc._pack_batches(short)
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert [item for b in batches for item in b] == short
+
+    mixed = [("a", "x" * 150), ("b", "x" * 150), ("c", "x" * 30), ("huge", "x" * 600)]  # 58, 58, 18, 208
+    batches = pc._pack_batches(mixed)
+    # an oversized review still goes out, alone
+    assert [[k for k, _ in b] for b in batches] == [["a"], ["b", "c"], ["huge"]]
+    assert pc._pack_batches([]) == []
+
+
+def test_classify_chunk_bisects_around_a_bad_review(llm):
+    llm.answers = {f"r{i}": ["BUGS_TECNICI"] for i in range(8)}
+    llm.bad = {"r5"}
+
+    categories, answered = pc._classify_chunk([f"r{i}" for i in range(8)])
+
+    assert answered == [True] * 5 + [False] + [True] * 2
+    assert categories == [["BUGS_TECNICI"]] * 5 + [[]] + [["BUGS_TECNICI"]] * 2
+    # whole chunk, then halves down to the single bad review: 8 -> 4+4 -> 2+2 -> 1+1
+    assert sorted(map(len, llm.calls)) == [1, 1, 2, 2, 4, 4, 8]
+
+
+def test_classify_chunk_api_error_fails_without_retry(llm, monkeypatch):
+    calls = []
+
+    def broken(texts):
+        calls.append(texts)
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(pc, "_request_chunk", broken)
+    categories, answered = pc._classify_chunk(["a", "b", "c"])
+    assert (categories, answered) == ([[], [], []], [False, False, False])
+    assert len(calls) == 1
+
+
+def test_classify_batch_caches_only_answered_reviews(llm):
+    llm.answers = {"good": ["UX_USABILITA"]}
+    llm.bad = {"bad"}
+
+    assert pc.classify_batch(["good", "bad", "good"]) == [["UX_USABILITA"], [], ["UX_USABILITA"]]
+    assert llm.calls[0] == ["good", "bad"]  # deduplicated
+
+    llm.calls.clear()
+    pc.classify_batch(["good", "bad"])
+    assert llm.calls == [["bad"]]  # "good" came from the cache, "bad" is asked again
+
+
+def _fake_local(monkeypatch, evidence: dict[str, tuple[list[str], bool]]):
+    """Local engine answering `text -> (categories, needs_review)`."""
+    monkeypatch.setattr(
+        pc.local_classifier,
+        "classify_texts",
+        lambda texts: [{"categories": evidence[t][0], "needs_review": evidence[t][1]} for t in texts],
+    )
+
+
+def test_hybrid_keeps_local_result_when_llm_fails(llm, monkeypatch):
+    _fake_local(monkeypatch, {
+        "sure": (["UX_USABILITA"], False),
+        "unsure answered": (["BUGS_TECNICI"], True),
+        "unsure empty answer": (["BUGS_TECNICI"], True),
+        "unsure bad reply": (["CUSTOMER_SUPPORT"], True),
+        "unsure nothing": ([], True),
+    })
+    llm.answers = {"unsure answered": ["ONBOARDING_SETUP"]}
+    llm.bad = {"unsure bad reply"}
+    texts = ["sure", "unsure answered", "unsure empty answer", "unsure bad reply", "unsure nothing"]
+    reported = {}
+
+    def on_chunk(indices, categories):
+        for i, cats in zip(indices, categories):
+            assert i not in reported
+            reported[i] = cats
+
+    results = pc.classify_problems(texts, "hybrid", on_chunk)
+
+    assert results == [
+        ["UX_USABILITA"],        # never sent to the LLM
+        ["ONBOARDING_SETUP"],    # the LLM's answer wins
+        [],                      # the LLM answered "no problem"
+        ["CUSTOMER_SUPPORT"],    # the LLM couldn't answer: local result stays
+        [],
+    ]
+    assert reported == dict(enumerate(results))
+    assert ["unsure bad reply"] in llm.calls  # bisected down to the review the LLM couldn't answer
+    assert all("sure" not in call for call in llm.calls)
+
+
+def test_hybrid_without_answers_reports_local_results(llm, monkeypatch):
+    _fake_local(monkeypatch, {"a": (["BUGS_TECNICI"], True), "b": (["UX_USABILITA"], True)})
+
+    def down(texts):
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(pc, "_request_chunk", down)
+    reported = []
+    results = pc.classify_problems(["a", "b"], "hybrid", lambda i, c: reported.extend(zip(i, c)))
+
+    assert results == [["BUGS_TECNICI"], ["UX_USABILITA"]]
+    assert sorted(reported) == [(0, ["BUGS_TECNICI"]), (1, ["UX_USABILITA"])]
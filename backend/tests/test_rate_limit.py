@@ -0,0 +1,31 @@
+import asyncio
+import time
+
+from app.services.rate_limit import RateLimiter
+
+
+def test_async_acquire_waits_without_blocking_the_loop():
+    limiter = RateLimiter(per_minute=600, burst=2)  # 10/s after a burst of 2
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.02)
+
+    async def main():
+        start = time.monotonic()
+        await asyncio.gather(ticker(), *(limiter.aacquire() for _ in range(4)))
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(main())
+    assert elapsed >= 0.18  # two tokens beyond the burst, at 0.1 s each
+    assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.15
+
+
+def test_sync_and_async_share_one_bucket():
+    limiter = RateLimiter(per_minute=600, burst=1)
+    limiter.acquire()
+    start = time.monotonic()
+    asyncio.run(limiter.aacquire())
+    assert time.monotonic() - start >= 0.09
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+
+from app.services import review_store
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def _review(days_ago: int) -> dict:
+    return {
+        "date": (NOW - timedelta(days=days_ago)).isoformat(),
+        "rating": 5,
+        "title": f"t{days_ago}",
+        "review": f"r{days_ago}",
+        "author": "a",
+        "version": "1.0",
+    }
+
+
+def test_unknown_feed_is_not_covered():
+    assert review_store.known_keys("appstore", "1:us", NOW - timedelta(days=30)) is None
+
+
+def test_partial_fetch_does_not_cover_the_feed():
+    cutoff = NOW - timedelta(days=30)
+    review_store.save("appstore", "1:us", [_review(1), _review(2)], cutoff, full=False)
+
+    assert review_store.known_keys("appstore", "1:us", cutoff) is None
+    assert len(review_store.load("appstore", "1:us", cutoff)) == 2
+
+
+def test_full_fetch_covers_its_range_only():
+    cutoff = NOW - timedelta(days=30)
+    reviews = [_review(1), _review(10), _review(20)]
+    review_store.save("appstore", "1:us", reviews, cutoff, full=True)
+
+    assert review_store.known_keys("appstore", "1:us", cutoff) == {review_store.review_key(r) for r in reviews}
+    assert review_store.known_keys("appstore", "1:us", NOW - timedelta(days=15)) == {
+        review_store.review_key(r) for r in reviews[:2]
+    }
+    # further back than the fetch went
+    assert review_store.known_keys("appstore", "1:us", NOW - timedelta(days=60)) is None
+    # other source / feed
+    assert review_store.known_keys("trustpilot", "1:us", cutoff) is None
+    assert review_store.known_keys("appstore", "1:gb", cutoff) is None
+
+
+def test_later_partial_fetch_keeps_earlier_coverage():
+    review_store.save("appstore", "1:us", [_review(40)], NOW - timedelta(days=60), full=True)
+    review_store.save("appstore", "1:us", [_review(1)], NOW - timedelta(days=5), full=False)
+    review_store.save("appstore", "1:us", [_review(2)], NOW - timedelta(days=10), full=True)
+
+    keys = review_store.known_keys("appstore", "1:us", NOW - timedelta(days=60))
+    assert keys == {review_store.review_key(r) for r in (_review(1), _review(2), _review(40))}
+
+
+def test_load_missing_skips_fresh_reviews_newest_first():
+    cutoff = NOW - timedelta(days=30)
+    review_store.save("appstore", "1:us", [_review(3), _review(1), _review(2)], cutoff, full=True)
+
+    missing = review_store.load_missing("appstore", "1:us", cutoff, [_review(1)])
+    assert missing == [_review(2), _review(3)]
@@ -0,0 +1,79 @@
+import threading
+import time
+
+from app.services.scheduler import JobScheduler
+
+
+def _wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_per_source_limit_caps_concurrency():
+    scheduler = JobScheduler(workers=4, source_limits={"slow": 1})
+    lock = threading.Lock()
+    running = {"slow": 0, "other": 0}
+    peak = {"slow": 0, "other": 0}
+    release = threading.Event()
+    finished = []
+
+    def job(source: str, name: str):
+        with lock:
+            running[source] += 1
+            peak[source] = max(peak[source], running[source])
+        release.wait(2)
+        with lock:
+            running[source] -= 1
+            finished.append(name)
+
+    for i in range(3):
+        scheduler.submit(f"s{i}", "slow", job, "slow", f"s{i}")
+    scheduler.submit("o", "other", job, "other", "o")
+    # the unlimited source isn't held up behind the capped one
+    _wait_for(lambda: running["other"] == 1)
+    assert running["slow"] == 1
+
+    release.set()
+    _wait_for(lambda: len(finished) == 4)
+    assert peak["slow"] == 1
+
+
+def test_priority_then_fifo_and_queue_positions():
+    scheduler = JobScheduler(workers=1, source_limits={})
+    started = threading.Event()
+    release = threading.Event()
+    order = []
+
+    def blocker():
+        started.set()
+        release.wait(2)
+
+    scheduler.submit("busy", "x", blocker)
+    assert started.wait(2)
+    scheduler.submit("late", "x", order.append, "late", priority=5)
+    scheduler.submit("first", "x", order.append, "first", priority=0)
+    scheduler.submit("second", "x", order.append, "second", priority=0)
+    scheduler.submit("middle", "x", order.append, "middle", priority=1)
+
+    assert scheduler.position("busy") is None  # already running
+    assert scheduler.position("unknown") is None
+    assert [scheduler.position(j) for j in ("first", "second", "middle", "late")] == [1, 2, 3, 4]
+
+    release.set()
+    _wait_for(lambda: len(order) == 4)
+    assert order == ["first", "second", "middle", "late"]
+    assert scheduler.position("late") is None
+
+
+def test_a_failing_job_does_not_stop_the_worker():
+    scheduler = JobScheduler(workers=1, source_limits={"x": 1})
+    done = threading.Event()
+
+    def boom():
+        raise RuntimeError("boom")
+
+    scheduler.submit("a", "x", boom)
+    scheduler.submit("b", "x", done.set)
+    assert done.wait(2)
@@ -0,0 +1,59 @@
+import asyncio
+import zlib
+
+from app.routers.reviews import parse_resume_token, summarize_complete
+from app.services import review_store
+
+
+def _review(n: int) -> dict:
+    return {"date": f"2026-09-{n + 1:02d}T00:00:00+00:00", "rating": 5, "title": f"t{n}", "review": "", "author": ""}
+
+
+async def _events(chunks: list[list[dict]], first_page: int = 1):
+    page = first_page
+    for chunk in chunks:
+        yield "progress", {"page": page}
+        yield "reviews_chunk", {"reviews": chunk, "next_page": page + 1}
+        page += 1
+    yield "complete", {"reviews": [r for c in chunks for r in c], "total": sum(map(len, chunks))}
+
+
+def _collect(events) -> list:
+    async def go():
+        return [e async for e in events]
+    return asyncio.run(go())
+
+
+def test_parse_resume_token():
+    assert parse_resume_token("4.120.0000abcd") == (4, 120, 0xABCD)
+    assert parse_resume_token("0.5.00000001") == (1, 5, 1)
+    for bad in (None, "", "3.2", "x.1.2", "3.2.zz", "1.2.3.4"):
+        assert parse_resume_token(bad) == (1, 0, 0)
+
+
+def test_summary_complete_drops_reviews_and_checksums_keys():
+    chunks = [[_review(0), _review(1)], [_review(2)]]
+    out = _collect(summarize_complete(_events(chunks)))
+
+    expected = 0
+    for r in chunks[0] + chunks[1]:
+        expected = zlib.crc32(review_store.review_key(r).encode(), expected)
+    event_type, complete, event_id = out[-1]
+    assert event_type == "complete" and event_id is None
+    assert "reviews" not in complete
+    assert complete["total"] == 3
+    assert complete["checksum"] == f"{expected:08x}"
+    assert complete["resume_token"] == f"3.3.{expected:08x}"
+    assert [eid for t, _, eid in out if t == "reviews_chunk"] == [out[1][2], complete["resume_token"]]
+
+
+def test_resumed_stream_matches_uninterrupted_one():
+    chunks = [[_review(0), _review(1)], [_review(2)], [_review(3), _review(4)]]
+    whole = _collect(summarize_complete(_events(chunks)))[-1][1]
+
+    first = _collect(summarize_complete(_events(chunks[:1])))
+    token = next(eid for t, _, eid in first if t == "reviews_chunk")
+    page, sent, checksum = parse_resume_token(token)
+    resumed = _collect(summarize_complete(_events(chunks[1:], first_page=page), sent, checksum))[-1][1]
+
+    assert (resumed["total"], resumed["checksum"]) == (whole["total"], whole["checksum"])
@@ -0,0 +1,38 @@
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import table_export
+
+REVIEWS = [
+    {"date": "2024-05-01T10:00:00+00:00", "rating": 5, "title": "Ottima", "review": "Tutto bene", "author": "a"},
+    {"date": "2024-05-02T10:00:00+00:00", "rating": 1, "title": "Crash", "review": "Si chiude", "author": "b"},
+]
+PARTITIONS = [("5_stelle", REVIEWS[:1]), ("1_stelle", REVIEWS[1:])]
+
+
+def test_parquet_and_arrow_round_trip():
+    parquet = pq.read_table(io.BytesIO(b"".join(table_export.stream_table(PARTITIONS, "parquet"))))
+    assert parquet.column("partition").to_pylist() == ["5_stelle", "1_stelle"]
+    assert parquet.schema.field("rating").type == pa.int64()
+
+    arrow = pa.ipc.open_stream(b"".join(table_export.stream_table(PARTITIONS, "arrow"))).read_all()
+    assert arrow.column("title").to_pylist() == ["Ottima", "Crash"]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_write_error_is_raised_before_the_response(monkeypatch, fmt):
+    def broken(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(table_export, "write_table", broken)
+    with pytest.raises(OSError):
+        table_export.stream_table(PARTITIONS, fmt)
+
+    client = TestClient(app, raise_server_exceptions=False)
+    resp = client.post(f"/api/export/{fmt}", json={"reviews": REVIEWS})
+    assert resp.status_code == 500
@@ -0,0 +1,25 @@
+from app.services.themes import cluster_reviews_by_theme
+
+
+def _baseline_matches(reviews: list[dict], phrase: str) -> int:
+    """How many reviews the original per-row substring scan matched for `phrase`."""
+    return sum(
+        any(w in (str(r["title"]).lower() + " " + str(r["review"]).lower()) for w in phrase.split())
+        for r in reviews
+    )
+
+
+def test_phrase_words_match_inside_longer_words():
+    reviews = [
+        {"title": "Pessima", "review": "crash continuo all'avvio", "rating": 1, "date": "2026-09-01", "author": "a"},
+        {"title": "Delusione", "review": "crash continuo sempre", "rating": 2, "date": "2026-09-02", "author": "b"},
+        {"title": "Male", "review": "crashano continuamente", "rating": 1, "date": "2026-09-03", "author": "c"},
+        {"title": "Niente", "review": "non si apre", "rating": 1, "date": "2026-09-04", "author": "d"},
+    ]
+
+    themes = cluster_reviews_by_theme(reviews, 1, 2, top_n=1)
+
+    assert themes[0]["theme"] == "crash continuo"
+    # "crashano" and "continuamente" contain the phrase words, as in the substring scan
+    assert themes[0]["matching_count"] == _baseline_matches(reviews, "crash continuo") == 3
+    assert themes[0]["example_author"] == "c"
@@ -0,0 +1,123 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services import trustpilot
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def _page_html(reviews: list[dict], total_pages: int = 10) -> str:
+    props = {
+        "businessUnit": {"displayName": "Shop", "trustScore": 4.1, "stars": 4, "numberOfReviews": 100},
+        "filters": {"pagination": {"totalPages": total_pages}},
+        "reviews": reviews,
+    }
+    data = json.dumps({"props": {"pageProps": props}})
+    return f'<html>{" " * 1000}<script id="__NEXT_DATA__" type="application/json">{data}</script></html>'
+
+
+def _raw(n: int, days_ago: int) -> dict:
+    return {
+        "dates": {"publishedDate": (NOW - timedelta(days=days_ago)).isoformat()},
+        "rating": 3,
+        "title": f"t{n}",
+        "text": f"r{n}",
+        "consumer": {"displayName": f"u{n}"},
+    }
+
+
+def _fake_site(monkeypatch, pages: dict[int, list[dict]], fail_from: int | None = None):
+    def fetch_page(domain, page):
+        if fail_from is not None and page >= fail_from:
+            raise RuntimeError("connection reset")
+        return 200, _page_html(pages.get(page, []))
+
+    monkeypatch.setattr(trustpilot, "fetch_page", fetch_page)
+
+
+PAGES = {p: [_raw(2 * p + i, 2 * p + i) for i in range(2)] for p in range(1, 10)}
+
+
+def test_fetch_reviews_simple_reports_reaching_the_cutoff(monkeypatch):
+    _fake_site(monkeypatch, PAGES)
+
+    reviews, info, reached = trustpilot.fetch_reviews_simple("shop.com", 10, NOW - timedelta(days=6, hours=12))
+    assert [r["title"] for r in reviews] == ["t2", "t3", "t4", "t5", "t6"]
+    assert info["name"] == "Shop"
+    assert reached
+
+
+def test_fetch_reviews_simple_cut_short_does_not_reach_cutoff(monkeypatch):
+    _fake_site(monkeypatch, PAGES, fail_from=2)
+    _, _, reached = trustpilot.fetch_reviews_simple("shop.com", 10, NOW - timedelta(days=6, hours=12))
+    assert not reached
+
+    _fake_site(monkeypatch, PAGES)
+    _, _, reached = trustpilot.fetch_reviews_simple("shop.com", 2, NOW - timedelta(days=6, hours=12))
+    assert not reached
+
+
+def test_fetch_reviews_simple_propagates_callback_errors(monkeypatch):
+    _fake_site(monkeypatch, PAGES)
+
+    def on_page(reviews):
+        raise ValueError("store is full")
+
+    with pytest.raises(ValueError):
+        trustpilot.fetch_reviews_simple("shop.com", 10, NOW - timedelta(days=6, hours=12), on_page=on_page)
+
+
+def _stream(**kwargs) -> list[tuple[str, dict]]:
+    async def go():
+        return [e async for e in trustpilot.fetch_reviews_generator("shop.com", 10, NOW - timedelta(days=6, hours=12), **kwargs)]
+    return asyncio.run(go())
+
+
+def test_stream_sends_chunks_only_when_asked(monkeypatch):
+    async def afetch_page(domain, page):
+        return 200, _page_html(PAGES.get(page, []))
+
+    monkeypatch.setattr(trustpilot, "afetch_page", afetch_page)
+
+    plain = _stream()
+    assert "reviews_chunk" not in [t for t, _ in plain]
+    assert len(plain[-1][1]["reviews"]) == 5
+
+    chunked = _stream(chunks=True)
+    chunks = [d for t, d in chunked if t == "reviews_chunk"]
+    assert [r for c in chunks for r in c["reviews"]] == chunked[-1][1]["reviews"]
+    assert [c["next_page"] for c in chunks] == [2, 3, 4]
+
+
+def test_resumed_stream_stops_at_the_last_page_and_keeps_business_info(monkeypatch):
+    fetched = []
+
+    async def afetch_page(domain, page):
+        fetched.append(page)
+        if page > 3:
+            raise RuntimeError("404 Not Found")
+        return 200, _page_html(PAGES[page], total_pages=3)
+
+    monkeypatch.setattr(trustpilot, "afetch_page", afetch_page)
+
+    events = _stream(start_page=2, chunks=True)
+    kinds = [t for t, _ in events]
+    assert "error" not in kinds
+    assert fetched == [2, 3]
+    assert kinds.count("business_info") == 1
+    assert events[-1][1]["business_info"]["name"] == "Shop"
+
+
+def test_fetch_reviews_simple_stops_at_the_last_page(monkeypatch):
+    fetched = []
+
+    def fetch_page(domain, page):
+        fetched.append(page)
+        return 200, _page_html(PAGES[page], total_pages=2)
+
+    monkeypatch.setattr(trustpilot, "fetch_page", fetch_page)
+    trustpilot.fetch_reviews_simple("shop.com", 10, NOW - timedelta(days=365))
+    assert fetched == [1, 2]
@@ -4,7 +4,7 @@ import { useState, useEffect } from "react";
 import { AdjustedRatingCard } from "./AdjustedRatingCard";
 import { SentimentBreakdown } from "./SentimentBreakdown";
 import { ThemesList } from "./ThemesList";
-import { analyzeSentiment, analyzeAdjustedMetrics, analyzeThemes } from "@/lib/api";
+import { analyzeAll } from "@/lib/api";
 import { ReviewCategories } from "./ReviewCategories";
 import type { Review, SentimentResult, AdjustedMetrics, Theme } from "@/types";
 
@@ -32,19 +32,12 @@ export function InsightsPanel({ reviews, source = "appstore", hideStatRow = fals
       return;
     }
 
-    const texts = reviews.map((r) => `${r.title} ${r.review}`);
-
     setLoading(true);
-    Promise.all([
-      analyzeSentiment(texts),
-      analyzeAdjustedMetrics(reviews),
-      analyzeThemes(reviews, 1, 2),
-      analyzeThemes(reviews, 4, 5),
-    ]).then(([sent, adj, probs, w]) => {
-      setSentiment(sent);
-      setAdjustedMetrics(adj);
-      setProblems(probs);
-      setWins(w);
+    analyzeAll(reviews, ["sentiment", "adjusted_metrics", "themes"], [[1, 2], [4, 5]]).then(({ sentiment: sent, adjusted_metrics: adj, themes }) => {
+      setSentiment(sent ?? null);
+      setAdjustedMetrics(adj ?? null);
+      setProblems(themes?.[0] ?? []);
+      setWins(themes?.[1] ?? []);
       setLoading(false);
     }).catch((err) => {
       console.error("Insights error:", err);
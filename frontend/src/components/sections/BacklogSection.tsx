@@ -2,7 +2,7 @@
 
 import { useState, useEffect, useMemo, useCallback, useRef, type ReactElement } from "react";
 import { useAppStore } from "@/store/useAppStore";
-import { classifyProblems } from "@/lib/api";
+import { classifyProblemsStream } from "@/lib/api";
 import { ProblemChip, CATEGORY_CONFIG } from "@/components/shared/ProblemChip";
 import { StarRating } from "@/components/shared/StarRating";
 import { formatDate } from "@/lib/utils";
@@ -286,6 +286,7 @@ export function BacklogSection() {
   const [hasClassified, setHasClassified] = useState(false);
   const [classifying, setClassifying] = useState(false);
   const [classifiedReviews, setClassifiedReviews] = useState<ClassifiedReview[]>([]);
+  const [classifiedCount, setClassifiedCount] = useState(0);
 
   // Reset when new reviews arrive
   useEffect(() => {
@@ -300,25 +301,37 @@ export function BacklogSection() {
     if (reviews.length === 0) return;
     setHasClassified(true);
     setClassifying(true);
+    setClassifiedCount(0);
+    setClassifiedReviews(
+      reviews.map((r) => ({ ...r, problem_categories: [], classification_status: "pending" as const }))
+    );
     try {
       const texts = reviews.map((r) => `${r.title} ${r.review}`);
-      const results = await classifyProblems(texts);
-      const classified: ClassifiedReview[] = reviews.map((r, i) => ({
-        ...r,
-        problem_categories: (results[i]?.categories ?? []).filter(
-          (c): c is ProblemCategory => ALL_CATEGORIES.includes(c as ProblemCategory)
-        ),
-        classification_status: "classified" as const,
-      }));
-      setClassifiedReviews(classified);
+      await classifyProblemsStream(texts, (indices, categories, done) => {
+        setClassifiedCount(done);
+        setClassifiedReviews((prev) => {
+          const next = [...prev];
+          indices.forEach((idx, j) => {
+            next[idx] = {
+              ...next[idx],
+              problem_categories: (categories[j] ?? []).filter(
+                (c): c is ProblemCategory => ALL_CATEGORIES.includes(c as ProblemCategory)
+              ),
+              classification_status: "classified" as const,
+            };
+          });
+          return next;
+        });
+      });
     } catch (err) {
       console.error("Classification error:", err);
-      setClassifiedReviews(
-        reviews.map((r) => ({
-          ...r,
-          problem_categories: [],
-          classification_status: "failed" as const,
-        }))
+      // Keep whatever chunks already arrived; only the rest failed
+      setClassifiedReviews((prev) =>
+        prev.map((r) =>
+          r.classification_status === "pending"
+            ? { ...r, problem_categories: [], classification_status: "failed" as const }
+            : r
+        )
       );
     } finally {
       setClassifying(false);
@@ -477,7 +490,9 @@ export function BacklogSection() {
           <div>
             <p className="text-[15px] font-semibold text-text-primary mb-1">Classificazione in corso…</p>
             <p className="text-sm text-text-tertiary">
-              Analisi di {reviews.length.toLocaleString()} recensioni con AI — può richiedere qualche secondo.
+              {classifiedCount > 0
+                ? `${classifiedCount.toLocaleString()} / ${reviews.length.toLocaleString()} recensioni classificate`
+                : `Analisi di ${reviews.length.toLocaleString()} recensioni con AI — può richiedere qualche secondo.`}
             </p>
           </div>
         </div>
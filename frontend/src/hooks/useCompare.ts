@@ -2,30 +2,11 @@
 
 import { useCallback, useRef } from "react";
 import { useAppStore } from "@/store/useAppStore";
-import { startAppStoreJob, getJobStatus, getJobResult } from "@/lib/api";
+import { startCompareJob, watchJob } from "@/lib/api";
 import type { Review } from "@/types";
 
-const POLL_INTERVAL = 2000;
-
-async function pollUntilDone(jobId: string, cancelledRef: React.MutableRefObject<boolean>): Promise<Review[]> {
-  while (true) {
-    if (cancelledRef.current) return [];
-    await new Promise((r) => setTimeout(r, POLL_INTERVAL));
-    try {
-      const status = await getJobStatus(jobId);
-      if (status.status === "error") return [];
-      if (status.status === "done") {
-        const result = await getJobResult(jobId);
-        return result.reviews as Review[];
-      }
-    } catch {
-      // network hiccup — keep polling
-    }
-  }
-}
-
 export function useCompare() {
-  const cancelledRef = useRef(false);
+  const abortRef = useRef<AbortController | null>(null);
   const {
     compApps,
     selectedApps,
@@ -43,32 +24,54 @@ export function useCompare() {
       const validApps = (source as NonNullable<typeof source[0]>[]).filter(Boolean);
       if (validApps.length < 2) return;
 
-      cancelledRef.current = false;
+      abortRef.current?.abort();
+      const controller = new AbortController();
+      abortRef.current = controller;
       setIsCompFetching(true);
       setCompFetched(false);
 
       const allData: Record<string, Review[]> = {};
       const allNames: Record<string, string> = {};
+      for (const app of validApps) {
+        allNames[app.id] = app.name;
+        allData[app.id] = [];
+      }
 
-      for (let i = 0; i < validApps.length; i++) {
-        if (cancelledRef.current) break;
-        const app = validApps[i];
+      setCompProgress({
+        page: 0,
+        total_pages: validApps.length,
+        reviews_so_far: 0,
+        message: `Fetching ${validApps.length} apps...`,
+      });
 
-        allNames[app.id] = app.name;
-        setCompProgress({
-          page: i + 1,
-          total_pages: validApps.length,
-          reviews_so_far: Object.values(allData).reduce((s, r) => s + r.length, 0),
-          message: `Fetching ${app.name}... (${i + 1}/${validApps.length})`,
+      try {
+        const { job_id } = await startCompareJob(
+          validApps.map((a) => a.id), allNames, country, maxPages, cutoffDays
+        );
+        // Progress and each app's reviews (tagged with app_id) are pushed as they arrive
+        const final = await watchJob<Review & { app_id: string }>(job_id, {
+          signal: controller.signal,
+          onReviews: (batch) => {
+            for (const { app_id, ...review } of batch) allData[app_id]?.push(review);
+          },
+          onStatus: ({ apps, total }) => {
+            if (!apps) return;
+            const finished = Object.values(apps).filter((p) => p.status === "done" || p.status === "error").length;
+            const running = validApps.filter((a) => apps[a.id]?.status === "running").map((a) => a.name);
+            setCompProgress({
+              page: finished,
+              total_pages: validApps.length,
+              reviews_so_far: total,
+              message: running.length
+                ? `Fetching ${running.join(", ")}... (${finished}/${validApps.length})`
+                : `Fetched ${finished}/${validApps.length} apps`,
+            });
+          },
         });
-
-        try {
-          const { job_id } = await startAppStoreJob(app.id, country, maxPages, cutoffDays);
-          const reviews = await pollUntilDone(job_id, cancelledRef);
-          allData[app.id] = reviews;
-        } catch {
-          allData[app.id] = [];
-        }
+        if (final.status !== "done") for (const app of validApps) allData[app.id] = [];
+      } catch {
+        // leave every app empty, as a failed fetch did before
+        for (const app of validApps) allData[app.id] = [];
       }
 
       setCompData(allData);
@@ -81,7 +84,8 @@ export function useCompare() {
   );
 
   const cancel = useCallback(() => {
-    cancelledRef.current = true;
+    abortRef.current?.abort();
+    abortRef.current = null;
     setIsCompFetching(false);
     setCompProgress(null);
   }, [setIsCompFetching, setCompProgress]);
@@ -2,13 +2,11 @@
 
 import { useCallback, useRef } from "react";
 import { useAppStore } from "@/store/useAppStore";
-import { startAppStoreJob, getJobStatus, getJobResult } from "@/lib/api";
-
-const POLL_INTERVAL = 2000; // ms
+import { startAppStoreJob, watchJob } from "@/lib/api";
+import type { Review } from "@/types";
 
 export function useFetchReviews() {
-  const pollRef = useRef<ReturnType<typeof setTimeout> | null>(null);
-  const cancelledRef = useRef(false);
+  const abortRef = useRef<AbortController | null>(null);
 
   const {
     selectedApps,
@@ -21,25 +19,26 @@ export function useFetchReviews() {
 
   const selectedApp = selectedApps[0] ?? null;
 
-  const stopPolling = useCallback(() => {
-    if (pollRef.current) clearTimeout(pollRef.current);
-    cancelledRef.current = true;
+  const stopWatching = useCallback(() => {
+    abortRef.current?.abort();
+    abortRef.current = null;
   }, []);
 
   const finish = useCallback((reviews: Parameters<typeof setReviews>[0]) => {
-    stopPolling();
+    stopWatching();
     setReviews(reviews);
     setFetchDone(true);
     setIsFetching(false);
     setFetchProgress(null);
-  }, [stopPolling, setReviews, setFetchDone, setIsFetching, setFetchProgress]);
+  }, [stopWatching, setReviews, setFetchDone, setIsFetching, setFetchProgress]);
 
   const fetch = useCallback(
     async (maxPages: number, cutoffDays: number) => {
       if (!selectedApp) return;
 
-      stopPolling();
-      cancelledRef.current = false;
+      stopWatching();
+      const controller = new AbortController();
+      abortRef.current = controller;
 
       setIsFetching(true);
       setFetchDone(false);
@@ -57,48 +56,37 @@ export function useFetchReviews() {
         return;
       }
 
+      // Pushed by the backend as the job progresses; reviews arrive with it, so no /result call
       let page = 0;
-      const poll = async () => {
-        if (cancelledRef.current) return;
-        try {
-          const status = await getJobStatus(jobId);
-
-          if (status.status === "error") {
-            finish([]);
-            return;
-          }
-
-          if (status.status === "done") {
-            const result = await getJobResult(jobId);
-            finish(result.reviews);
-            return;
-          }
-
-          // Still running — update progress display
-          page = Math.min(page + 1, maxPages);
-          setFetchProgress({
-            page,
-            total_pages: maxPages,
-            reviews_so_far: status.total,
-            message: `Fetching... (${status.total} reviews so far)`,
-          });
-
-          pollRef.current = setTimeout(poll, POLL_INTERVAL);
-        } catch {
-          pollRef.current = setTimeout(poll, POLL_INTERVAL);
-        }
-      };
-
-      pollRef.current = setTimeout(poll, POLL_INTERVAL);
+      const reviews: Review[] = [];
+      try {
+        const final = await watchJob<Review>(jobId, {
+          signal: controller.signal,
+          onReviews: (batch) => reviews.push(...batch),
+          onStatus: (status) => {
+            if (status.status !== "running") return;
+            page = Math.min(page + 1, maxPages);
+            setFetchProgress({
+              page,
+              total_pages: maxPages,
+              reviews_so_far: status.total,
+              message: `Fetching... (${status.total} reviews so far)`,
+            });
+          },
+        });
+        finish(final.status === "done" ? reviews : []);
+      } catch {
+        if (!controller.signal.aborted) finish([]);
+      }
     },
-    [selectedApps, countryCode, setReviews, setFetchDone, setFetchProgress, setIsFetching, finish, stopPolling]
+    [selectedApps, countryCode, setReviews, setFetchDone, setFetchProgress, setIsFetching, finish, stopWatching]
   );
 
   const cancel = useCallback(() => {
-    stopPolling();
+    stopWatching();
     setIsFetching(false);
     setFetchProgress(null);
-  }, [stopPolling, setIsFetching, setFetchProgress]);
+  }, [stopWatching, setIsFetching, setFetchProgress]);
 
   return { fetch, cancel };
 }
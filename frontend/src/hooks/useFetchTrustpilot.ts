@@ -2,13 +2,10 @@
 
 import { useCallback, useRef } from "react";
 import { useAppStore } from "@/store/useAppStore";
-import { startTrustpilotJob, getJobStatus, getJobResult } from "@/lib/api";
-
-const POLL_INTERVAL = 2000;
+import { startTrustpilotJob, watchJob } from "@/lib/api";
 
 export function useFetchTrustpilot() {
-  const cancelledRef = useRef(false);
-  const pollRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const abortRef = useRef<AbortController | null>(null);
 
   const {
     setTrustpilotReviews,
@@ -20,8 +17,9 @@ export function useFetchTrustpilot() {
 
   const fetch = useCallback(
     async (domain: string, maxPages: number, cutoffDays: number) => {
-      if (pollRef.current) clearTimeout(pollRef.current);
-      cancelledRef.current = false;
+      abortRef.current?.abort();
+      const controller = new AbortController();
+      abortRef.current = controller;
 
       setIsTpFetching(true);
       setTpFetchDone(false);
@@ -40,50 +38,41 @@ export function useFetchTrustpilot() {
         return;
       }
 
+      // Pushed by the backend as the job progresses; reviews arrive with it, so no /result call
       let tick = 0;
-      const poll = async () => {
-        if (cancelledRef.current) return;
-        try {
-          const status = await getJobStatus(jobId);
-
-          if (status.status === "error") {
-            setTpFetchDone(true);
-            setIsTpFetching(false);
-            setTpFetchProgress(null);
-            return;
-          }
-
-          if (status.status === "done") {
-            const result = await getJobResult(jobId);
-            setTrustpilotReviews(result.reviews as Parameters<typeof setTrustpilotReviews>[0]);
-            if (result.business_info) setTrustpilotInfo(result.business_info);
-            setTpFetchDone(true);
-            setIsTpFetching(false);
-            setTpFetchProgress(null);
-            return;
-          }
-
-          tick = Math.min(tick + 1, maxPages);
-          setTpFetchProgress({
-            page: tick,
-            total_pages: maxPages,
-            reviews_so_far: status.total,
-            message: `Fetching… (${status.total} reviews so far)`,
-          });
-        } catch {
-          // network hiccup — keep polling
+      const reviews: Parameters<typeof setTrustpilotReviews>[0] = [];
+      try {
+        const final = await watchJob<(typeof reviews)[number]>(jobId, {
+          signal: controller.signal,
+          onReviews: (batch) => reviews.push(...batch),
+          onStatus: (status) => {
+            if (status.status !== "running") return;
+            tick = Math.min(tick + 1, maxPages);
+            setTpFetchProgress({
+              page: tick,
+              total_pages: maxPages,
+              reviews_so_far: status.total,
+              message: `Fetching… (${status.total} reviews so far)`,
+            });
+          },
+        });
+        if (final.status === "done") {
+          setTrustpilotReviews(reviews);
+          if (final.business_info) setTrustpilotInfo(final.business_info);
         }
-        pollRef.current = setTimeout(poll, POLL_INTERVAL);
-      };
-
-      pollRef.current = setTimeout(poll, POLL_INTERVAL);
+      } catch {
+        if (controller.signal.aborted) return;
+      }
+      setTpFetchDone(true);
+      setIsTpFetching(false);
+      setTpFetchProgress(null);
     },
     [setTrustpilotReviews, setTrustpilotInfo, setTpFetchDone, setTpFetchProgress, setIsTpFetching]
   );
 
   const cancel = useCallback(() => {
-    cancelledRef.current = true;
-    if (pollRef.current) clearTimeout(pollRef.current);
+    abortRef.current?.abort();
+    abortRef.current = null;
     setIsTpFetching(false);
     setTpFetchProgress(null);
   }, [setIsTpFetching, setTpFetchProgress]);
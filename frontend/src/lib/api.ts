@@ -1,3 +1,5 @@
+import type { SentimentResult, AdjustedMetrics, Theme, Keyword } from "@/types";
+
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
 async function fetchJSON<T>(path: string, init?: RequestInit): Promise<T> {
@@ -26,8 +28,95 @@ export async function startTrustpilotJob(domain: string, maxPages: number, cutof
   });
 }
 
+export interface CompareAppProgress {
+  name: string | null;
+  status: "pending" | "running" | "done" | "error";
+  total: number;
+  error: string | null;
+}
+
+export async function startCompareJob(
+  appIds: string[],
+  appNames: Record<string, string>,
+  country: string,
+  maxPages: number,
+  cutoffDays: number
+) {
+  return postJSON<{ job_id: string }>("/api/jobs/compare/start", {
+    app_ids: appIds, app_names: appNames, country, max_pages: maxPages, cutoff_days: cutoffDays,
+  });
+}
+
+export async function getCompareResult(jobId: string) {
+  return fetchJSON<{
+    apps: Record<string, { date: string; rating: number; title: string; review: string; author: string; version: string }[]>;
+    app_names: Record<string, string | null>;
+    progress: Record<string, CompareAppProgress>;
+  }>(`/api/jobs/compare/result/${jobId}`);
+}
+
+export interface JobStatus {
+  status: string;
+  total: number;
+  error?: string | null;
+  download_url?: string | null;
+  apps?: Record<string, CompareAppProgress> | null;
+  business_info?: { name: string; trustScore: number; stars: number; totalReviews: number } | null;
+}
+
 export async function getJobStatus(jobId: string) {
-  return fetchJSON<{ status: string; total: number; error?: string }>(`/api/jobs/status/${jobId}`);
+  return fetchJSON<JobStatus>(`/api/jobs/status/${jobId}`);
+}
+
+/**
+ * Follows a job over server-sent events instead of polling /status: `onStatus` gets every
+ * status change and, with `onReviews`, new reviews arrive as they are stored, so no
+ * /result call is needed. Resolves with the final status; aborting `signal` stops listening.
+ */
+export function watchJob<R = unknown>(
+  jobId: string,
+  handlers: {
+    onStatus?: (status: JobStatus) => void;
+    onReviews?: (reviews: R[]) => void;
+    signal?: AbortSignal;
+  } = {}
+): Promise<JobStatus> {
+  const { onStatus, onReviews, signal } = handlers;
+  return new Promise((resolve, reject) => {
+    if (signal?.aborted) {
+      reject(new DOMException("Aborted", "AbortError"));
+      return;
+    }
+    const query = onReviews ? "?with_reviews=true" : "";
+    const source = new EventSource(`${API_URL}/api/jobs/events/${jobId}${query}`);
+    const close = () => {
+      source.close();
+      signal?.removeEventListener("abort", onAbort);
+    };
+    const onAbort = () => {
+      close();
+      reject(new DOMException("Aborted", "AbortError"));
+    };
+    signal?.addEventListener("abort", onAbort);
+
+    source.addEventListener("status", (e) => onStatus?.(JSON.parse((e as MessageEvent).data)));
+    source.addEventListener("reviews", (e) => onReviews?.(JSON.parse((e as MessageEvent).data).reviews));
+    source.addEventListener("complete", (e) => {
+      close();
+      resolve(JSON.parse((e as MessageEvent).data));
+    });
+    source.addEventListener("error", (e) => {
+      // A server "error" event carries data; a dropped connection doesn't, and
+      // EventSource reconnects on its own (resuming via Last-Event-ID) unless it gave up
+      if (e instanceof MessageEvent) {
+        close();
+        reject(new Error(JSON.parse(e.data).message));
+      } else if (source.readyState === EventSource.CLOSED) {
+        close();
+        reject(new Error("Job event stream closed"));
+      }
+    });
+  });
 }
 
 export async function getJobResult(jobId: string) {
@@ -134,31 +223,97 @@ export async function analyzeKeywords(texts: string[], topN: number = 30) {
   });
 }
 
+export type AnalysisName = "sentiment" | "adjusted_metrics" | "themes" | "keywords";
+
+/** Several analyses in one request; `themes` has one list per entry of `themeRanges`. */
+export async function analyzeAll(
+  reviews: { date: string; rating: number; title: string; review: string; author: string; version: string }[],
+  analyses: AnalysisName[],
+  themeRanges: [number, number][] = [],
+  keywordsTopN: number = 30
+) {
+  return postJSON<{
+    sentiment?: SentimentResult;
+    adjusted_metrics?: AdjustedMetrics;
+    themes?: Theme[][];
+    keywords?: Keyword[];
+  }>("/api/analysis/all", {
+    reviews,
+    analyses,
+    theme_ranges: themeRanges,
+    keywords_top_n: keywordsTopN,
+  });
+}
+
+/**
+ * Runs an export as a background job on the backend and resolves with the file once
+ * it is ready, so large exports don't depend on one long request surviving proxy timeouts.
+ */
+async function runExportJob(path: string, body: unknown): Promise<Blob> {
+  const { job_id } = await postJSON<{ job_id: string }>(path, body);
+  const status = await watchJob(job_id);
+  if (status.status === "error" || !status.download_url) throw new Error(status.error || "Export failed");
+  const res = await fetch(`${API_URL}${status.download_url}`);
+  if (!res.ok) throw new Error("Export failed");
+  return res.blob();
+}
+
 export async function exportExcel(
   reviews: { date: string; rating: number; title: string; review: string; author: string; version: string }[]
 ) {
-  const res = await fetch(`${API_URL}/api/export/excel`, {
+  return runExportJob("/api/jobs/export/start", { reviews });
+}
+
+export type ClassifyMode = "llm" | "local" | "hybrid";
+
+export async function classifyProblems(
+  texts: string[],
+  mode: ClassifyMode = "llm"
+): Promise<{ categories: string[] }[]> {
+  return postJSON<{ categories: string[] }[]>("/api/analysis/classify-problems", { texts, mode });
+}
+
+/**
+ * Streaming variant of classifyProblems: `onResults` receives each chunk's categories
+ * (with the input indices they belong to) as soon as the backend has them.
+ */
+export async function classifyProblemsStream(
+  texts: string[],
+  onResults: (indices: number[], categories: string[][], done: number, total: number) => void,
+  mode: ClassifyMode = "llm"
+): Promise<void> {
+  const res = await fetch(`${API_URL}/api/analysis/classify-problems/stream`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ reviews }),
+    body: JSON.stringify({ texts, mode }),
   });
-  if (!res.ok) throw new Error("Export failed");
-  return res.blob();
-}
+  if (!res.ok || !res.body) throw new Error(`API error: ${res.status}`);
 
-export async function classifyProblems(texts: string[]): Promise<{ categories: string[] }[]> {
-  return postJSON<{ categories: string[] }[]>("/api/analysis/classify-problems", { texts });
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let sep: number;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const block = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      const event = block.match(/^event: (.*)$/m)?.[1];
+      const data = block.match(/^data: (.*)$/m)?.[1];
+      if (!event || !data) continue; // keep-alive comment
+      const payload = JSON.parse(data);
+      if (event === "results") onResults(payload.indices, payload.categories, payload.done, payload.total);
+      else if (event === "error") throw new Error(payload.message);
+      else if (event === "complete") return;
+    }
+  }
 }
 
 export async function exportComparisonExcel(
   apps: Record<string, { date: string; rating: number; title: string; review: string; author: string; version: string }[]>,
   appNames: Record<string, string>
 ) {
-  const res = await fetch(`${API_URL}/api/export/comparison-excel`, {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ apps, app_names: appNames }),
-  });
-  if (!res.ok) throw new Error("Export failed");
-  return res.blob();
+  return runExportJob("/api/jobs/export/comparison/start", { apps, app_names: appNames });
 }